@@ -5,47 +5,67 @@ AI-Powered Career Development Assistant using LangChain and Groq
 
 import streamlit as st
 import os
+import importlib
 from dotenv import load_dotenv
 import time
 
 # Load environment variables
 load_dotenv()
-from auth.database import init_database
+from auth.database import ensure_database
 from auth.auth_ui import show_auth_page
 from auth.session_manager import check_auth_status, logout_persist
-# Import tab modules
-from tabs.cv_interview import cv_interview_tab
-from tabs.code_explainer import code_explainer_tab
-from tabs.article_generator import article_generator_tab
-from tabs.study_plan import study_plan_tab
+# Tab modules pull in LangChain and the file parsers: they are imported when a tool first runs
+# (or earlier by the background warmup), keeping them off the login page's import path
 from auth.profile_ui import show_profile_page
+from components.admin_panel import is_admin, show_admin_panel
+from utils.tracing import span, start_metrics_server
+from utils.warmup import start_warmup
+from config import TAB_NAVIGATION
 
-# Configure Streamlit page
-st.set_page_config(
-    page_title="articulAIte 🤖",
-    page_icon="🎯",
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
+# Tools: (label, "module:tab function", widget keys whose values survive while the tool is hidden).
+# Buttons, chat inputs and file uploaders cannot be set through session state, so they are not listed.
+TOOLS = [
+    ("📄👔 CV & Interview", "tabs.cv_interview:cv_interview_tab",
+     ["cv_model_select", "cv_temperature", "cv_job_description"]),
+    ("👨‍💻⚛ Code Explainer", "tabs.code_explainer:code_explainer_tab",
+     ["code_input", "code_model_select", "code_temperature"]),
+    ("✒️📜 Article Generator", "tabs.article_generator:article_generator_tab",
+     ["article_topic", "article_sources", "article_toc", "article_style", "article_model_select",
+      "article_word_count", "article_temperature"]),
+    ("📋🗓️ Study Plan", "tabs.study_plan:study_plan_tab",
+     ["study_subject", "study_goal", "study_level", "study_style", "study_model_select",
+      "study_duration", "study_daily_hours", "study_temperature"]),
+]
+
+def load_tab(target):
+    """Tab function for a "module:function" target, importing the module on first use"""
+    module_name, function_name = target.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+def keep_widget_state(keys):
+    """
+    Streamlit drops the state of widgets that were not rendered in a run.
+    Re-assigning the values turns them into plain session state, so a hidden tool's inputs survive.
+    """
+    for key in keys:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+def show_tools():
+    """Render only the selected tool; the other tools' functions do not run at all"""
+    labels = [label for label, _, _ in TOOLS]
+    active = st.radio("Tool", labels, horizontal=True, label_visibility="collapsed", key="active_tool")
+    for label, target, widget_keys in TOOLS:
+        if label == active:
+            load_tab(target)()
+        else:
+            keep_widget_state(widget_keys)
 
-init_database()
-check_auth_status()
-
-# Custom CSS
-st.markdown("""
-    <style>
-    .main-header {
-        text-align: center;
-        color: #1f77e8;
-    }
-    .tab-description {
-        background-color: #f0f2f6;
-        padding: 15px;
-        border-radius: 8px;
-        margin-bottom: 20px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+def show_all_tabs():
+    """Legacy navigation: st.tabs switches client-side, so every tab body executes on each rerun"""
+    for tab, (_, target, _) in zip(st.tabs([label for label, _, _ in TOOLS]), TOOLS):
+        with tab:
+            load_tab(target)()
 
 # Check API Key
 def check_api_key():
@@ -59,6 +79,38 @@ def check_api_key():
         return False
     return True
 
+# Page setup and the process's services. Not at module level: spawned worker processes (the PDF
+# pool) re-import this script as __mp_main__ and must not start servers, warmups or pools of their own
+def setup_page():
+    # Configure Streamlit page
+    st.set_page_config(
+        page_title="articulAIte 🤖",
+        page_icon="🎯",
+        layout="wide",
+        initial_sidebar_state="collapsed"
+    )
+
+    start_metrics_server()
+    start_warmup()
+    ensure_database()
+    check_auth_status()
+
+    # Custom CSS
+    st.markdown("""
+        <style>
+        .main-header {
+            text-align: center;
+            color: #1f77e8;
+        }
+        .tab-description {
+            background-color: #f0f2f6;
+            padding: 15px;
+            border-radius: 8px;
+            margin-bottom: 20px;
+        }
+        </style>
+        """, unsafe_allow_html=True)
+
 # Main App
 def main():
     if not st.session_state.get("logged_in", False):
@@ -125,27 +177,16 @@ def main():
     # Check API Key
     if not check_api_key():
         st.stop()
+
+    if is_admin(st.session_state.user):
+        show_admin_panel()
     
     # Tabs
     if not st.session_state.get("profile_mode", False):
-        tab1, tab2, tab3, tab4 = st.tabs([
-            "📄👔 CV & Interview",
-            "👨‍💻⚛ Code Explainer",
-            "✒️📜 Article Generator",
-            "📋🗓️ Study Plan"
-        ])
-        
-        with tab1:
-            cv_interview_tab()
-        
-        with tab2:
-            code_explainer_tab()
-        
-        with tab3:
-            article_generator_tab()
-        
-        with tab4:
-            study_plan_tab()
+        if TAB_NAVIGATION == "tabs":
+            show_all_tabs()
+        else:
+            show_tools()
 
         st.markdown("---")
         st.markdown("""
@@ -170,4 +211,6 @@ def main():
         # </ul>
 
 if __name__ == "__main__":
-    main()
+    setup_page()
+    with span("rerun"):
+        main()
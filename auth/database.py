@@ -1,26 +1,142 @@
 """
-Database setup and user authentication functions (PostgreSQL Version)
+Database setup and user authentication functions (PostgreSQL, or SQLite for local runs)
 """
 
 import psycopg2
+import psycopg2.pool
+import sqlite3
 import hashlib
 import os
+import threading
 import streamlit as st
+from utils.tracing import traced
 from datetime import datetime
+from config import DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT
+
+_pools = {}               # database URL -> _ConnectionPool
+_initialized = set()      # database URLs whose tables exist in this process
+_pool_lock = threading.Lock()
+_init_lock = threading.Lock()
+
+class _SQLiteCursor:
+    """Cursor wrapper so the psycopg2-style SQL (%s params, SERIAL) runs on SQLite"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        sql = sql.replace("%s", "?").replace("SERIAL PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT")
+        self._cursor.execute(sql, params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(sql.replace("%s", "?"), seq_of_params)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+class _SQLiteConnection:
+    """Connection wrapper handing out _SQLiteCursor objects"""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+
+    def cursor(self):
+        return _SQLiteCursor(self._conn.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+class _PooledConnection:
+    """Connection borrowed from a _ConnectionPool: close() hands it back instead of disconnecting"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn)
+
+    def __del__(self):
+        # Callers that raise before close() still return their connection
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+class _ConnectionPool:
+    """psycopg2 ThreadedConnectionPool that waits up to DB_POOL_TIMEOUT for a free connection"""
+
+    def __init__(self, db_url):
+        self._pool = psycopg2.pool.ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, db_url)
+        self._slots = threading.BoundedSemaphore(DB_POOL_MAX)
+
+    def connect(self):
+        if not self._slots.acquire(timeout=DB_POOL_TIMEOUT):
+            raise psycopg2.pool.PoolError(f"No free database connection after {DB_POOL_TIMEOUT}s")
+        try:
+            return _PooledConnection(self, self._pool.getconn())
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        broken = bool(conn.closed)
+        if not broken:
+            try:
+                conn.rollback()  # discard whatever the borrower left uncommitted
+            except psycopg2.Error:
+                broken = True
+        try:
+            self._pool.putconn(conn, close=broken)
+        finally:
+            self._slots.release()
+
+def get_database_url():
+    """DATABASE_URL from Streamlit secrets first, then environment variables"""
+    try:
+        if "DATABASE_URL" in st.secrets:
+            return st.secrets["DATABASE_URL"]
+    except Exception:
+        # No secrets.toml (e.g. benchmarks, scripts)
+        pass
+    return os.getenv("DATABASE_URL")
 
 def get_connection():
-    """Get database connection from Secrets or Environment"""
-    # Tries to get URL from Streamlit secrets first, then environment variables
-    if "DATABASE_URL" in st.secrets:
-        db_url = st.secrets["DATABASE_URL"]
-    else:
-        db_url = os.getenv("DATABASE_URL")
-        
+    """
+    Get database connection from Secrets or Environment (sqlite:///path for a local SQLite file).
+    PostgreSQL connections come from a per-process pool; close() returns them to it.
+    """
+    db_url = get_database_url()
     if not db_url:
         raise ValueError("DATABASE_URL not found in secrets or environment variables.")
     
-    return psycopg2.connect(db_url)
+    if db_url.startswith("sqlite:///"):
+        return _SQLiteConnection(db_url[len("sqlite:///"):])
+    pool = _pools.get(db_url)
+    if pool is None:
+        with _pool_lock:
+            pool = _pools.get(db_url)
+            if pool is None:
+                pool = _pools[db_url] = _ConnectionPool(db_url)
+    return pool.connect()
+
+def ensure_database():
+    """Create the tables once per process (init_database is idempotent but costs a round trip per table)"""
+    db_url = get_database_url()
+    if db_url in _initialized:
+        return
+    with _init_lock:
+        if db_url not in _initialized:
+            init_database()
+            _initialized.add(db_url)
 
+@traced("db.init_database")
 def init_database():
     """Initialize database tables for PostgreSQL"""
     conn = get_connection()
@@ -69,6 +185,40 @@ def init_database():
         );
     """)
     
+    # LLM usage side table: one compact row per assistant message.
+    # Rows outlive deleted chats (message_id is nulled) so spend stays accounted.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS llm_usage (
+            id SERIAL PRIMARY KEY,
+            message_id INTEGER REFERENCES chat_history(id) ON DELETE SET NULL,
+            user_id INTEGER NOT NULL,
+            tab_name TEXT NOT NULL,
+            prompt_kind TEXT NOT NULL,
+            model TEXT NOT NULL,
+            prompt_tokens INTEGER,
+            completion_tokens INTEGER,
+            ttft_ms INTEGER,
+            latency_ms INTEGER,
+            cache_hit INTEGER NOT NULL DEFAULT 0,
+            created_ts DOUBLE PRECISION NOT NULL
+        );
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_user_ts ON llm_usage (user_id, created_ts)")
+
+    # Generated articles as sections (utils/article_store.py): the editor chat rewrites
+    # only the rows of the sections it changes
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS article_sections (
+            session_id INTEGER NOT NULL REFERENCES chat_sessions(id) ON DELETE CASCADE,
+            section_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            content TEXT NOT NULL,
+            revision INTEGER NOT NULL DEFAULT 1,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (session_id, section_id)
+        );
+    """)
+    
     conn.commit()
     conn.close()
 
@@ -76,6 +226,7 @@ def hash_password(password):
     """Hash password using SHA256"""
     return hashlib.sha256(password.encode()).hexdigest()
 
+@traced("db.register_user")
 def register_user(full_name, username, email, password):
     """Register a new user"""
     try:
@@ -88,7 +239,7 @@ def register_user(full_name, username, email, password):
         conn.commit()
         conn.close()
         return True, "Registration successful!"
-    except psycopg2.IntegrityError as e:
+    except (psycopg2.IntegrityError, sqlite3.IntegrityError) as e:
         error_msg = str(e)
         if "username" in error_msg:
             return False, "Username already exists."
@@ -98,6 +249,7 @@ def register_user(full_name, username, email, password):
     except Exception as e:
         return False, f"Error: {str(e)}"
 
+@traced("db.login_user")
 def login_user(username_or_email, password):
     """Authenticate user and return user data"""
     conn = get_connection()
@@ -124,6 +276,7 @@ def login_user(username_or_email, password):
 
 # CACHED FUNCTION: This drastically reduces DB hits for session checks
 @st.cache_data(ttl=3600)
+@traced("db.get_user_by_id")
 def get_user_by_id(user_id):
     """Get user details by ID (Cached)"""
     try:
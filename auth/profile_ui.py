@@ -1,10 +1,12 @@
 import streamlit as st
 from auth.database import get_connection, get_user_by_id
 from auth.session_manager import logout_persist
+from utils.tracing import traced
 import os
 
 PROFILE_IMG_FOLDER = "profile_images"
 
+@traced("db.update_user_profile")
 def update_user_profile(user_id, full_name, email, phone, pic_url):
     conn = get_connection()
     cursor = conn.cursor()
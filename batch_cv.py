@@ -0,0 +1,298 @@
+"""
+Batch CV × job description runner - the CV tab's "Interview Questions" and "Skill Highlights"
+generations for a folder of resumes against a set of job descriptions, without the UI.
+
+- Resumes are read with utils/file_handler (same checks, extraction and cache as uploads) and
+  condensed like in the tab; job descriptions are .txt/.md files (or PDF/DOCX)
+- Interview questions run for every resume × job description pair (with the local match
+  analysis unless --no-match-analysis); skill highlights, which do not use a job
+  description, once per resume
+- Generations are services.cv requests, so calls go through invoke_llm and the admission
+  controller and model TPM limits apply; --concurrency bounds in-flight calls and
+  --calls-per-minute the runner's own call rate
+- Every finished item is appended to <out>/checkpoint.jsonl after its result is written;
+  a rerun with the same --out skips finished items (failed ones are retried)
+- Results go to <out>/<resume>/<jd>.<kind>.md, or with --to sessions into new chat sessions
+  of --user-id in the CV Interview library (a crash between saving a session and writing its
+  checkpoint line can repeat that one item)
+- <out>/report.json: throughput, per-item latency percentiles (queueing and retries included), tokens
+
+    python batch_cv.py --resumes cvs/ --jds jds/ --out runs/nightly --concurrency 4
+    python batch_cv.py --resumes cvs/ --jds jds/ --out runs/nightly --to sessions --user-id 12
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import streamlit.logger
+streamlit.logger.set_log_level("error")  # st.* calls outside a Streamlit server warn on every call
+
+import utils.admission
+from utils.admission import AdmissionController, AdmissionError
+from utils.file_handler import validate_file, extract_text_from_file
+from utils.resume_condense import canonical_resume
+from utils.match_score import match_report, format_report
+from services.base import generate, save_to_new_session
+from services.cv import GENERATIONS, CVAnalysisRequest
+from config import CV_INTERVIEW_MODELS
+
+JD_TEXT_TYPES = (".txt", ".md")
+
+class LocalUpload(io.BytesIO):
+    """A file on disk shaped like Streamlit's UploadedFile, for utils/file_handler"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+        self.size = len(self.getbuffer())
+
+def _stem(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+def _files(path, extensions):
+    if os.path.isfile(path):
+        return [path]
+    return sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(extensions))
+
+def load_resumes(path):
+    """[(name, canonical resume, SHA-256)] of the readable resumes; the others are reported and skipped"""
+    resumes = []
+    for file_path in _files(path, (".pdf", ".docx", ".txt")):
+        upload = LocalUpload(file_path)
+        is_valid, message = validate_file(upload)
+        text = extract_text_from_file(upload) if is_valid else None
+        if not text:
+            print(f"skipping {file_path}: {message if not is_valid else 'no text extracted'}", file=sys.stderr)
+            continue
+        resume = canonical_resume(text)
+        resumes.append((_stem(file_path), resume, hashlib.sha256(resume.encode("utf-8")).hexdigest()))
+    return resumes
+
+def load_jds(path):
+    """[(name, text, SHA-256)] of the job descriptions"""
+    jds = []
+    for file_path in _files(path, JD_TEXT_TYPES + (".pdf", ".docx")):
+        if file_path.lower().endswith(JD_TEXT_TYPES):
+            with open(file_path, encoding="utf-8", errors="replace") as f:
+                text = f.read().strip()
+        else:
+            upload = LocalUpload(file_path)
+            text = extract_text_from_file(upload) if validate_file(upload)[0] else None
+        if text:
+            jds.append((_stem(file_path), text, hashlib.sha256(text.encode("utf-8")).hexdigest()))
+    return jds
+
+def build_items(resumes, jds, kinds, model, temperature):
+    """Work items; the key identifies the inputs and settings, so a changed file is redone"""
+    items = []
+    for resume_name, resume, resume_digest in resumes:
+        targets = [("interview_questions", jd) for jd in jds] if "interview_questions" in kinds else []
+        if "skill_highlights" in kinds:
+            targets.append(("skill_highlights", (None, "", "")))
+        for kind, (jd_name, jd, jd_digest) in targets:
+            key = hashlib.sha256(f"{resume_digest}|{jd_digest}|{kind}|{model}|{temperature}".encode()).hexdigest()[:24]
+            items.append({"key": key, "kind": kind, "resume_name": resume_name, "resume": resume,
+                          "jd_name": jd_name, "jd": jd})
+    return items
+
+class Checkpoint:
+    """Append-only JSONL of finished items; the last line per key wins"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    self.done[record["key"]] = record
+        self._file = open(path, "a")
+
+    def finished(self, key):
+        return self.done.get(key, {}).get("status") == "ok"
+
+    def record(self, record):
+        self.done[record["key"]] = record
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def save_result(item, result, args):
+    """Write one result to the output directory or a new chat session; returns where it went"""
+    if args.to == "sessions":
+        session_id, _ = save_to_new_session(result)
+        return {"session_id": session_id}
+    name = f"{item['jd_name']}.{item['kind']}.md" if item["jd_name"] else f"{item['kind']}.md"
+    path = os.path.join(args.out, item["resume_name"], name)
+    _write_atomic(path, result.message + "\n")
+    return {"path": path}
+
+def run_item(item, args):
+    """Generate one item (blocking); returns its checkpoint record"""
+    match_block = ""
+    if item["kind"] == "interview_questions" and args.match_analysis:
+        match_block = format_report(match_report(item["resume"], item["jd"]))
+    subject = item["resume_name"] + (f" × {item['jd_name']}" if item["jd_name"] else "")
+    request = CVAnalysisRequest(item["kind"], item["resume"], args.model, args.temperature, args.user_id,
+                                job_description=item["jd"], match_block=match_block, subject=subject)
+
+    started = time.perf_counter()
+    for attempt in range(args.retries + 1):
+        try:
+            result = generate(request)
+            break
+        except AdmissionError:
+            # Queue timeout or provider 429: the controller has already backed the model off
+            if attempt == args.retries:
+                raise
+            time.sleep(min(60, 2 ** attempt * 5))
+    usage = result.usage or {}
+    destination = save_result(item, result, args)
+    return dict(
+        key=item["key"], status="ok", kind=item["kind"], resume=item["resume_name"], jd=item["jd_name"],
+        latency_ms=round((time.perf_counter() - started) * 1000), attempts=attempt + 1,
+        prompt_tokens=usage.get("prompt_tokens"), completion_tokens=usage.get("completion_tokens"),
+        finished_ts=time.time(), **destination,
+    )
+
+async def run_all(items, args, checkpoint):
+    semaphore = asyncio.Semaphore(args.concurrency)
+    records = []
+    total = len(items)
+
+    async def worker(item):
+        async with semaphore:
+            try:
+                record = await asyncio.to_thread(run_item, item, args)
+            except Exception as e:
+                record = {"key": item["key"], "status": "error", "kind": item["kind"], "resume": item["resume_name"],
+                          "jd": item["jd_name"], "error": f"{type(e).__name__}: {e}", "finished_ts": time.time()}
+            checkpoint.record(record)
+            records.append(record)
+            label = item["resume_name"] + (f" × {item['jd_name']}" if item["jd_name"] else "")
+            print(f"[{len(records)}/{total}] {record['status']:<5} {item['kind']:<19} {label}"
+                  + (f"  {record['latency_ms']} ms" if record["status"] == "ok" else f"  {record['error']}"))
+
+    await asyncio.gather(*(worker(item) for item in items))
+    return records
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+def build_report(records, skipped, wall_s, args):
+    ok = [r for r in records if r["status"] == "ok"]
+    latencies = [r["latency_ms"] for r in ok]
+    return {
+        "model": args.model,
+        "concurrency": args.concurrency,
+        "items": len(records) + skipped,
+        "skipped_from_checkpoint": skipped,
+        "completed": len(ok),
+        "failed": len(records) - len(ok),
+        "wall_s": round(wall_s, 1),
+        "throughput_per_min": round(len(ok) / wall_s * 60, 2) if wall_s > 0 else None,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.5), "p95": _percentile(latencies, 0.95),
+            "max": max(latencies) if latencies else None,
+            "mean": round(statistics.mean(latencies)) if latencies else None,
+        },
+        "prompt_tokens": sum(r["prompt_tokens"] or 0 for r in ok),
+        "completion_tokens": sum(r["completion_tokens"] or 0 for r in ok),
+        "errors": [{"resume": r["resume"], "jd": r["jd"], "kind": r["kind"], "error": r["error"]}
+                   for r in records if r["status"] != "ok"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", required=True, help="resume file or directory (.pdf/.docx/.txt)")
+    parser.add_argument("--jds", help="job description file or directory (.txt/.md/.pdf/.docx)")
+    parser.add_argument("--out", required=True, help="output directory; also holds checkpoint.jsonl and report.json")
+    parser.add_argument("--kinds", default="interview_questions,skill_highlights",
+                        help=f"comma-separated, of: {', '.join(GENERATIONS)}")
+    parser.add_argument("--to", choices=["dir", "sessions"], default="dir", help="write results as files or chat sessions")
+    parser.add_argument("--user-id", type=int, default=0, help="owner of the chat sessions and of the token spend")
+    parser.add_argument("--model", default=next(iter(CV_INTERVIEW_MODELS.values())),
+                        help=f"model id or name ({', '.join(CV_INTERVIEW_MODELS)})")
+    parser.add_argument("--temperature", type=float, default=0.3)
+    parser.add_argument("--concurrency", type=int, default=4, help="generations in flight")
+    parser.add_argument("--calls-per-minute", type=int, default=30, help="the runner's call rate (the app's is per user)")
+    parser.add_argument("--retries", type=int, default=3, help="retries after queue timeouts and provider 429s")
+    parser.add_argument("--no-match-analysis", dest="match_analysis", action="store_false",
+                        help="leave the local match analysis out of interview-question prompts")
+    args = parser.parse_args()
+
+    args.model = CV_INTERVIEW_MODELS.get(args.model, args.model)
+    if args.model not in CV_INTERVIEW_MODELS.values():
+        parser.error(f"unknown model: {args.model} (the CV tab's models: {', '.join(CV_INTERVIEW_MODELS.values())})")
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    unknown = set(kinds) - set(GENERATIONS)
+    if unknown:
+        parser.error(f"unknown kinds: {', '.join(sorted(unknown))}")
+    if "interview_questions" in kinds and not args.jds:
+        parser.error("--jds is required for interview_questions")
+    if args.to == "sessions":
+        if not args.user_id:
+            parser.error("--to sessions needs --user-id")
+        from auth.database import ensure_database
+        ensure_database()
+
+    # This process's own controller: the app's per-user call rate would hold a batch to a crawl
+    utils.admission._controller = AdmissionController(
+        max_concurrency=args.concurrency, user_calls=args.calls_per_minute, user_window=60
+    )
+
+    resumes = load_resumes(args.resumes)
+    jds = load_jds(args.jds) if args.jds else []
+    items = build_items(resumes, jds, kinds, args.model, args.temperature)
+    if not items:
+        sys.exit("Nothing to do: no readable resumes (or job descriptions)")
+
+    os.makedirs(args.out, exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(args.out, "checkpoint.jsonl"))
+    pending = [item for item in items if not checkpoint.finished(item["key"])]
+    skipped = len(items) - len(pending)
+    print(f"{len(resumes)} resumes × {len(jds)} job descriptions: {len(items)} items, "
+          f"{skipped} already done, {len(pending)} to run")
+
+    started = time.perf_counter()
+    try:
+        records = asyncio.run(run_all(pending, args, checkpoint))
+    finally:
+        checkpoint.close()
+    report = build_report(records, skipped, time.perf_counter() - started, args)
+    with open(os.path.join(args.out, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    latency = report["latency_ms"]
+    print(f"\n{report['completed']} done, {report['failed']} failed, {skipped} skipped in {report['wall_s']} s "
+          f"({report['throughput_per_min']} per min); latency p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+          f"max {latency['max']} ms; tokens {report['prompt_tokens']} in / {report['completion_tokens']} out")
+    sys.exit(1 if report["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Replay recorded LLM traffic against the AdmissionController in virtual time to tune its limits.
+
+Record traffic by running the app with LLM_TRAFFIC_LOG=traffic.jsonl, then e.g.:
+    python -m benchmarks.admission_sim traffic.jsonl --max-concurrency 2,4,8 --user-calls 5,10 --tpm 60000,120000
+Each combination of limits is simulated and summarised; --json writes the full results.
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+
+from utils.admission import AdmissionController
+from config import (
+    LLM_MAX_CONCURRENCY, MODEL_TPM_LIMITS, DEFAULT_MODEL_TPM, RATE_LIMIT_CALLS,
+    RATE_LIMIT_WINDOW, LLM_QUEUE_TIMEOUT
+)
+
+DEFAULT_LATENCY = 2.0  # seconds, for records without a measured latency
+
+
+class VirtualClock:
+    """Clock the controller reads; the simulator moves it forward"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def load_trace(path, speed=1.0):
+    """Read a traffic log into records with arrival times relative to the first call"""
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records.sort(key=lambda r: r["ts"])
+    if not records:
+        return []
+    start = records[0]["ts"]
+    for r in records:
+        r["arrival"] = (r["ts"] - start) / speed
+    return records
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def simulate(records, max_concurrency, user_calls, user_window, model_tpm, default_tpm, queue_timeout):
+    """Run one replay and return summary statistics"""
+    clock = VirtualClock()
+    controller = AdmissionController(max_concurrency=max_concurrency, model_tpm=model_tpm, default_tpm=default_tpm,
+                                     user_calls=user_calls, user_window=user_window, clock=clock)
+    seq = itertools.count()
+    completions = []   # heap of (finish_time, seq, ticket, tokens)
+    pending = {}       # ticket -> record
+    waits, user_waits = [], {}
+    timeouts = 0
+    max_queue = 0
+    i = 0
+
+    while i < len(records) or pending or completions:
+        candidates = []
+        if i < len(records):
+            candidates.append(records[i]["arrival"])
+        if completions:
+            candidates.append(completions[0][0])
+        if pending:
+            candidates.append(min(t.submitted for t in pending) + queue_timeout)
+            wakeup = controller.next_wakeup(clock.now)
+            if wakeup and wakeup != float("inf"):
+                # Step at least 1ms so float rounding in bucket refills cannot stall the clock
+                candidates.append(clock.now + max(wakeup, 1e-3))
+        clock.now = max(clock.now, min(candidates))
+        now = clock.now
+
+        while completions and completions[0][0] <= now:
+            _, _, ticket, tokens = heapq.heappop(completions)
+            controller.release(ticket, tokens, now=now)
+
+        while i < len(records) and records[i]["arrival"] <= now:
+            r = records[i]
+            ticket = controller.submit(r["user"], r["model"], r.get("est_tokens") or r.get("tokens") or 0, now=now)
+            pending[ticket] = r
+            i += 1
+
+        for ticket in [t for t in pending if now - t.submitted >= queue_timeout]:
+            controller.cancel(ticket)
+            del pending[ticket]
+            timeouts += 1
+
+        max_queue = max(max_queue, controller.queue_length())
+        for ticket in controller.poll(now=now):
+            r = pending.pop(ticket)
+            waits.append(ticket.waited)
+            user_waits.setdefault(str(ticket.user_id), []).append(ticket.waited)
+            latency = r.get("latency") or DEFAULT_LATENCY
+            tokens = r.get("tokens") or r.get("est_tokens") or 0
+            heapq.heappush(completions, (now + latency, next(seq), ticket, tokens))
+
+    makespan = clock.now or 1.0
+    return {
+        "max_concurrency": max_concurrency,
+        "user_calls": user_calls,
+        "user_window": user_window,
+        "requests": len(records),
+        "admitted": len(waits),
+        "timeouts": timeouts,
+        "makespan_s": round(makespan, 2),
+        "throughput_rpm": round(len(waits) / makespan * 60, 2),
+        "wait_p50_s": round(percentile(waits, 50), 3),
+        "wait_p95_s": round(percentile(waits, 95), 3),
+        "wait_max_s": round(max(waits) if waits else 0.0, 3),
+        "max_queue_length": max_queue,
+        "per_user_wait_p95_s": {u: round(percentile(w, 95), 3) for u, w in user_waits.items()},
+    }
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", help="JSONL traffic log recorded via LLM_TRAFFIC_LOG")
+    parser.add_argument("--max-concurrency", type=_int_list, default=[LLM_MAX_CONCURRENCY])
+    parser.add_argument("--user-calls", type=_int_list, default=[RATE_LIMIT_CALLS])
+    parser.add_argument("--user-window", type=int, default=RATE_LIMIT_WINDOW)
+    parser.add_argument("--tpm", type=_int_list, help="tokens-per-minute budget applied to every model (default: config)")
+    parser.add_argument("--queue-timeout", type=float, default=LLM_QUEUE_TIMEOUT)
+    parser.add_argument("--speed", type=float, default=1.0, help="replay faster (>1) or slower (<1) than recorded")
+    parser.add_argument("--json", help="write all results to this file")
+    args = parser.parse_args()
+
+    records = load_trace(args.trace, args.speed)
+    results = []
+    for concurrency, calls, tpm in itertools.product(args.max_concurrency, args.user_calls, args.tpm or [None]):
+        model_tpm = MODEL_TPM_LIMITS if tpm is None else {}
+        result = simulate(records, concurrency, calls, args.user_window, model_tpm,
+                          tpm or DEFAULT_MODEL_TPM, args.queue_timeout)
+        result["tpm"] = tpm or "config"
+        results.append(result)
+        print(f"concurrency={concurrency:<3} user_calls={calls:<3} tpm={result['tpm']:<7} admitted={result['admitted']}/{result['requests']} "
+              f"timeouts={result['timeouts']} wait p50={result['wait_p50_s']}s p95={result['wait_p95_s']}s "
+              f"max_queue={result['max_queue_length']} throughput={result['throughput_rpm']}/min")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
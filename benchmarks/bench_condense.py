@@ -0,0 +1,147 @@
+"""
+Token reduction and quality of resume condensation (utils/resume_condense.py).
+
+For every resume it compares the raw extracted text with the canonical form the CV prompts
+now use:
+- size: characters, the admission controller's ~4 chars/token estimate, and word/punctuation
+  pieces (closer to what a BPE tokenizer charges)
+- quality: share of the raw text's distinct words and numbers still present, whether every
+  email address and URL survived, and the sections found. Recall is a lower bound: heading
+  words replaced by canonical section names, rejoined hyphenation fragments and page numbers
+  all count as lost
+
+Without a corpus it generates --synthetic noisy multi-page resumes (page headers/footers,
+page numbers, Unicode bullets, whitespace runs, hyphenated line breaks):
+
+    python -m benchmarks.bench_condense ~/resumes --output bench/condense.json
+    python -m benchmarks.bench_condense --synthetic 20
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+
+_WORDS = re.compile(r"[a-z][a-z+#.]*[a-z+#]|[a-z]", re.IGNORECASE)
+_NUMBERS = re.compile(r"\d+(?:[.,]\d+)?")
+_CONTACTS = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+|https?://\S+|www\.\S+")
+_PIECES = re.compile(r"\w+|[^\w\s]|\n")
+
+SKILLS = ["Python", "SQL", "Spark", "Airflow", "Kafka", "AWS", "Docker", "Kubernetes", "Tableau", "Excel",
+          "Six Sigma", "Scrum", "React", "TypeScript", "Terraform", "PostgreSQL", "Pandas", "PyTorch"]
+VERBS = ["Led", "Built", "Designed", "Automated", "Migrated", "Reduced", "Delivered", "Owned", "Scaled"]
+BULLETS = ["•", "●", "▪", "-", "*", "–"]
+
+def synthetic_resume(rng, pages):
+    name = rng.choice(["Asha Rao", "Daniel Kim", "Maria Lopez", "Wei Zhang", "Omar Haddad"])
+    header = f"{name}  —  Curriculum   Vitae"
+    lines = [f"{name}", f"{name.split()[0].lower()}@example.com  |  +1 555 01{rng.randint(10, 99)}  |  "
+             f"https://linkedin.com/in/{name.split()[0].lower()}", "", "PROFESSIONAL  SUMMARY",
+             f"Engineer with {rng.randint(3, 15)} years of experi-", "ence in data platforms and analytics.", "",
+             "WORK EXPERIENCE"]
+    for job in range(rng.randint(3, 6)):
+        lines.append(f"{rng.choice(['Acme', 'Globex', 'Initech', 'Umbrella'])} Corp  ,  "
+                     f"{rng.choice(['Senior', 'Lead', ''])} Engineer   ({2010 + job * 2}–{2012 + job * 2})")
+        lines.append("Responsibilities:")
+        for _ in range(rng.randint(4, 8)):
+            lines.append(f"  {rng.choice(BULLETS)}   {rng.choice(VERBS)} {rng.choice(SKILLS)} pipelines serving "
+                         f"{rng.randint(2, 900)} users,   cutting   cost by {rng.randint(5, 60)}%")
+        lines.append("")
+    lines += ["TECHNICAL SKILLS", ", ".join(rng.sample(SKILLS, 8)), "", "EDUCATION",
+              f"B.Tech Computer Science, State University ({2008 + rng.randint(0, 4)})", "",
+              "CERTIFICATIONS", "AWS Certified Solutions Architect", ""]
+    per_page = max(1, len(lines) // pages + 1)
+    page_texts = []
+    for number, start in enumerate(range(0, len(lines), per_page), 1):
+        body = "\n".join(lines[start:start + per_page])
+        page_texts.append(f"{header}\n\n{body}\n\n\tPage {number} of {pages}   ")
+    return "\f".join(page_texts)
+
+def load_corpus(paths):
+    from utils import pdf_extract, docx_extract
+    documents = []
+    for path in paths:
+        candidates = [path] if os.path.isfile(path) else [
+            os.path.join(root, name) for root, _, names in os.walk(path) for name in names]
+        for candidate in sorted(candidates):
+            lower = candidate.lower()
+            if lower.endswith(".pdf"):
+                with open(candidate, "rb") as f:
+                    documents.append((candidate, pdf_extract.extract_text(f.read(), parallel=False)))
+            elif lower.endswith(".docx"):
+                documents.append((candidate, docx_extract.extract_text(candidate)))
+            elif lower.endswith(".txt"):
+                with open(candidate, encoding="utf-8", errors="replace") as f:
+                    documents.append((candidate, f.read()))
+    return documents
+
+def recall(pattern, raw, condensed):
+    wanted = {m.lower() for m in pattern.findall(raw)}
+    kept = {m.lower() for m in pattern.findall(condensed)}
+    return len(wanted & kept) / len(wanted) if wanted else 1.0
+
+def measure(name, raw):
+    from utils.resume_condense import condense
+    result = condense(raw)
+    condensed = result["text"]
+    pieces_before, pieces_after = len(_PIECES.findall(raw)), len(_PIECES.findall(condensed))
+    contacts = set(_CONTACTS.findall(raw))
+    return {
+        "document": name,
+        "chars": [len(raw), len(condensed)],
+        "est_tokens": [len(raw) // 4, len(condensed) // 4],
+        "pieces": [pieces_before, pieces_after],
+        "piece_reduction": round(1 - pieces_after / pieces_before, 3) if pieces_before else 0.0,
+        "char_reduction": round(1 - len(condensed) / len(raw), 3) if raw else 0.0,
+        "word_recall": round(recall(_WORDS, raw, condensed), 3),
+        "number_recall": round(recall(_NUMBERS, raw, condensed), 3),
+        "contacts_kept": all(contact in condensed for contact in contacts),
+        "sections": result["sections"],
+        "removed": result["removed"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="*", help="resume files or directories (.pdf/.docx/.txt)")
+    parser.add_argument("--synthetic", type=int, default=0, help="generated noisy resumes (default 12 without a corpus)")
+    parser.add_argument("--pages", type=int, default=3, help="pages per generated resume")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus) if args.corpus else []
+    rng = random.Random(args.seed)
+    synthetic = args.synthetic or (0 if documents else 12)
+    documents += [(f"synthetic_{i}", synthetic_resume(rng, args.pages)) for i in range(synthetic)]
+    if not documents:
+        sys.exit("No resumes found")
+
+    results = [measure(name, raw) for name, raw in documents]
+    for r in results:
+        print(f"{os.path.basename(r['document'])[:32]:<32} chars {r['chars'][0]:>6}->{r['chars'][1]:<6}"
+              f" pieces -{r['piece_reduction']:>5.1%}  words {r['word_recall']:.1%}  numbers {r['number_recall']:.1%}"
+              f"  contacts {'ok' if r['contacts_kept'] else 'LOST'}  sections={len(r['sections'])}")
+
+    summary = {
+        "documents": len(results),
+        "median_char_reduction": statistics.median(r["char_reduction"] for r in results),
+        "median_piece_reduction": statistics.median(r["piece_reduction"] for r in results),
+        "min_word_recall": min(r["word_recall"] for r in results),
+        "min_number_recall": min(r["number_recall"] for r in results),
+        "contacts_kept": sum(r["contacts_kept"] for r in results),
+    }
+    print(f"\nmedian reduction: {summary['median_char_reduction']:.1%} chars (~tokens at 4 chars/token), "
+          f"{summary['median_piece_reduction']:.1%} pieces; worst recall: words {summary['min_word_recall']:.1%}, "
+          f"numbers {summary['min_number_recall']:.1%}; contacts intact in {summary['contacts_kept']}/{len(results)}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"python": platform.python_version(), "summary": summary, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark for resume text extraction (utils/file_handler.py) and its content-hash cache
+(utils/extraction_cache.py) on a corpus of real PDF/DOCX/TXT files.
+
+For every document it reports the cold parse time, the cost of a memory-tier hit (hash of the
+bytes plus lookup) and, with --cache-dir, of a disk-tier hit after the memory tier is cleared.
+It then replays a workload where --users users each upload every document and trigger --reruns
+reruns with the file still in the uploader, and reports the overall hit rate.
+
+With --pdf-modes, every PDF is also parsed uncached by the old serial `text +=` loop, the
+page-streaming extractor in-process and the extractor with the process pool (utils/pdf_extract.py):
+
+    python -m benchmarks.bench_extraction ~/resumes /usr/share/doc --output bench/extraction.json
+    python -m benchmarks.bench_extraction ~/resumes --cache-dir /tmp/extraction-cache --users 20
+    PDF_WORKERS=4 python -m benchmarks.bench_extraction ~/portfolios --pdf-modes
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+
+SUFFIXES = (".pdf", ".docx", ".txt")
+
+class _Upload(io.BytesIO):
+    """Stands in for Streamlit's UploadedFile"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+        self.size = len(self.getvalue())
+
+def find_documents(paths, max_size):
+    documents = []
+    for path in paths:
+        if os.path.isfile(path):
+            candidates = [path]
+        else:
+            candidates = [os.path.join(root, name) for root, _, names in os.walk(path) for name in names]
+        documents += [p for p in candidates if p.lower().endswith(SUFFIXES) and 0 < os.path.getsize(p) <= max_size]
+    return sorted(set(documents))
+
+def timed_ms(fn, repeat=1):
+    """Median wall time of fn() over repeat calls, in milliseconds, and the last result"""
+    samples, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+def legacy_pdf_text(data):
+    """The extractor before page streaming: serial pages, quadratic string concatenation"""
+    import PyPDF2
+    text = ""
+    for page in PyPDF2.PdfReader(io.BytesIO(data)).pages:
+        text += page.extract_text()
+    return text
+
+def compare_pdf_modes(documents):
+    from config import PDF_WORKERS
+    from utils import pdf_extract
+    results = []
+    for path in documents:
+        if not path.lower().endswith(".pdf"):
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        record = {"file": path, "bytes": len(data)}
+        record["legacy_ms"] = round(timed_ms(lambda: legacy_pdf_text(data))[0], 1)
+        record["stream_ms"] = round(timed_ms(lambda: pdf_extract.extract_text(data, parallel=False))[0], 1)
+        if PDF_WORKERS > 0:
+            pdf_extract.get_pool()
+            record["pool_ms"] = round(timed_ms(lambda: pdf_extract.extract_text(data, parallel=True), repeat=3)[0], 1)
+        results.append(record)
+        print(f"{os.path.basename(path)[:40]:<40} legacy={record['legacy_ms']:>8.1f} ms  stream={record['stream_ms']:>8.1f} ms"
+              + (f"  pool({PDF_WORKERS})={record['pool_ms']:>8.1f} ms" if "pool_ms" in record else "  pool disabled (PDF_WORKERS=0)"))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="+", help="files or directories searched for .pdf/.docx/.txt documents")
+    parser.add_argument("--cache-dir", help="enable the disk tier in this directory (wiped first)")
+    parser.add_argument("--users", type=int, default=10, help="users uploading every document in the workload")
+    parser.add_argument("--reruns", type=int, default=20, help="reruns per upload with the file still attached")
+    parser.add_argument("--max-files", type=int, default=50)
+    parser.add_argument("--pdf-modes", action="store_true", help="also compare legacy, in-process and pool PDF parsing")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    if args.cache_dir:
+        shutil.rmtree(args.cache_dir, ignore_errors=True)
+        os.environ["EXTRACTION_CACHE_DIR"] = args.cache_dir
+    # config reads the environment on import
+    from config import MAX_FILE_SIZE
+    from utils import extraction_cache
+    from utils.file_handler import extract_text_from_file
+
+    documents = find_documents(args.corpus, MAX_FILE_SIZE)[:args.max_files]
+    if not documents:
+        sys.exit("No .pdf/.docx/.txt documents found in the corpus")
+
+    per_document = []
+    for path in documents:
+        upload = _Upload(path)
+        extraction_cache.clear()
+        cold_ms, text = timed_ms(lambda: extract_text_from_file(upload))
+        memory_ms, _ = timed_ms(lambda: extract_text_from_file(upload), repeat=5)
+        record = {"file": path, "bytes": upload.size, "chars": len(text or ""),
+                  "cold_ms": round(cold_ms, 2), "memory_hit_ms": round(memory_ms, 3)}
+        if args.cache_dir:
+            extraction_cache.clear()
+            record["disk_hit_ms"] = round(timed_ms(lambda: extract_text_from_file(upload))[0], 3)
+        per_document.append(record)
+        print(f"{os.path.basename(path)[:40]:<40} {upload.size / 1024:>8.0f}KB  cold={cold_ms:>8.1f} ms"
+              f"  memory_hit={memory_ms:>6.3f} ms"
+              + (f"  disk_hit={record['disk_hit_ms']:>6.2f} ms" if args.cache_dir else ""))
+
+    # Workload: every user uploads every document, then reruns the page with it attached
+    extraction_cache.clear()
+    uploads = [_Upload(path) for path in documents]
+    started = time.perf_counter()
+    for _ in range(args.users):
+        for upload in uploads:
+            for _ in range(args.reruns + 1):
+                extract_text_from_file(upload)
+    workload_s = time.perf_counter() - started
+    calls = args.users * len(uploads) * (args.reruns + 1)
+    uncached_s = sum(r["cold_ms"] for r in per_document) / 1000 * args.users * (args.reruns + 1)
+    stats = extraction_cache.stats()
+
+    pdf_modes = None
+    if args.pdf_modes:
+        print()
+        pdf_modes = compare_pdf_modes(documents)
+
+    print(f"\nworkload: {calls} extractions in {workload_s:.2f}s (uncached estimate {uncached_s:.1f}s),"
+          f" hit rate {stats['hit_rate']:.1%}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "documents": per_document,
+                "pdf_modes": pdf_modes,
+                "workload": {"users": args.users, "reruns": args.reruns, "calls": calls,
+                             "seconds": round(workload_s, 3), "uncached_estimate_seconds": round(uncached_s, 3),
+                             "cache": stats},
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Speed of local resume–JD match scoring (utils/match_score.py): one resume against many job
+descriptions, cold (skill/keyword profiles extracted) and warm (profiles cached).
+
+Job descriptions come from a directory of .txt files or are generated from the skill
+vocabulary (requirements, nice-to-haves, benefits and filler sentences):
+
+    python -m benchmarks.bench_match --jds 500
+    python -m benchmarks.bench_match --resume cv.pdf --jd-dir ~/jds --output bench/match.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+FILLER = [
+    "You will work closely with product and engineering to deliver measurable outcomes.",
+    "Our platform serves millions of customers across three continents.",
+    "We value ownership, curiosity and clear written communication.",
+    "The team ships weekly and owns its services end to end.",
+    "You will help shape the roadmap for our analytics and reporting capabilities.",
+]
+
+def synthetic_jd(rng, skills):
+    required = rng.sample(skills, rng.randint(5, 10))
+    preferred = rng.sample([s for s in skills if s not in required], rng.randint(2, 5))
+    title = rng.choice(["Data Engineer", "Backend Engineer", "ML Engineer", "Analytics Lead", "Platform Engineer"])
+    lines = [f"{rng.choice(['Senior', 'Staff', 'Lead', ''])} {title}".strip(), "", "About the role"]
+    lines += rng.sample(FILLER, 3) + ["", "Requirements:"]
+    lines += [f"- {rng.randint(2, 8)}+ years with {skill}" for skill in required]
+    lines += ["", "Nice to have:"] + [f"- {skill}" for skill in preferred]
+    lines += ["", "Benefits:", "- Remote work, equity and a learning budget"]
+    return "\n".join(lines)
+
+def load_text(path):
+    if path.lower().endswith((".pdf", ".docx")):
+        from utils import pdf_extract, docx_extract
+        if path.lower().endswith(".pdf"):
+            with open(path, "rb") as f:
+                return pdf_extract.extract_text(f.read(), parallel=False)
+        return docx_extract.extract_text(path)
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resume", help="resume file (.pdf/.docx/.txt); a generated one by default")
+    parser.add_argument("--jd-dir", help="directory of job description .txt files")
+    parser.add_argument("--jds", type=int, default=500, help="generated job descriptions (without --jd-dir)")
+    parser.add_argument("--repeats", type=int, default=5, help="warm runs")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    from utils import match_score
+    from utils.resume_condense import canonical_resume
+    from benchmarks.bench_condense import synthetic_resume
+
+    rng = random.Random(args.seed)
+    resume = load_text(args.resume) if args.resume else synthetic_resume(rng, 3)
+    resume = canonical_resume(resume)
+    if args.jd_dir:
+        names = sorted(n for n in os.listdir(args.jd_dir) if n.endswith(".txt"))
+        jds = [load_text(os.path.join(args.jd_dir, n)) for n in names]
+    else:
+        names = [f"synthetic_{i}" for i in range(args.jds)]
+        jds = [synthetic_jd(rng, match_score.SKILLS) for _ in names]
+    if not jds:
+        sys.exit("No job descriptions found")
+
+    match_score._cache.clear()
+    scores, cold = timed(match_score.score_many, resume, jds)
+    warm = [timed(match_score.score_many, resume, jds)[1] for _ in range(args.repeats)]
+    _, report_time = timed(match_score.match_report, resume, jds[int(scores["score"].argmax())])
+
+    print(f"{len(jds)} job descriptions, {sum(map(len, jds)) / 1024:.0f} KB")
+    print(f"cold (extract + score): {cold * 1000:8.1f} ms  ({cold / len(jds) * 1e6:.0f} us per JD)")
+    print(f"warm (cached profiles): {statistics.median(warm) * 1000:8.1f} ms  median of {len(warm)}")
+    print(f"one full report:        {report_time * 1000:8.2f} ms")
+    order = scores["score"].argsort()[::-1][:5]
+    print("best matches: " + ", ".join(f"{names[i]} ({scores['score'][i]:.0f})" for i in order))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "jds": len(jds),
+                "cold_ms": round(cold * 1000, 2),
+                "warm_ms": round(statistics.median(warm) * 1000, 2),
+                "report_ms": round(report_time * 1000, 3),
+                "scores": {name: float(score) for name, score in zip(names, scores["score"])},
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Benchmark suite for the persistence layer (auth/database.py, utils/chat_sessions.py, utils/memory.py).
+
+Seeds a dedicated database with users, sessions and messages, then measures latency and
+throughput of login, session listing (the query, and the session index once warm), message load,
+append and delete at several concurrency levels. Runs against SQLite and/or Postgres and writes
+machine-readable JSON:
+
+    python -m benchmarks.bench_persistence --db-url sqlite:////tmp/bench.db \\
+        --db-url postgresql://localhost/articulaite_bench --reset --output bench/persistence.json
+    python -m benchmarks.bench_persistence --db-url sqlite:////tmp/bench.db --compare bench/persistence.json
+
+Never point --reset at a database holding real data: it deletes every row.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from auth.database import get_connection, init_database, hash_password, login_user
+from utils.chat_sessions import (
+    create_chat_session, get_user_sessions, _query_user_sessions, get_session_messages, delete_session
+)
+from utils.memory import save_chat_message
+
+TAB_NAMES = ["CV Interview", "Code Explainer", "Article Generator", "Study Plan"]
+PASSWORD = "bench-password"
+OPERATIONS = ["login", "list_sessions", "list_sessions_cached", "load_messages", "append", "delete"]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def reset_tables():
+    conn = get_connection()
+    cursor = conn.cursor()
+    for table in ("llm_usage", "article_sections", "chat_history", "chat_sessions", "users"):
+        cursor.execute(f"DELETE FROM {table}")
+    conn.commit()
+    conn.close()
+
+
+def seed(users, sessions_per_user, messages_per_session, message_chars, rng):
+    """Bulk-insert the dataset over one connection; returns {user_id: [(session_id, tab_name), ...]}"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    password = hash_password(PASSWORD)
+    layout = {}
+    for u in range(users):
+        cursor.execute(
+            "INSERT INTO users (full_name, username, email, password) VALUES (%s, %s, %s, %s) RETURNING id",
+            (f"Bench User {u}", f"bench_user_{u}", f"bench_user_{u}@example.com", password))
+        user_id = cursor.fetchone()[0]
+        layout[user_id] = []
+        for s in range(sessions_per_user):
+            tab_name = TAB_NAMES[s % len(TAB_NAMES)]
+            cursor.execute(
+                "INSERT INTO chat_sessions (user_id, tab_name, session_title, first_message) VALUES (%s, %s, %s, %s) RETURNING id",
+                (user_id, tab_name, f"Session {s}", f"Session {s}"))
+            session_id = cursor.fetchone()[0]
+            layout[user_id].append((session_id, tab_name))
+            rows = [(user_id, session_id, tab_name, "user" if m % 2 == 0 else "assistant",
+                     "x" * rng.randint(message_chars // 2, message_chars * 3 // 2))
+                    for m in range(messages_per_session)]
+            cursor.executemany(
+                "INSERT INTO chat_history (user_id, session_id, tab_name, role, content) VALUES (%s, %s, %s, %s, %s)",
+                rows)
+        conn.commit()
+    conn.close()
+    return layout
+
+
+def make_operation(name, layout, rng_lock, rng, message_chars):
+    """Return (setup, call): setup runs untimed and returns the argument for the timed call"""
+    user_ids = list(layout)
+
+    def pick_session():
+        with rng_lock:
+            user_id = rng.choice(user_ids)
+            session_id, tab_name = rng.choice(layout[user_id])
+        return user_id, session_id, tab_name
+
+    if name == "login":
+        def setup():
+            with rng_lock:
+                return f"bench_user_{rng.randrange(len(user_ids))}"
+        return setup, lambda username: login_user(username, PASSWORD)
+    if name == "list_sessions":
+        def setup():
+            user_id, _, tab_name = pick_session()
+            return user_id, tab_name
+        # The listing query itself: get_user_sessions is served from the session index once warm
+        return setup, lambda args: _query_user_sessions(args[0], args[1], 10)
+    if name == "list_sessions_cached":
+        def setup():
+            user_id, _, tab_name = pick_session()
+            return user_id, tab_name
+        return setup, lambda args: get_user_sessions(args[0], tab_name=args[1], limit=10)
+    if name == "load_messages":
+        return lambda: pick_session()[1], get_session_messages
+    if name == "append":
+        return pick_session, lambda args: save_chat_message(args[0], args[1], args[2], "user", "y" * message_chars)
+    if name == "delete":
+        def setup():
+            user_id, _, tab_name = pick_session()
+            session_id = create_chat_session(user_id, tab_name, first_message="to delete")
+            save_chat_message(user_id, session_id, tab_name, "user", "to delete")
+            return session_id
+        return setup, delete_session
+    raise ValueError(name)
+
+
+def run_level(name, layout, concurrency, iterations, message_chars, seed_value):
+    rng, rng_lock = random.Random(seed_value), threading.Lock()
+    setup, call = make_operation(name, layout, rng_lock, rng, message_chars)
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def worker(n):
+        local = []
+        for _ in range(n):
+            arg = setup()
+            started = time.perf_counter()
+            try:
+                call(arg)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    per_worker = max(1, iterations // concurrency)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, [per_worker] * concurrency))
+    wall = time.perf_counter() - started
+    ms = [x * 1000 for x in latencies]
+    return {
+        "operation": name,
+        "concurrency": concurrency,
+        "calls": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "wall_s": round(wall, 4),
+        "throughput_ops_s": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ms) / len(ms), 3) if ms else 0.0,
+            "p50": round(percentile(ms, 50), 3),
+            "p95": round(percentile(ms, 95), 3),
+            "p99": round(percentile(ms, 99), 3),
+            "max": round(max(ms), 3) if ms else 0.0,
+        },
+    }
+
+
+def backend_name(url):
+    return "sqlite" if url.startswith("sqlite:///") else "postgres"
+
+
+def bench_backend(url, args):
+    os.environ["DATABASE_URL"] = url
+    init_database()
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM users")
+    existing = cursor.fetchone()[0]
+    conn.close()
+    if existing and not args.reset:
+        sys.exit(f"{url} already has {existing} users; use a dedicated database and pass --reset")
+    reset_tables()
+
+    started = time.perf_counter()
+    layout = seed(args.users, args.sessions_per_user, args.messages_per_session, args.message_chars,
+                  random.Random(args.seed))
+    print(f"[{backend_name(url)}] seeded in {time.perf_counter() - started:.1f}s")
+
+    results = []
+    for name in args.operations:
+        for concurrency in args.concurrency:
+            result = run_level(name, layout, concurrency, args.iterations, args.message_chars, args.seed)
+            result["backend"] = backend_name(url)
+            results.append(result)
+            lat = result["latency_ms"]
+            print(f"[{result['backend']}] {name:<20} c={concurrency:<3} {result['throughput_ops_s']:>9.1f} ops/s "
+                  f"p50={lat['p50']:.2f}ms p95={lat['p95']:.2f}ms errors={result['errors']}")
+    return results
+
+
+def compare(results, baseline_path):
+    """Print throughput and p95 change against a previous run"""
+    with open(baseline_path) as f:
+        baseline = {(r["backend"], r["operation"], r["concurrency"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for r in results:
+        old = baseline.get((r["backend"], r["operation"], r["concurrency"]))
+        if not old or not old["throughput_ops_s"] or not old["latency_ms"]["p95"]:
+            continue
+        tput = (r["throughput_ops_s"] / old["throughput_ops_s"] - 1) * 100
+        p95 = (r["latency_ms"]["p95"] / old["latency_ms"]["p95"] - 1) * 100
+        print(f"[{r['backend']}] {r['operation']:<14} c={r['concurrency']:<3} throughput {tput:+6.1f}%  p95 {p95:+6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", action="append", required=True, help="sqlite:///path or postgresql://... (repeatable)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--sessions-per-user", type=int, default=20)
+    parser.add_argument("--messages-per-session", type=int, default=30)
+    parser.add_argument("--message-chars", type=int, default=800)
+    parser.add_argument("--concurrency", type=lambda v: [int(x) for x in v.split(",")], default=[1, 4, 16])
+    parser.add_argument("--iterations", type=int, default=200, help="calls per operation and concurrency level")
+    parser.add_argument("--operations", type=lambda v: v.split(","), default=OPERATIONS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="wipe existing rows before seeding")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    results = []
+    for url in args.db_url:
+        results.extend(bench_backend(url, args))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "users": args.users,
+            "sessions_per_user": args.sessions_per_user,
+            "messages_per_session": args.messages_per_session,
+            "message_chars": args.message_chars,
+            "iterations": args.iterations,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""
+End-to-end rerun latency benchmark for app.py using streamlit.testing.v1.AppTest.
+
+Logs in against a seeded database and walks scripted interactions (switch tab, load a session
+from the library, send a chat message, generate) with the fake LLM server standing in for Groq.
+Every step reports the wall time of its rerun, the DB connections and LLM calls it caused and
+the bytes of ForwardMsgs sent to the browser. Chat turns and library clicks rerun only their
+st.fragment panes, as they would in a browser.
+
+    python -m benchmarks.bench_rerun --messages-per-session 40 --output bench/rerun.json
+    python -m benchmarks.bench_rerun --sessions 1,2,4,8,16 --duration 20   # saturation sweep
+
+With --sessions, N threads each drive their own AppTest session for --duration seconds; the
+saturation point is the last level before adding sessions stops raising rerun throughput.
+Run with TAB_NAVIGATION=tabs to measure the legacy st.tabs layout that executes every tab.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+import auth.database
+from utils import warmup
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+TABS = {
+    "cv_interview": "CV Interview",
+    "code_explainer": "Code Explainer",
+    "article_generator": "Article Generator",
+    "study_plan": "Study Plan",
+}
+CHAT_INPUT_KEYS = {
+    "cv_interview": "cv_chat_input",
+    "code_explainer": "code_chat_input",
+    "article_generator": "article_chat_input",
+    "study_plan": "study_chat_input",
+}
+TOOL_LABELS = {
+    "cv_interview": "📄👔 CV & Interview",
+    "code_explainer": "👨‍💻⚛ Code Explainer",
+    "article_generator": "✒️📜 Article Generator",
+    "study_plan": "📋🗓️ Study Plan",
+}
+DEFAULT_STEPS = ["login"] + [f"{action}:{tab}" for tab in TABS for action in ("switch", "load_session", "chat", "generate")]
+SAMPLE_CODE = "def fib(n):\n    a, b = 0, 1\n    for _ in range(n):\n        a, b = b, a + b\n    return a\n"
+SAMPLE_JD = "Backend Engineer\n\nRequirements:\n- Python, SQL and AWS\n- Docker and Kubernetes\n\nNice to have:\n- Kafka\n"
+
+
+class DBCallCounter:
+    """Counts get_connection() calls by wrapping it in auth.database before the app imports it"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        original = auth.database.get_connection
+
+        def counted_get_connection():
+            with self.lock:
+                self.count += 1
+            return original()
+
+        auth.database.get_connection = counted_get_connection
+
+    def value(self):
+        with self.lock:
+            return self.count
+
+
+class PayloadCounter:
+    """Sums the size of every ForwardMsg a script run queues for the browser, i.e. what goes over the websocket"""
+
+    def __init__(self):
+        from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+        self.lock = threading.Lock()
+        self.bytes = 0
+        original = ForwardMsgQueue.enqueue
+
+        def counted_enqueue(queue, msg):
+            with self.lock:
+                self.bytes += msg.ByteSize()
+            return original(queue, msg)
+
+        ForwardMsgQueue.enqueue = counted_enqueue
+
+    def take(self):
+        """Bytes queued since the last call"""
+        with self.lock:
+            value, self.bytes = self.bytes, 0
+        return value
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+class AppSession:
+    """One simulated browser session driving app.py through AppTest"""
+
+    def __init__(self, username, password, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.username = username
+        self.password = password
+
+    def _button(self, key=None, label=None, prefix=None):
+        for button in self.at.button:
+            if (key and button.key == key) or (label and button.label == label) or \
+                    (prefix and button.key and button.key.startswith(prefix)):
+                return button
+        return None
+
+    def _select_tool(self, tab_key):
+        """Pick the tool in the router; returns False under TAB_NAVIGATION=tabs (no router)"""
+        for radio in self.at.radio:
+            if radio.key == "active_tool":
+                if radio.value == TOOL_LABELS[tab_key]:
+                    return False
+                radio.set_value(TOOL_LABELS[tab_key])
+                return True
+        return False
+
+    def sync(self):
+        """
+        After a fragment-only rerun the element tree holds just those fragments; do an untimed
+        full rerun so the next step can find widgets anywhere on the page
+        """
+        logged_in = "logged_in" in self.at.session_state and self.at.session_state["logged_in"]
+        if logged_in and self._button(key="profile_btn") is None:
+            self.at.run()
+
+    def run_step(self, step):
+        """Perform one scripted interaction; returns False if the step could not be performed"""
+        at = self.at
+        action, _, tab_key = step.partition(":")
+        if action in ("load_session", "chat", "generate") and self._select_tool(tab_key):
+            # The tool's widgets only exist once it is the active one
+            at.run()
+        if action == "login":
+            at.run()
+            at.text_input(key="login_username").set_value(self.username)
+            at.text_input(key="login_password").set_value(self.password)
+            self._button(label="🚀 Login").click()
+        elif action == "switch":
+            # With st.tabs (TAB_NAVIGATION=tabs) switching is client-side and this is a plain rerun
+            self._select_tool(tab_key)
+        elif action == "load_session":
+            button = self._button(prefix=f"load_{tab_key}_")
+            if button is None:
+                return False
+            button.click()
+        elif action == "chat":
+            at.chat_input(key=CHAT_INPUT_KEYS[tab_key]).set_value("Can you expand on the second point?")
+        elif action == "generate":
+            if tab_key == "cv_interview":
+                # AppTest cannot drive st.file_uploader, so inject the extracted resume
+                at.session_state["resume_text"] = "Senior Python developer. Skills: Python, SQL, AWS. " * 20
+                at.text_area(key="cv_job_description").set_value(SAMPLE_JD)
+                self._button(key="cv_gen_questions").click()
+            elif tab_key == "code_explainer":
+                at.text_area(key="code_input").set_value(SAMPLE_CODE)
+                self._button(key="code_explain").click()
+            elif tab_key == "article_generator":
+                at.text_input(key="article_topic").set_value("Caching strategies for web apps")
+                self._button(key="article_generate").click()
+            elif tab_key == "study_plan":
+                at.text_input(key="study_subject").set_value("Linear algebra")
+                self._button(key="study_generate").click()
+        elif action != "rerun":
+            raise ValueError(f"Unknown step: {step}")
+        at.run()
+        return True
+
+    def errors(self):
+        return [str(e.value) for e in self.at.exception] + [str(e.value) for e in self.at.error]
+
+
+def install_shared_runtime():
+    """
+    AppTest installs a mock Runtime singleton per run and clears it afterwards, which breaks
+    when several AppTests run in parallel threads. Install one shared mock runtime (one cache
+    and media store, like a real server process) and make AppTest's per-run swaps no-ops.
+    """
+    from unittest.mock import MagicMock
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import app_test
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+
+    class _IgnoredRuntimeSwaps:
+        _instance = None
+
+    app_test.Runtime = _IgnoredRuntimeSwaps
+
+
+def lift_rate_limits():
+    """The benchmark measures rerun cost, not the admission queue"""
+    import utils.admission
+    utils.admission._controller = utils.admission.AdmissionController(
+        max_concurrency=1000, model_tpm={}, default_tpm=10 ** 12, user_calls=10 ** 9, user_window=1)
+
+
+def run_scripted(args, db_counter, llm_server, payload_counter):
+    session = AppSession("bench_user_0", args.password, args.timeout)
+    records = []
+    for step in args.steps:
+        db_before, llm_before = db_counter.value(), llm_server.stats.snapshot()["requests"]
+        session.sync()
+        payload_counter.take()
+        started = time.perf_counter()
+        performed = session.run_step(step)
+        wall_ms = (time.perf_counter() - started) * 1000
+        payload = payload_counter.take()
+        record = {
+            "step": step,
+            "performed": performed,
+            "wall_ms": round(wall_ms, 2),
+            "db_calls": db_counter.value() - db_before,
+            "llm_calls": llm_server.stats.snapshot()["requests"] - llm_before,
+            "payload_bytes": payload,
+            "errors": session.errors(),
+        }
+        records.append(record)
+        if step == "login":
+            # The first run started the process warmup; later steps measure a warm process
+            warmup.wait(60)
+        print(f"{step:<32} {record['wall_ms']:>9.1f} ms  db={record['db_calls']:<4} llm={record['llm_calls']:<3}"
+              f" payload={payload / 1024:>7.1f}KB"
+              f"{'  (skipped)' if not performed else ''}{'  ERR ' + record['errors'][0][:60] if record['errors'] else ''}")
+    return records
+
+
+def run_concurrent(args, n_sessions, db_counter, llm_server):
+    loop_steps = [s for s in args.steps if s != "login"] or ["rerun"]
+    latencies, lock = [], threading.Lock()
+    failures = []
+    deadline_holder = {}
+    barrier = threading.Barrier(n_sessions + 1)
+
+    def worker(index):
+        try:
+            session = AppSession(f"bench_user_{index % args.users}", args.password, args.timeout)
+            session.run_step("login")
+            warmup.wait(60)
+        except Exception as e:
+            failures.append(str(e))
+            barrier.wait()
+            return
+        barrier.wait()
+        local, i = [], 0
+        while time.perf_counter() < deadline_holder["deadline"]:
+            session.sync()
+            started = time.perf_counter()
+            try:
+                session.run_step(loop_steps[i % len(loop_steps)])
+            except Exception as e:
+                failures.append(str(e))
+            local.append(time.perf_counter() - started)
+            i += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(n_sessions)]
+    for t in threads:
+        t.start()
+    deadline_holder["deadline"] = float("inf")
+    barrier.wait()
+    db_before, llm_before = db_counter.value(), llm_server.stats.snapshot()["requests"]
+    started = time.perf_counter()
+    deadline_holder["deadline"] = started + args.duration
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    ms = [x * 1000 for x in latencies]
+    reruns = len(ms)
+    return {
+        "sessions": n_sessions,
+        "reruns": reruns,
+        "failures": len(failures),
+        "first_failure": failures[0] if failures else None,
+        "throughput_reruns_s": round(reruns / wall, 2) if wall else 0.0,
+        "wall_ms": {"p50": round(percentile(ms, 50), 1), "p95": round(percentile(ms, 95), 1),
+                    "max": round(max(ms), 1) if ms else 0.0},
+        "db_calls_per_rerun": round((db_counter.value() - db_before) / reruns, 2) if reruns else 0.0,
+        "llm_calls": llm_server.stats.snapshot()["requests"] - llm_before,
+    }
+
+
+def saturation_point(levels):
+    """Last level before throughput stopped growing by >= 10% (None if it never stopped)"""
+    for previous, current in zip(levels, levels[1:]):
+        if current["throughput_reruns_s"] < previous["throughput_reruns_s"] * 1.10:
+            return previous["sessions"]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", help="database to seed (default: a temporary SQLite file)")
+    parser.add_argument("--reset", action="store_true", help="required with --db-url: wipes existing rows")
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--sessions-per-user", type=int, default=20)
+    parser.add_argument("--messages-per-session", type=int, default=20)
+    parser.add_argument("--message-chars", type=int, default=1500)
+    parser.add_argument("--steps", type=lambda v: v.split(","), default=DEFAULT_STEPS,
+                        help="comma-separated: login, rerun, switch:<tab>, load_session:<tab>, chat:<tab>, generate:<tab>")
+    parser.add_argument("--sessions", type=lambda v: [int(x) for x in v.split(",")],
+                        help="concurrent session levels for the saturation sweep")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per concurrency level")
+    parser.add_argument("--llm-latency", default="fixed:0.05", help="fake LLM time-to-first-token distribution")
+    parser.add_argument("--timeout", type=float, default=120.0, help="AppTest timeout per rerun")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    db_counter = DBCallCounter()
+    from benchmarks.bench_persistence import seed, reset_tables, PASSWORD, git_commit
+    from benchmarks.fake_llm_server import start_fake_server, FakeLLMConfig
+    import random
+
+    if args.db_url and not args.reset:
+        sys.exit("--db-url requires --reset (the database is wiped and reseeded)")
+    db_url = args.db_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="articulaite-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = db_url
+    auth.database.init_database()
+    reset_tables()
+    seed(args.users, args.sessions_per_user, args.messages_per_session, args.message_chars, random.Random(42))
+    args.password = PASSWORD
+
+    llm_server, llm_url = start_fake_server(FakeLLMConfig(latency=args.llm_latency, tokens_per_sec=0))
+    os.environ["GROQ_API_BASE"] = llm_url
+    os.environ["GROQ_API_KEY"] = "fake"
+    lift_rate_limits()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "users": args.users,
+            "sessions_per_user": args.sessions_per_user,
+            "messages_per_session": args.messages_per_session,
+            "message_chars": args.message_chars,
+            "llm_latency": args.llm_latency,
+        },
+    }
+    if args.sessions:
+        install_shared_runtime()
+        levels = []
+        for n in args.sessions:
+            level = run_concurrent(args, n, db_counter, llm_server)
+            levels.append(level)
+            print(f"sessions={n:<3} {level['throughput_reruns_s']:>7.2f} reruns/s  p50={level['wall_ms']['p50']}ms "
+                  f"p95={level['wall_ms']['p95']}ms  db/rerun={level['db_calls_per_rerun']} failures={level['failures']}")
+            if level["first_failure"]:
+                print(f"    first failure: {level['first_failure'][:200]}")
+        report["concurrency"] = levels
+        report["saturation_sessions"] = saturation_point(levels)
+        if report["saturation_sessions"]:
+            print(f"Saturation at ~{report['saturation_sessions']} concurrent sessions")
+        else:
+            print("Not saturated at the highest level; try more sessions")
+    else:
+        report["steps"] = run_scripted(args, db_counter, llm_server, PayloadCounter())
+
+    llm_server.shutdown()
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Throughput of the generation core (services/) without the UI: prompt building per request
+type, then the same mixed request set through generate() one by one and generate_batch()
+at rising concurrency, against the in-process fake LLM server.
+
+    python -m benchmarks.bench_services --requests 40 --concurrency 1,4,16
+    python -m benchmarks.bench_services --llm-latency lognormal:-1.0,0.5 --output bench/services.json
+
+Admission limits are lifted, as in bench_rerun, so the numbers are the core's own overhead
+plus the fake server's latency.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import time
+
+import streamlit.logger
+streamlit.logger.set_log_level("error")
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+def build_requests(count, rng):
+    from services.cv import CVAnalysisRequest
+    from services.code import CodeActionRequest
+    from services.article import ArticleRequest
+    from services.study import StudyPlanRequest
+    from benchmarks.bench_condense import synthetic_resume
+    from utils.resume_condense import canonical_resume
+
+    resume = canonical_resume(synthetic_resume(rng, 2))
+    code = "\n".join(f"def f{i}(xs):\n    return [x * {i} for x in xs if x % {i + 2}]" for i in range(20))
+    makers = [
+        lambda: CVAnalysisRequest(rng.choice(["interview_questions", "skill_highlights"]), resume, "bench-model", 0.3, 1,
+                                  job_description="Data Engineer\nRequirements:\n- Python\n- SQL\n- Airflow"),
+        lambda: CodeActionRequest(rng.choice(["explain", "debug", "optimize"]), code, "bench-model", 0.2, 1),
+        lambda: ArticleRequest(f"Topic {rng.randint(1, 999)}", "bench-model", 0.3, 1, word_count=1200),
+        lambda: StudyPlanRequest(f"Subject {rng.randint(1, 999)}", "bench-model", 0.2, 1, duration_weeks=6),
+    ]
+    return [makers[i % len(makers)]() for i in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40, help="mixed requests per run")
+    parser.add_argument("--concurrency", type=lambda v: [int(x) for x in v.split(",")], default=[1, 4, 16],
+                        help="comma-separated generate_batch concurrency levels")
+    parser.add_argument("--llm-latency", default="fixed:0.05", help="fake LLM time-to-first-token distribution")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    from benchmarks.fake_llm_server import start_fake_server, FakeLLMConfig
+    server, url = start_fake_server(FakeLLMConfig(latency=args.llm_latency, tokens_per_sec=0))
+    os.environ["GROQ_API_BASE"] = url
+    os.environ["GROQ_API_KEY"] = "fake"
+
+    import utils.admission
+    from services.base import generate, generate_batch
+    utils.admission._controller = utils.admission.AdmissionController(
+        max_concurrency=1000, model_tpm={}, default_tpm=10 ** 12, user_calls=10 ** 9, user_window=1)
+
+    requests = build_requests(args.requests, random.Random(args.seed))
+    report = {"python": platform.python_version(), "requests": len(requests), "llm_latency": args.llm_latency,
+              "prompt_us": {}, "runs": {}}
+
+    by_type = {}
+    for request in requests:
+        started = time.perf_counter()
+        request.prompt()
+        by_type.setdefault(type(request).__name__, []).append((time.perf_counter() - started) * 1e6)
+    for name, times in sorted(by_type.items()):
+        report["prompt_us"][name] = round(statistics.median(times), 1)
+        print(f"prompt {name:<20} {statistics.median(times):8.1f} us")
+
+    generate(requests[0])  # client and connection warm-up
+    runs = [("sequential", None)] + [(f"batch x{c}", c) for c in args.concurrency]
+    for label, concurrency in runs:
+        started = time.perf_counter()
+        if concurrency is None:
+            results = [generate(request) for request in requests]
+        else:
+            results = generate_batch(requests, concurrency=concurrency)
+        wall = time.perf_counter() - started
+        failed = [r for r in results if isinstance(r, Exception)]
+        latencies = [r.latency_ms for r in results if not isinstance(r, Exception)]
+        report["runs"][label] = {
+            "wall_s": round(wall, 3),
+            "per_second": round(len(requests) / wall, 2),
+            "p50_ms": percentile(latencies, 0.5) if latencies else None,
+            "p95_ms": percentile(latencies, 0.95) if latencies else None,
+            "failed": len(failed),
+        }
+        run = report["runs"][label]
+        print(f"{label:<12} {wall:7.2f} s  {run['per_second']:7.1f} req/s  p50={run['p50_ms']} ms  "
+              f"p95={run['p95_ms']} ms  failed={len(failed)}")
+    server.shutdown()
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
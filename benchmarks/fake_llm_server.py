@@ -0,0 +1,386 @@
+"""
+Local Groq/OpenAI-compatible stand-in server for offline benchmarks and load tests.
+
+Point the app (or any ChatGroq client) at it with:
+    GROQ_API_BASE=http://127.0.0.1:8900 GROQ_API_KEY=fake streamlit run app.py
+
+Modes:
+- synthetic (default): generated completions with configurable latency, token rate and error injection
+- record: proxy each request to the real API once and append the exchange to a cassette file
+- replay: serve responses from a cassette deterministically (same request -> same response)
+
+Examples:
+    python -m benchmarks.fake_llm_server --latency lognormal:-1.0,0.5 --tokens-per-sec 300 --error-rate 0.02
+    python -m benchmarks.fake_llm_server --mode record --cassette cassettes/tabs.jsonl
+    python -m benchmarks.fake_llm_server --mode replay --cassette cassettes/tabs.jsonl
+
+GET /stats returns call counters, POST /stats/reset clears them.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GROQ_UPSTREAM = "https://api.groq.com"
+COMPLETIONS_PATHS = ("/openai/v1/chat/completions", "/v1/chat/completions")
+
+WORDS = (
+    "analysis design system model data performance interview skill project learning plan article "
+    "section example result impact team process quality review optimize explain structure method "
+    "context value strategy resource practice evidence outcome framework approach detail"
+).split()
+
+
+def parse_distribution(spec):
+    """'fixed:0.5', 'uniform:0.2,1.5', 'normal:1.0,0.3' or 'lognormal:mu,sigma' -> sampler(rng)"""
+    kind, _, args = spec.partition(":")
+    params = [float(p) for p in args.split(",") if p]
+    if kind == "fixed":
+        return lambda rng: params[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(params[0], params[1])
+    raise ValueError(f"Unknown distribution: {spec}")
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def request_key(body):
+    """Stable cassette key: everything that shapes the answer, not transport flags"""
+    relevant = {k: body.get(k) for k in ("model", "messages", "temperature", "max_tokens", "top_p", "stop")}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode()).hexdigest()
+
+
+class FakeLLMConfig:
+    """Behaviour of the fake server; see the module docstring for the CLI equivalents"""
+
+    def __init__(self, mode="synthetic", latency="fixed:0.2", tokens_per_sec=250.0, completion_tokens="uniform:200,600",
+                 error_rate=0.0, error_codes=(429, 500, 503), cassette=None, upstream=GROQ_UPSTREAM,
+                 replay_latency="recorded", seed=0):
+        self.mode = mode
+        self.latency = parse_distribution(latency)
+        self.tokens_per_sec = tokens_per_sec
+        self.completion_tokens = parse_distribution(completion_tokens)
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.cassette = cassette
+        self.upstream = upstream.rstrip("/")
+        self.replay_latency = replay_latency
+        self.seed = seed
+
+
+class Cassette:
+    """Append-only JSONL of recorded exchanges, indexed by request key"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.served = {}
+        self.lock = threading.Lock()
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries.setdefault(entry["key"], []).append(entry)
+        except FileNotFoundError:
+            pass
+
+    def record(self, key, request, response, status, elapsed):
+        entry = {"key": key, "request": request, "status": status, "response": response, "elapsed": elapsed}
+        with self.lock:
+            self.entries.setdefault(key, []).append(entry)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def lookup(self, key):
+        """N-th identical request gets the N-th recording (cycling), so replays are deterministic"""
+        with self.lock:
+            entries = self.entries.get(key)
+            if not entries:
+                return None
+            n = self.served.get(key, 0)
+            self.served[key] = n + 1
+            return entries[n % len(entries)]
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.data = {"requests": 0, "streamed": 0, "errors": 0, "replay_misses": 0,
+                         "prompt_tokens": 0, "completion_tokens": 0, "by_model": {}}
+
+    def add(self, model, prompt_tokens=0, completion_tokens=0, streamed=False, error=False, miss=False):
+        with self.lock:
+            d = self.data
+            d["requests"] += 1
+            d["streamed"] += int(streamed)
+            d["errors"] += int(error)
+            d["replay_misses"] += int(miss)
+            d["prompt_tokens"] += prompt_tokens
+            d["completion_tokens"] += completion_tokens
+            d["by_model"][model] = d["by_model"].get(model, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.data))
+
+
+def synthetic_text(rng, n_tokens):
+    """Markdown-ish filler of roughly n_tokens tokens"""
+    words, parts = 0, []
+    section = 1
+    while words < n_tokens * 3 // 4:
+        if words % 120 == 0:
+            parts.append(f"\n\n## Section {section}\n\n")
+            section += 1
+        sentence = " ".join(rng.choice(WORDS) for _ in range(12))
+        parts.append(sentence.capitalize() + ". ")
+        words += 12
+    return "".join(parts).strip()
+
+
+def completion_body(model, content, prompt_tokens, completion_tokens, elapsed):
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "queue_time": 0.0,
+        "prompt_time": 0.0,
+        "completion_time": elapsed,
+        "total_time": elapsed,
+    }
+    return {
+        "id": f"chatcmpl-fake-{hashlib.md5(content.encode()).hexdigest()[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "system_fingerprint": "fake",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                     "logprobs": None, "finish_reason": "stop"}],
+        "usage": usage,
+        "x_groq": {"id": "req_fake"},
+    }
+
+
+def make_handler(config, stats, cassette):
+    occurrences = {}
+    occurrences_lock = threading.Lock()
+
+    def occurrence(key):
+        with occurrences_lock:
+            occurrences[key] = occurrences.get(key, 0) + 1
+            return occurrences[key]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        # --- plumbing ---
+        def _send_json(self, status, payload, headers=None):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_error(self, status, message):
+            headers = {"retry-after": "1"} if status == 429 else None
+            self._send_json(status, {"error": {"message": message, "type": "fake_error", "code": str(status)}}, headers)
+
+        def _stream(self, model, content, prompt_tokens, completion_tokens, ttft, tokens_per_sec):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            base = {"id": "chatcmpl-fake-stream", "object": "chat.completion.chunk",
+                    "created": int(time.time()), "model": model, "system_fingerprint": "fake"}
+            time.sleep(ttft)
+            words = content.split(" ")
+            step = max(1, len(words) // 50)
+            for i in range(0, len(words), step):
+                piece = " ".join(words[i:i + step]) + (" " if i + step < len(words) else "")
+                chunk = dict(base, choices=[{"index": 0, "delta": {"role": "assistant", "content": piece},
+                                             "logprobs": None, "finish_reason": None}])
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                if tokens_per_sec:
+                    time.sleep(estimate_tokens(piece) / tokens_per_sec)
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                     "total_tokens": prompt_tokens + completion_tokens}
+            final = dict(base, choices=[{"index": 0, "delta": {}, "logprobs": None, "finish_reason": "stop"}],
+                         usage=usage, x_groq={"id": "req_fake", "usage": usage})
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+            self.wfile.flush()
+
+        # --- routes ---
+        def do_GET(self):
+            if self.path == "/stats":
+                self._send_json(200, stats.snapshot())
+            elif self.path.endswith("/models"):
+                self._send_json(200, {"object": "list", "data": []})
+            else:
+                self._send_error(404, "not found")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            if self.path == "/stats/reset":
+                stats.reset()
+                self._send_json(200, {"ok": True})
+                return
+            if self.path not in COMPLETIONS_PATHS:
+                self._send_error(404, "not found")
+                return
+            body = json.loads(raw or b"{}")
+            if config.mode == "record":
+                self._record(body)
+            elif config.mode == "replay":
+                self._replay(body)
+            else:
+                self._synthetic(body)
+
+        def _synthetic(self, body):
+            model = body.get("model", "fake")
+            key = request_key(body)
+            rng = random.Random(f"{config.seed}:{key}:{occurrence(key)}")
+            prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in body.get("messages", []))
+            if config.error_rate and rng.random() < config.error_rate:
+                stats.add(model, prompt_tokens, error=True)
+                time.sleep(config.latency(rng))
+                self._send_error(rng.choice(config.error_codes), "injected error")
+                return
+            n_tokens = int(config.completion_tokens(rng))
+            if body.get("max_tokens"):
+                n_tokens = min(n_tokens, int(body["max_tokens"]))
+            content = synthetic_text(rng, n_tokens)
+            completion_tokens = estimate_tokens(content)
+            ttft = config.latency(rng)
+            stats.add(model, prompt_tokens, completion_tokens, streamed=bool(body.get("stream")))
+            if body.get("stream"):
+                self._stream(model, content, prompt_tokens, completion_tokens, ttft, config.tokens_per_sec)
+                return
+            generation = completion_tokens / config.tokens_per_sec if config.tokens_per_sec else 0.0
+            time.sleep(ttft + generation)
+            self._send_json(200, completion_body(model, content, prompt_tokens, completion_tokens, ttft + generation))
+
+        def _record(self, body):
+            upstream_body = dict(body, stream=False)
+            upstream_body.pop("stream_options", None)
+            request = urllib.request.Request(
+                config.upstream + COMPLETIONS_PATHS[0], data=json.dumps(upstream_body).encode(), method="POST",
+                headers={"Content-Type": "application/json", "Authorization": self.headers.get("Authorization", "")})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=300) as resp:
+                    status, payload = resp.status, json.loads(resp.read())
+            except urllib.error.HTTPError as e:
+                status, payload = e.code, json.loads(e.read() or b"{}")
+            elapsed = time.perf_counter() - started
+            cassette.record(request_key(body), body, payload, status, elapsed)
+            self._serve_recorded(body, status, payload, latency=0.0)
+
+        def _replay(self, body):
+            entry = cassette.lookup(request_key(body))
+            model = body.get("model", "fake")
+            if entry is None:
+                stats.add(model, miss=True, error=True)
+                self._send_error(404, "request not found in cassette")
+                return
+            if config.replay_latency == "recorded":
+                latency = entry["elapsed"]
+            elif config.replay_latency == "none":
+                latency = 0.0
+            else:
+                latency = parse_distribution(config.replay_latency)(random.Random(entry["key"]))
+            self._serve_recorded(body, entry["status"], entry["response"], latency)
+
+        def _serve_recorded(self, body, status, payload, latency):
+            model = body.get("model", "fake")
+            if status != 200:
+                stats.add(model, error=True)
+                time.sleep(latency)
+                self._send_json(status, payload)
+                return
+            usage = payload.get("usage", {})
+            content = payload["choices"][0]["message"]["content"] or ""
+            stats.add(model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0),
+                      streamed=bool(body.get("stream")))
+            if body.get("stream"):
+                self._stream(model, content, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0),
+                             latency, tokens_per_sec=None)
+                return
+            time.sleep(latency)
+            self._send_json(200, payload)
+
+    return Handler
+
+
+def start_fake_server(config=None, host="127.0.0.1", port=0):
+    """Start the server on a background thread; returns (server, base_url). Call server.shutdown() to stop."""
+    config = config or FakeLLMConfig()
+    if config.mode in ("record", "replay") and not config.cassette:
+        raise ValueError(f"--cassette is required in {config.mode} mode")
+    cassette = Cassette(config.cassette) if config.cassette else None
+    stats = Stats()
+    server = ThreadingHTTPServer((host, port), make_handler(config, stats, cassette))
+    server.daemon_threads = True
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--mode", choices=["synthetic", "record", "replay"], default="synthetic")
+    parser.add_argument("--latency", default="fixed:0.2", help="time-to-first-token distribution")
+    parser.add_argument("--tokens-per-sec", type=float, default=250.0)
+    parser.add_argument("--completion-tokens", default="uniform:200,600", help="completion length distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-codes", default="429,500,503")
+    parser.add_argument("--cassette", help="JSONL cassette file for record/replay")
+    parser.add_argument("--upstream", default=GROQ_UPSTREAM)
+    parser.add_argument("--replay-latency", default="recorded", help="'recorded', 'none' or a distribution")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(
+        mode=args.mode, latency=args.latency, tokens_per_sec=args.tokens_per_sec,
+        completion_tokens=args.completion_tokens, error_rate=args.error_rate,
+        error_codes=[int(c) for c in args.error_codes.split(",")], cassette=args.cassette,
+        upstream=args.upstream, replay_latency=args.replay_latency, seed=args.seed)
+    server, url = start_fake_server(config, args.host, args.port)
+    print(f"Fake LLM server ({args.mode}) on {url} - set GROQ_API_BASE={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
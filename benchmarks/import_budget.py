@@ -0,0 +1,87 @@
+"""
+Import-time budget for the login path of app.py.
+
+Runs `python -X importtime` on app.py's module-level imports (read from its source, so the
+check follows the app) after importing streamlit, and sums the cumulative time of every
+top-level import the app itself adds. Exits non-zero when the best of --runs exceeds the
+budget or when a module that should load lazily (LangChain, Groq, PDF/DOCX parsers, the tool
+tabs) is imported on that path:
+
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --budget-ms 400 --runs 5 --output bench/imports.json
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+DEFAULT_BUDGET_MS = 300
+LAZY_MODULES = ("langchain_core", "langchain_groq", "groq", "PyPDF2", "docx", "tabs")
+
+def app_imports(path=APP_PATH):
+    """Modules imported at module level by app.py, in source order"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+def measure(modules):
+    """One fresh interpreter: (ms of the app's imports beyond streamlit, {top-level module: cumulative ms}, all modules imported)"""
+    code = "import streamlit\nimport sys; print('--app--', file=sys.stderr)\n" + "".join(f"import {m}\n" for m in modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    _, _, app_part = result.stderr.partition("--app--")
+    top_level = {}
+    for line in app_part.splitlines():
+        # "import time: self [us] | cumulative | imported package", nesting shown by indentation
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            top_level[name.strip()] = int(cumulative) / 1000
+    imported = {line.split("|")[-1].strip() for line in app_part.splitlines() if line.startswith("import time:")}
+    return sum(top_level.values()), top_level, imported
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="maximum import time of the app's modules beyond streamlit")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters; the fastest counts")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    modules = app_imports()
+    runs = [measure(modules) for _ in range(args.runs)]
+    total_ms, top_level, imported = min(runs, key=lambda run: run[0])
+    eager = sorted({name.split(".")[0] for name in imported} & set(LAZY_MODULES))
+
+    print(f"app imports beyond streamlit: {total_ms:.0f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    for name, ms in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {ms:8.1f} ms  {name}")
+    if eager:
+        print(f"lazily loaded modules imported on the login path: {', '.join(eager)}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"total_ms": round(total_ms, 1), "budget_ms": args.budget_ms,
+                       "runs_ms": [round(run[0], 1) for run in runs], "top_level_ms": top_level,
+                       "eager_lazy_modules": eager}, f, indent=2)
+
+    if total_ms > args.budget_ms or eager:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
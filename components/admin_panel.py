@@ -0,0 +1,63 @@
+"""
+Admin Panel - per-operation latency for the last hour, token spend for the last day and
+process cache hit rates (users listed in ADMIN_USERNAMES)
+"""
+
+import time
+import streamlit as st
+from utils.tracing import window_stats
+from utils.usage import get_usage_rollup, DAY_SECONDS
+from utils import extraction_cache
+from components.chat_render import render_cache_stats
+from config import ADMIN_USERNAMES, METRICS_PORT, METRICS_HOST, TRACE_LOG_PATH
+
+def is_admin(user):
+    """Whether the logged-in user may see the admin panel"""
+    return bool(user) and user.get("username") in ADMIN_USERNAMES
+
+def show_admin_panel():
+    """Sidebar table of p50/p95 per traced operation"""
+    with st.sidebar:
+        st.markdown("### 🛠️ Performance (last hour)")
+        rows = window_stats()
+        if not rows:
+            st.info("No traced operations yet.")
+        else:
+            rows.sort(key=lambda r: r["p95_ms"], reverse=True)
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.caption(
+            f"Prometheus: `{METRICS_HOST}:{METRICS_PORT}/metrics`" if METRICS_PORT else "Prometheus endpoint disabled"
+        )
+        if TRACE_LOG_PATH:
+            st.caption(f"Trace log: `{TRACE_LOG_PATH}`")
+
+        st.markdown("### 💰 Token spend (last 24h)")
+        since = time.time() - DAY_SECONDS
+        by_prompt = get_usage_rollup(group_by=("prompt_kind", "model"), since=since, limit=15)
+        if not by_prompt:
+            st.info("No model calls recorded yet.")
+        else:
+            st.caption("By prompt")
+            st.dataframe(by_prompt, hide_index=True, use_container_width=True)
+            st.caption("By user")
+            st.dataframe(get_usage_rollup(group_by=("user_id",), since=since, limit=15),
+                         hide_index=True, use_container_width=True)
+
+        st.markdown("### 🗃️ Caches (this process)")
+        from utils import retrieval  # imports NumPy, kept off the startup path
+        from utils import code_chunks, code_analysis, code_profile
+        from services import code_explain
+        extraction = extraction_cache.stats()
+        st.dataframe([
+            dict(cache="file extraction (memory)", **extraction["memory"]),
+            dict(cache="chat render", **render_cache_stats()),
+            dict(cache="chat retrieval index", **retrieval.stats()),
+            dict(cache="code splits", **code_chunks.stats()),
+            dict(cache="code part explanations", **code_explain.stats()),
+            dict(cache="code analysis", **code_analysis.stats()),
+            dict(cache="code profiles", **code_profile.stats()),
+        ], hide_index=True, use_container_width=True)
+        if extraction["disk"]["enabled"]:
+            disk = extraction["disk"]
+            st.caption(f"Extraction disk tier: {disk['hits']} hits, {disk['misses']} misses, {disk['writes']} writes")
+        st.caption(f"File extraction hit rate (both tiers): {extraction['hit_rate']:.0%}")
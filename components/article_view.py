@@ -0,0 +1,117 @@
+"""
+Article View UI Component - the active session's article, rendered section by section, and
+the editor chat's side of section-level editing (utils/article_sections.py)
+
+The article of the active session lives in st.session_state['article_sections'] (and as
+markdown in 'generated_article'); it is loaded from the article_sections table only when the
+active session changes, and only for sessions that have a generated article.
+"""
+
+import streamlit as st
+from utils import events
+from utils.article_sections import (
+    EDIT_INSTRUCTIONS, new_sections, join_sections, section_title, format_for_prompt, parse_patches, apply_patches
+)
+from utils.article_store import save_article, load_article, save_article_edit
+from components.chat_render import render_markdown
+from config import SYSTEM_PROMPTS
+
+ARTICLE_MESSAGE_PREFIX = "**Generated Article for:"
+
+def is_article_message(message):
+    """Whether a chat message is a generated article (its full text is not chat history)"""
+    return message["role"] == "assistant" and message["content"].startswith(ARTICLE_MESSAGE_PREFIX)
+
+def _set_article(session_id, sections, topic, edited=()):
+    st.session_state['article_sections'] = {"session_id": session_id, "sections": sections, "topic": topic,
+                                            "edited": list(edited)}
+    if sections:
+        st.session_state['generated_article'] = join_sections(sections)
+    else:
+        st.session_state.pop('generated_article', None)
+
+def start_article(tab_key, text, topic):
+    """Store a freshly generated article as the active session's"""
+    session_id = st.session_state[f"session_id_{tab_key}"]
+    sections = new_sections(text)
+    save_article(session_id, sections)
+    _set_article(session_id, sections, topic)
+
+def active_article(tab_key):
+    """Sections of the active session's article ([] when it has none)"""
+    session_id = st.session_state[f"session_id_{tab_key}"]
+    article = st.session_state.get('article_sections')
+    if article and article["session_id"] == session_id:
+        return article["sections"]
+
+    source = next((m for m in st.session_state.get(f"messages_{tab_key}", []) if is_article_message(m)), None)
+    sections, topic = [], ""
+    if source:
+        header, _, text = source["content"].partition("\n\n")
+        topic = header.strip("*").partition(":")[2].strip()
+        sections = load_article(session_id)
+        if not sections:
+            # Generated before articles were stored by section
+            sections = new_sections(text)
+            save_article(session_id, sections)
+    _set_article(session_id, sections, topic)
+    return sections
+
+def editor_context(tab_key):
+    """System prompt of the editor chat: the active article with its section ids"""
+    sections = active_article(tab_key)
+    if not sections:
+        return f"{SYSTEM_PROMPTS['article_generator']}\nArticle being edited:\nNot yet generated"
+    return (f"{SYSTEM_PROMPTS['article_generator']}\n\n{EDIT_INSTRUCTIONS}\n\n"
+            f"Article being edited:\n{format_for_prompt(sections)}")
+
+def apply_editor_reply(tab_key, reply):
+    """
+    Apply the patches in an editor reply to the active article and persist only the sections
+    they touch. Returns the chat message: the editor's note and a summary of the edit.
+    """
+    note, patches = parse_patches(reply)
+    if not patches:
+        return reply
+    before = active_article(tab_key)
+    after, changed, errors = apply_patches(before, patches)
+    old_ids, new_ids = {s["id"] for s in before}, {s["id"] for s in after}
+    removed = [s for s in before if s["id"] not in new_ids]
+    if changed or removed:
+        session_id = st.session_state[f"session_id_{tab_key}"]
+        save_article_edit(session_id, before, after, changed)
+        _set_article(session_id, after, st.session_state['article_sections']["topic"], edited=changed)
+        events.emit(events.ARTICLE_CHANGED, tab_key)
+
+    titles = {s["id"]: section_title(s) for s in after}
+    summary = [f"{'updated' if section_id in old_ids else 'added'} *{titles[section_id]}*" for section_id in changed]
+    summary += [f"removed *{section_title(s)}*" for s in removed]
+    lines = [note] if note else []
+    if summary:
+        lines.append("✏️ Article " + ", ".join(summary) + ".")
+    if errors:
+        lines.append("⚠️ Not applied: " + "; ".join(errors))
+    return "\n\n".join(lines)
+
+def show_article(tab_key):
+    """The active session's article, as its own fragment (follows session switches and edits)"""
+    key = events.fragment_key("article", tab_key)
+    st.fragment(_article_pane, key=key)(tab_key)
+
+def _article_pane(tab_key):
+    key = events.fragment_key("article", tab_key)
+    events.listen(key, tab_key, events.ACTIVE_SESSION_CHANGED, events.ARTICLE_CHANGED)
+    sections = active_article(tab_key)
+    if not sections:
+        return
+    article = st.session_state['article_sections']
+    st.markdown("---")
+    st.markdown("""<h4 style='text-align: left; color: #33FF33;'>✅ Generated Article</h4>""", unsafe_allow_html=True)
+    st.markdown(f"**Topic:** {article['topic']}")
+    st.markdown("---")
+    # Rendered HTML is cached per (section, content): an edit re-renders only the sections it changed
+    for section in sections:
+        if section["id"] in article["edited"]:
+            st.caption("✏️ Changed by the last edit")
+        st.markdown(render_markdown(f"article:{article['session_id']}:{section['id']}", section["content"]),
+                    unsafe_allow_html=True)
@@ -0,0 +1,92 @@
+"""
+Chat Pane UI Component - the per-tool chat area, rendered as its own st.fragment
+so a chat turn reruns only this pane instead of the whole page
+"""
+
+import streamlit as st
+from utils.memory import save_chat_message
+from utils.llm import get_llm, invoke_llm, usage_record
+from utils.chat_sessions import get_user_sessions, update_session_title_if_new
+from utils import events
+from components.chat_render import render_history, show_message
+
+def show_chat_pane(user_id, tab_name, tab_key, *, title_html, placeholder, input_key, spinner_text,
+                   context, prompt_kind, selected_model, temperature, on_reply=None, skip_history=None):
+    """
+    Chat history plus input for one tool.
+    `context` is the system prompt (with the tool's current resume/code/article) used for replies,
+    or a function of the user's latest message returning it.
+    `on_reply` turns the model's reply into the message that is saved and shown (e.g. after
+    applying the edits it contains); events it emits rerun the app once the message is saved.
+    `skip_history(message)` leaves messages out of the history sent with the prompt.
+    """
+    key = events.fragment_key("chat", tab_key)
+    st.fragment(_chat_pane, key=key)(
+        user_id, tab_name, tab_key, title_html, placeholder, input_key, spinner_text,
+        context, prompt_kind, selected_model, temperature, on_reply, skip_history
+    )
+
+def _on_submit(user_id, tab_name, tab_key, input_key):
+    """Store the user's message, then rerun this pane (and the library if its list changes)"""
+    user_input = st.session_state.get(input_key)
+    if not user_input:
+        return
+    current_sess_id = st.session_state[f"session_id_{tab_key}"]
+
+    # The library reorders when an older session becomes the most recent one,
+    # and retitles when the session still has its generic "New Chat" title
+    newest = get_user_sessions(user_id, tab_name=tab_name, limit=1)
+    if update_session_title_if_new(current_sess_id, user_input) or not newest or newest[0][0] != current_sess_id:
+        events.emit(events.SESSION_LIST_CHANGED, tab_key)
+
+    message_id = save_chat_message(user_id, current_sess_id, tab_name, "user", user_input)
+    st.session_state[f"messages_{tab_key}"].append({"role": "user", "content": user_input, "id": message_id})
+    st.session_state[f"pending_reply_{tab_key}"] = True
+    events.dispatch(events.fragment_key("chat", tab_key))
+
+def _chat_pane(user_id, tab_name, tab_key, title_html, placeholder, input_key, spinner_text,
+               context, prompt_kind, selected_model, temperature, on_reply, skip_history):
+    key = events.fragment_key("chat", tab_key)
+    events.listen(key, tab_key, events.ACTIVE_SESSION_CHANGED)
+    messages_key = f"messages_{tab_key}"
+
+    st.markdown("---")
+    st.markdown(title_html, unsafe_allow_html=True)
+
+    # Display current session messages
+    render_history(st.session_state[messages_key], tab_key, st.session_state[f"session_id_{tab_key}"])
+
+    st.chat_input(placeholder, key=input_key, on_submit=_on_submit, args=(user_id, tab_name, tab_key, input_key))
+
+    if not st.session_state.pop(f"pending_reply_{tab_key}", False):
+        return
+
+    from langchain_core.prompts import ChatPromptTemplate  # heavy, loaded on first chat turn
+
+    # Assistant Message
+    with st.spinner(spinner_text):
+        try:
+            llm = get_llm(selected_model, temperature)
+
+            # Only include recent history to avoid token limits
+            history_tuples = [(m["role"], m["content"]) for m in st.session_state[messages_key][-10:]
+                              if not (skip_history and skip_history(m))]
+            if callable(context):
+                question = next((c for r, c in reversed(history_tuples) if r == "user"), "")
+                context = context(question)
+            prompt = ChatPromptTemplate.from_messages([("system", context), *history_tuples])
+
+            result = invoke_llm(llm, prompt.format_prompt().to_messages(), user_id, prompt_kind=prompt_kind)
+            response = on_reply(result.content) if on_reply else result.content
+
+            message_id = save_chat_message(user_id, st.session_state[f"session_id_{tab_key}"], tab_name, "assistant",
+                                           response, usage=usage_record(result))
+            message = {"role": "assistant", "content": response, "id": message_id}
+            st.session_state[messages_key].append(message)
+            with st.chat_message("assistant"):
+                show_message(message)
+
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
+            return
+    events.rerun_if_pending()
@@ -0,0 +1,96 @@
+"""
+Chat History Renderer - shows a window of the most recent messages, collapses older long
+messages to previews that expand on demand, and caches each message's rendered HTML so
+markdown is parsed once per message instead of on every rerun
+"""
+
+import hashlib
+import html
+import re
+import markdown
+import streamlit as st
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+from utils.cache import LRUCache
+from utils.tracing import span
+from config import CHAT_RENDER_WINDOW, CHAT_FULL_RECENT, CHAT_PREVIEW_CHARS, CHAT_RENDER_CACHE_SIZE
+
+# Process-wide: shared by every session, keyed by (message id, content hash)
+_html_cache = LRUCache(CHAT_RENDER_CACHE_SIZE)
+_SAFE_SCHEMES = ("http", "https", "mailto")
+_SCHEME = re.compile(r"^([a-z][a-z0-9+.\-]*):")
+_IGNORED_IN_URLS = re.compile(r"[\x00-\x20\x7f-\x9f]+")
+
+def safe_url(value):
+    """Whether a link target is http(s), mailto or relative/anchor, the way a browser reads it
+    (entities decoded, whitespace and control characters dropped)"""
+    url = _IGNORED_IN_URLS.sub("", html.unescape(value)).lower()
+    scheme = _SCHEME.match(url)
+    return scheme is None or scheme.group(1) in _SAFE_SCHEMES
+
+class _SafeLinks(Treeprocessor):
+    def run(self, root):
+        for element in root.iter():
+            for attr in ("href", "src"):
+                if attr in element.attrib and not safe_url(element.get(attr)):
+                    element.set(attr, "#")
+
+class _EscapeRawHtml(Extension):
+    """Message text comes from users and models: show raw HTML as text and drop script links"""
+
+    def extendMarkdown(self, md):
+        md.preprocessors.deregister("html_block")
+        md.inlinePatterns.deregister("html")
+        md.treeprocessors.register(_SafeLinks(md), "safe_links", 0)
+
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+def render_markdown(message_id, content):
+    """HTML for one message, from the LRU cache when this (id, content) was rendered before"""
+    return _html_cache.get_or_compute(
+        (message_id, content_hash(content)),
+        lambda: markdown.markdown(content, extensions=["fenced_code", "tables", "sane_lists", _EscapeRawHtml()])
+    )
+
+def render_cache_stats():
+    return _html_cache.stats()
+
+def show_message(message):
+    """Render one message in full inside the current chat bubble"""
+    st.markdown(render_markdown(message.get("id"), message["content"]), unsafe_allow_html=True)
+
+def _show_earlier(window_key):
+    st.session_state[window_key] = st.session_state.get(window_key, CHAT_RENDER_WINDOW) + CHAT_RENDER_WINDOW
+
+def _expand(expanded_key, message_key):
+    st.session_state.setdefault(expanded_key, set()).add(message_key)
+
+def render_history(messages, tab_key, session_id):
+    """
+    Render the chat history of one session. Only the last CHAT_RENDER_WINDOW messages are sent
+    to the browser; older long messages show a preview until expanded.
+    """
+    window_key = f"history_window_{tab_key}_{session_id}"
+    expanded_key = f"expanded_messages_{tab_key}_{session_id}"
+    window = st.session_state.get(window_key, CHAT_RENDER_WINDOW)
+    expanded = st.session_state.get(expanded_key, set())
+    start = max(0, len(messages) - window)
+
+    with span("render.chat_history", messages=len(messages), rendered=len(messages) - start):
+        if start:
+            st.button(f"⬆️ Show earlier messages ({start} hidden)", key=f"earlier_{tab_key}",
+                      on_click=_show_earlier, args=(window_key,))
+
+        full_from = len(messages) - CHAT_FULL_RECENT
+        for index in range(start, len(messages)):
+            msg = messages[index]
+            message_key = msg.get("id") or content_hash(msg["content"])
+            with st.chat_message(msg["role"]):
+                if index >= full_from or len(msg["content"]) <= CHAT_PREVIEW_CHARS or message_key in expanded:
+                    show_message(msg)
+                else:
+                    preview = msg["content"][:CHAT_PREVIEW_CHARS].rsplit(" ", 1)[0]
+                    st.markdown(f"<p>{html.escape(preview)} …</p>", unsafe_allow_html=True)
+                    st.button("Show full message", key=f"expand_{tab_key}_{index}",
+                              on_click=_expand, args=(expanded_key, message_key))
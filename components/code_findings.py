@@ -0,0 +1,56 @@
+"""
+Code Findings UI Component - the local static analysis (utils/code_analysis.py) and sandboxed
+profile (utils/code_profile.py) of pasted Python
+"""
+
+import streamlit as st
+from utils.code_analysis import finding_count
+from config import CODE_MAX_LOOP_DEPTH, CODE_MAX_COMPLEXITY
+
+def show_code_findings(analysis):
+    """Syntax, undefined names, loop nesting, complexity and I/O-in-loop findings of one snippet"""
+    count = finding_count(analysis)
+    with st.expander(f"🔎 Local checks: {count} finding{'s' if count != 1 else ''} (Python, no AI call)",
+                     expanded=bool(count)):
+        error = analysis["syntax_error"]
+        if error:
+            st.error(f"SyntaxError at line {error['line']}: {error['message']}")
+            return
+
+        syntax_col, loop_col, complexity_col = st.columns(3)
+        syntax_col.metric("Syntax", "compiles")
+        loop_col.metric("Deepest loop nesting", analysis["max_loop_depth"])
+        complexity_col.metric("Max complexity", max((f["complexity"] for f in analysis["functions"]), default="n/a"))
+
+        if analysis["undefined_names"]:
+            st.markdown("**Undefined names:** " + ", ".join(f"`{name}` (line {line})"
+                                                           for name, line in analysis["undefined_names"]))
+        for loop in analysis["deep_loops"]:
+            st.markdown(f"**Loops nested {loop['depth']} deep** in `{loop['scope']}` at line {loop['line']} "
+                        f"(more than {CODE_MAX_LOOP_DEPTH})")
+        for function in analysis["complex_functions"]:
+            st.markdown(f"**`{function['name']}()` has cyclomatic complexity {function['complexity']}** "
+                        f"(line {function['line']}, above {CODE_MAX_COMPLEXITY})")
+        if analysis["io_in_loops"]:
+            st.markdown("**I/O inside loops:** " + ", ".join(f"`{io['call']}` at line {io['line']}"
+                                                            for io in analysis["io_in_loops"]))
+        if not count:
+            st.caption("Nothing found by the local checks.")
+
+def show_code_profile(profile):
+    """Timing, top functions and allocation lines of one sandboxed run"""
+    if not profile["functions"] and not profile["allocations"]:
+        st.warning(f"Profiling: {profile['message']}")
+        return
+    with st.expander(f"⏱️ Measured profile: {profile['wall_s']:.2f} s wall, {profile['cpu_s']:.2f} s CPU, "
+                     f"peak {profile['peak_kb'] / 1024:,.1f} MB (sandboxed run)", expanded=True):
+        if profile["status"] != "ok":
+            st.warning(profile["message"])
+        st.caption("Top functions by cumulative time (timings include profiler overhead)")
+        st.dataframe(profile["functions"], hide_index=True, width="stretch")
+        if profile["allocations"]:
+            st.caption("Top allocation lines (memory still held at the end of the run)")
+            st.dataframe(profile["allocations"], hide_index=True, width="stretch")
+        if profile.get("output_chars"):
+            st.caption(f"The snippet printed {profile['output_chars']:,} characters (not shown)")
+        st.caption(f"Sandbox: {profile.get('isolation', 'unknown')}")
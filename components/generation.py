@@ -0,0 +1,40 @@
+"""
+Generation UI Component - runs a services request from a tool's button and opens the
+result as a new chat session of that tool (or appends it to the active one)
+"""
+
+import streamlit as st
+from services.base import RequestError, generate, save_to_new_session, save_to_session
+
+def run_generation(request, tab_key, spinner_text="Generating...", success_text="Done!", on_success=None,
+                   session_id=None):
+    """
+    Generate `request` (a services GenerationRequest), save it as a new session and make that
+    session the tab's active one; with session_id, append it to that (active) session instead.
+    on_success(result) runs before the page reruns.
+    """
+    try:
+        request.validate()
+    except RequestError as e:
+        st.error(str(e))
+        return
+
+    with st.spinner(spinner_text):
+        try:
+            result = generate(request)
+            if session_id is None:
+                session_id, message_id = save_to_new_session(result)
+                messages = []
+            else:
+                message_id = save_to_session(result, session_id)
+                messages = st.session_state.get(f"messages_{tab_key}", [])
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
+            return
+
+    st.session_state[f"session_id_{tab_key}"] = session_id
+    st.session_state[f"messages_{tab_key}"] = messages + [{"role": "assistant", "content": result.message, "id": message_id}]
+    if on_success:
+        on_success(result)
+    st.success(success_text)
+    st.rerun()
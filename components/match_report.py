@@ -0,0 +1,29 @@
+"""
+Match Report UI Component - the local resume–JD coverage/gap report (utils/match_score.py)
+"""
+
+import html
+import streamlit as st
+
+def _chips(items, color, limit=20):
+    shown = " ".join(f"<span style='background-color:{color}; color:#111; padding:2px 8px; border-radius:10px; "
+                     f"margin:2px; display:inline-block;'>{html.escape(item)}</span>" for item in items[:limit])
+    more = f" <i>+{len(items) - limit} more</i>" if len(items) > limit else ""
+    return shown + more if items else "<i>none</i>"
+
+def show_match_report(report):
+    """Score, coverage and the matched/missing skills and keywords of one resume against one JD"""
+    with st.expander(f"📊 Resume–JD match: {report['score']:.0f}/100 (local estimate, no AI call)", expanded=True):
+        score_col, skill_col, keyword_col = st.columns(3)
+        score_col.metric("Match score", f"{report['score']:.0f}/100")
+        skill_col.metric("Skills covered", "n/a" if report["skill_coverage"] is None else f"{report['skill_coverage']:.0%}")
+        keyword_col.metric("Keywords covered", "n/a" if report["keyword_coverage"] is None else f"{report['keyword_coverage']:.0%}")
+
+        st.markdown(f"**Skills in both:** {_chips(report['matched_skills'], '#99FF99')}", unsafe_allow_html=True)
+        st.markdown(f"**Required skills missing:** {_chips(report['missing_required'], '#FF9999')}", unsafe_allow_html=True)
+        if report["missing_preferred"]:
+            st.markdown(f"**Nice-to-have skills missing:** {_chips(report['missing_preferred'], '#FFD699')}",
+                        unsafe_allow_html=True)
+        st.markdown(f"**JD keywords missing:** {_chips(report['missing_keywords'], '#DDDDDD')}", unsafe_allow_html=True)
+        if report["extra_skills"]:
+            st.caption("Other skills on the resume: " + ", ".join(report["extra_skills"][:15]))
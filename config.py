@@ -2,6 +2,8 @@
 Configuration and constants for articulAIte application
 """
 
+import os
+
 # Groq Models Configuration
 CV_INTERVIEW_MODELS = {
     "Groq Compound (Best)": "groq/compound",
@@ -45,10 +47,33 @@ DEFAULT_STUDY_MODEL = "llama-3.3-70b-versatile"
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_FILE_TYPES = ["pdf", "docx", "txt"]
 
+# Upload Intake (see utils/intake.py)
+INTAKE_SNIFF_BYTES = 8192                    # bytes read to detect the file type and text encoding
+INTAKE_SPOOL_BYTES = 2 * 1024 * 1024         # larger uploads are parsed from a temp file
+INTAKE_CHUNK_BYTES = 1024 * 1024
+DOCX_MAX_ENTRIES = 1000                      # files inside a DOCX archive
+DOCX_MAX_UNZIPPED_BYTES = 100 * 1024 * 1024  # declared uncompressed size of all entries
+DOCX_MAX_RATIO = 100                         # uncompressed / compressed size
+
+# Extraction Cache (see utils/extraction_cache.py): extracted text keyed by SHA-256 of the file bytes
+EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", "256"))  # documents held in process memory
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", "")  # persistent tier shared by server processes, empty disables
+
+# PDF Extraction (see utils/pdf_extract.py); FILE_UPLOAD_TIMEOUT is the hard limit per document
+PDF_MAX_PAGES = 60              # pages read per document, the rest is ignored
+PDF_MAX_CHARS = 200_000         # extracted characters kept per document
+PDF_PARALLEL_MIN_PAGES = 12     # documents with at least this many pages are split across workers
+PDF_PAGES_PER_TASK = 4          # pages parsed per pool task
+# Worker processes, one core left to the server; 0 still starts one (uploads are never parsed in-process)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(max(0, min(4, (os.cpu_count() or 1) - 1)))))
+PDF_WORKER_MAX_MEMORY = 1024 * 1024 * 1024  # address space per worker, caps decompression bombs
+DOCX_MAX_CHARS = PDF_MAX_CHARS  # same budget for DOCX (see utils/docx_extract.py)
+
 # Article Generation Settings
 ARTICLE_MIN_WORDS = 100
 ARTICLE_MAX_WORDS = 5000
 ARTICLE_DEFAULT_WORDS = 1500
+ARTICLE_SECTION_WORDS = 250  # paragraph-group size of articles without headings (utils/article_sections.py)
 
 WRITING_STYLES = [
     "Academic",
@@ -68,6 +93,60 @@ STUDY_MAX_WEEKS = 52
 # Chat Configuration
 CHAT_MAX_HISTORY = 50
 CHAT_MESSAGE_MAX_LENGTH = 4000
+CHAT_RENDER_WINDOW = 12        # most recent messages rendered; older ones sit behind "Show earlier"
+CHAT_FULL_RECENT = 4           # the newest messages are always shown in full
+CHAT_PREVIEW_CHARS = 400       # older messages longer than this collapse to an expandable preview
+CHAT_RENDER_CACHE_SIZE = 2000  # rendered message HTML kept per server process (LRU)
+
+# Chat Context Retrieval (BM25 over resume/job description chunks, see utils/retrieval.py)
+RETRIEVAL_ENABLED = os.getenv("RETRIEVAL_ENABLED", "1") != "0"
+RETRIEVAL_TOP_K = 4             # chunks sent with a chat turn
+RETRIEVAL_CHUNK_CHARS = 700     # sections longer than this are split into line windows
+RETRIEVAL_MIN_CHARS = 2500      # documents shorter than this together are always sent whole
+RETRIEVAL_CACHE_SIZE = 128      # indexed documents per server process (LRU)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Resume–JD Match Scoring (local, no model call, see utils/match_score.py)
+MATCH_SKILL_SHARE = 0.7         # score = share * skill coverage + (1 - share) * keyword coverage
+MATCH_PREFERRED_WEIGHT = 0.5    # weight of skills only listed as preferred / nice to have
+MATCH_MAX_KEYWORDS = 30         # non-skill keywords taken from each job description
+MATCH_CACHE_SIZE = 1024         # extracted skill/keyword profiles per server process (LRU)
+
+# Code Explanation Map-Reduce (large inputs explained in parts, see utils/code_chunks.py)
+CODE_MAP_REDUCE_MIN_LINES = 150  # shorter code is explained with a single prompt
+CODE_CHUNK_MAX_LINES = 120       # lines per explained part
+CODE_CHUNK_GROUP_EVERY = 3       # about this many small functions/blocks share a part
+CODE_MAP_CONCURRENCY = 4         # parts explained at once
+CODE_CHUNK_CACHE_SIZE = 512      # code splits and part explanations per server process (LRU)
+
+# Local Code Analysis (Python checks before Find Errors / Optimize, see utils/code_analysis.py)
+CODE_MAX_LOOP_DEPTH = 2          # deeper loop nesting is reported
+CODE_MAX_COMPLEXITY = 10         # functions with higher cyclomatic complexity are reported
+CODE_ANALYSIS_CACHE_SIZE = 256   # analyzed snippets per server process (LRU)
+
+# Sandboxed Profiling (opt-in, Optimize action, see utils/code_profile.py)
+CODE_PROFILING_ENABLED = os.getenv("CODE_PROFILING_ENABLED", "0") == "1"  # runs user code on the server: off unless 1
+CODE_PROFILE_BWRAP = os.getenv("CODE_PROFILE_BWRAP", "bwrap")             # bubblewrap binary isolating each run
+# 1 allows runs without bubblewrap (seccomp + audit hook only, not an isolation boundary)
+CODE_PROFILE_ALLOW_UNISOLATED = os.getenv("CODE_PROFILE_ALLOW_UNISOLATED", "0") == "1"
+CODE_PROFILE_UID = 65534         # unprivileged uid (nobody) the snippet runs as
+CODE_PROFILE_CPU_SECONDS = 5     # CPU time of one run
+CODE_PROFILE_WALL_SECONDS = 10   # wall-clock time of one run
+CODE_PROFILE_MEMORY_MB = 512     # address space of the sandbox process
+CODE_PROFILE_TOP_N = 15          # functions and allocation lines reported
+CODE_PROFILE_MAX_CONCURRENT = 2  # sandboxes running at once per server process
+CODE_PROFILE_CACHE_SIZE = 128    # profiled snippets per server process (LRU)
+
+# Incremental Re-analysis (code tab, see utils/code_diff.py)
+CODE_DIFF_CONTEXT_LINES = 3         # unchanged lines sent around each changed region
+CODE_DIFF_MAX_CHANGED_SHARE = 0.4   # above this share of changed lines, analyze the whole code again
+CODE_DIFF_MAX_PRIOR_CHARS = 20000   # once the previous analysis and its updates grow past this, start over
+
+# Session Index (per-user cache of chat sessions across tabs, see utils/session_index.py)
+SESSION_INDEX_PER_TAB = 50      # newest sessions per tab held in memory
+SESSION_INDEX_TTL = 300         # seconds before a user's index is reloaded (writes from other processes)
+SESSION_INDEX_MAX_USERS = 5000  # users indexed per server process (LRU)
 
 # Timeout Configuration (seconds)
 API_TIMEOUT = 60
@@ -120,12 +199,59 @@ Be encouraging and create realistic, achievable plans."""
 RATE_LIMIT_CALLS = 10
 RATE_LIMIT_WINDOW = 60  # seconds
 
+# LLM Admission Control (process-wide, see utils/admission.py)
+LLM_MAX_CONCURRENCY = 8       # in-flight model calls per server process
+LLM_QUEUE_TIMEOUT = 120       # seconds a call may wait in the queue
+LLM_EST_COMPLETION_TOKENS = 1024  # completion budget assumed before a call returns
+DEFAULT_MODEL_TPM = 6000      # tokens per minute for models not listed below
+MODEL_TPM_LIMITS = {
+    "groq/compound": 70000,
+    "groq/compound-mini": 70000,
+    "moonshotai/Kimi-K2-Instruct-0905": 10000,
+    "openai/gpt-oss-120b": 8000,
+    "llama-3.3-70b-versatile": 12000,
+}
+
+# Tracing & Metrics (see utils/tracing.py)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") != "0"
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH", "logs/trace.jsonl")  # empty string disables the JSONL log
+TRACE_LOG_MAX_BYTES = 10 * 1024 * 1024
+TRACE_LOG_BACKUPS = 5
+TRACE_WINDOW_SECONDS = 3600   # admin panel percentiles cover the last hour
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # Prometheus /metrics (unauthenticated), off unless set, e.g. 9464
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")  # 0.0.0.0 exposes it to the network
+ADMIN_USERNAMES = [u.strip() for u in os.getenv("ADMIN_USERNAMES", "").split(",") if u.strip()]
+
+# Navigation: "router" runs only the selected tool on each rerun,
+# "tabs" renders all four with st.tabs (every tab body executes on every rerun)
+TAB_NAVIGATION = os.getenv("TAB_NAVIGATION", "router")
+
+# Token Usage Accounting (llm_usage table, see utils/usage.py)
+USER_DAILY_TOKEN_QUOTA = int(os.getenv("USER_DAILY_TOKEN_QUOTA", "0"))  # tokens per user per 24h, 0 disables
+
+# Database Connection Pool (PostgreSQL only; SQLite opens a connection per call)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+
+# Process Warmup (see utils/warmup.py): migrations, DB pool, heavy imports and LLM clients
+# are prepared in a background thread when the server process handles its first run
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") != "0"
+
 # Error Messages
 ERROR_MESSAGES = {
     "api_key_missing": "GROQ_API_KEY not configured.",
     "file_too_large": "File exceeds maximum size limit (10MB).",
     "invalid_file_type": "Invalid file type. Supported: PDF, DOCX, TXT",
+    "file_type_mismatch": "The file's contents do not match its extension.",
+    "file_malformed": "The file is damaged or not a valid PDF, DOCX or TXT document.",
+    "file_too_complex": "The file expands to too much data to process safely.",
     "api_error": "An error occurred with the API.",
     "timeout": "Request timed out.",
-    "rate_limit": "Rate limit exceeded."
+    "extraction_timeout": "Reading this file took too long. Please upload a shorter or simpler version.",
+    "rate_limit": "Rate limit exceeded.",
+    "queue_timeout": "The AI service is busy right now. Please try again in a minute.",
+    "provider_busy": "The AI provider is throttling requests and turned this one away. Please retry shortly.",
+    "empty_completion": "The AI model returned an empty response. Please try again.",
+    "quota_exceeded": "You have used your AI token allowance for the last 24 hours. Please try again later."
 }
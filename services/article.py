@@ -0,0 +1,84 @@
+"""
+Article requests - the article tab's "Generate Article"
+"""
+
+from services.base import GenerationRequest, RequestError
+from config import WRITING_STYLES, ARTICLE_MIN_WORDS, ARTICLE_MAX_WORDS, ARTICLE_DEFAULT_WORDS
+
+class ArticleRequest(GenerationRequest):
+    """A publication-ready article on topic; temperature doubles as the prompt's creativity level"""
+
+    tab_name = "Article Generator"
+
+    def __init__(self, topic, model, temperature, user_id, word_count=ARTICLE_DEFAULT_WORDS,
+                 writing_style=WRITING_STYLES[0], include_toc=True, include_sources=True):
+        super().__init__(model, temperature, user_id)
+        self.topic = topic
+        self.word_count = int(word_count)
+        self.writing_style = writing_style
+        self.include_toc = include_toc
+        self.include_sources = include_sources
+
+    def validate(self):
+        if not self.topic:
+            raise RequestError("Enter article topic!")
+        if not ARTICLE_MIN_WORDS <= self.word_count <= ARTICLE_MAX_WORDS:
+            raise RequestError(f"Word count must be between {ARTICLE_MIN_WORDS} and {ARTICLE_MAX_WORDS}")
+        if self.writing_style not in WRITING_STYLES:
+            raise RequestError(f"Unknown writing style: {self.writing_style}")
+
+    def prompt(self):
+        return f"""You are an expert researcher and professional writer.
+
+Your task is to generate a high-quality, publication-ready article with the following specifications:
+
+Topic: **{self.topic}**  
+Target Word Count: **{self.word_count} words**  
+Writing Style: **{self.writing_style}**  
+Creativity Level: **{self.temperature}** (0 = factual/technical, 1 = highly creative)  
+{f'Include a properly formatted "Table of Contents" section at the beginning.' if self.include_toc else ''}
+{f'Include reliable external references and citations formatted consistently (APA/MLA/Harvard — choose one and follow it throughout).' if self.include_sources else 'Do not include external references.'}
+
+---
+
+### **Content Requirements**
+
+- The article must be **deeply researched**, logically structured, and written with **high linguistic precision**.
+- Use clear **H1, H2, H3 headings**, and avoid overly long paragraphs.
+- Maintain a tone suitable for publication (academic, journalistic, editorial, or as per the style defined).
+- Include:
+  - Definitions and explanations where needed  
+  - Examples, case studies, or real-world applications (when relevant)  
+  - Statistics, evidence, or insights (only if accurate and verifiable — no fabricated facts)
+- Ensure the narrative flows smoothly using **cohesive transitions and varied sentence structure.**
+
+---
+
+### **Writing & Quality Standards**
+
+- Vocabulary should be **rich, sophisticated, and contextually precise**, but avoid unnecessary jargon.
+- Maintain clarity and readability — aim for a balance of accessibility and intellectual depth.
+- Avoid repetition, filler content, generic phrasing, or vague statements.
+- Ensure each section meaningfully contributes to the topic.
+- Finish with a strong, concise conclusion that summarizes key insights and leaves the reader with takeaway value.
+
+---
+
+### **Output Format**
+
+1. Begin writing immediately.
+2. Do not show instructions or meta commentary.
+3. Only output the final article, formatted cleanly.
+
+----
+
+Now, write the full article.:"""
+
+    def prompt_kind(self):
+        return "article.generate"
+
+    def session_title(self):
+        return f"Article: {self.topic}"
+
+    def header(self):
+        return f"Generated Article for: {self.topic}"
@@ -0,0 +1,124 @@
+"""
+Generation core shared by the tabs, batch_cv.py and benchmarks - no UI code in here.
+
+A request object carries a tool's inputs, validates them and builds its prompt; generate()
+sends it through invoke_llm (admission control, usage accounting, tracing) and returns a
+GenerationResult. agenerate() and generate_batch() run the same call in a worker thread,
+the latter for many requests with bounded concurrency.
+"""
+
+import asyncio
+import time
+from utils.llm import get_llm, invoke_llm, usage_record
+from utils.chat_sessions import create_chat_session
+from utils.memory import save_chat_message
+
+class RequestError(ValueError):
+    """A request is missing or has invalid inputs; the message is meant for the user"""
+
+class GenerationRequest:
+    """
+    Base of the tools' requests. Subclasses set tab_name (their chat library) and implement
+    validate(), prompt(), prompt_kind(), session_title() and header(); a request that takes
+    more than one model call overrides run().
+    """
+
+    tab_name = None
+
+    def __init__(self, model, temperature, user_id):
+        self.model = model
+        self.temperature = float(temperature)
+        self.user_id = user_id
+
+    def validate(self):
+        """Raise RequestError if the request cannot be generated"""
+
+    def prompt(self):
+        raise NotImplementedError
+
+    def prompt_kind(self):
+        """Label of the call in tracing and llm_usage, e.g. "code.explain" """
+        raise NotImplementedError
+
+    def session_title(self):
+        """First message of the chat session the result is saved to (its library title)"""
+        raise NotImplementedError
+
+    def header(self):
+        """Bold heading put above the model's answer"""
+        raise NotImplementedError
+
+    def run(self):
+        """Call the model with prompt() and return a GenerationResult"""
+        started = time.perf_counter()
+        llm = get_llm(self.model, self.temperature)
+        response = invoke_llm(llm, self.prompt(), self.user_id, prompt_kind=self.prompt_kind())
+        return GenerationResult(self, response.content, usage_record(response),
+                                round((time.perf_counter() - started) * 1000))
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" if not isinstance(v, str) or len(v) < 40 else f"{k}=<{len(v)} chars>"
+                           for k, v in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+class GenerationResult:
+    """A finished generation: the answer, its usage record and timing (details: request-specific extras)"""
+
+    def __init__(self, request, content, usage, latency_ms, details=None):
+        self.request = request
+        self.content = content
+        self.usage = usage
+        self.latency_ms = latency_ms
+        self.details = details or {}
+
+    @property
+    def message(self):
+        """The answer as it is stored in the chat library"""
+        return f"**{self.request.header()}**\n\n{self.content}"
+
+def generate(request):
+    """Validate and run a request (blocks; raises RequestError or AdmissionError)"""
+    request.validate()
+    return request.run()
+
+async def agenerate(request):
+    """generate() in a worker thread"""
+    return await asyncio.to_thread(generate, request)
+
+async def agenerate_batch(requests, concurrency=4, on_result=None):
+    """
+    Generate many requests with at most `concurrency` in flight (the admission controller's
+    limits still apply). Returns results in request order; a failed request yields its exception.
+    on_result(index, result_or_exception) is called as each one finishes.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index, request):
+        async with semaphore:
+            try:
+                outcome = await agenerate(request)
+            except Exception as e:
+                outcome = e
+        if on_result:
+            on_result(index, outcome)
+        return outcome
+
+    return await asyncio.gather(*(one(i, request) for i, request in enumerate(requests)))
+
+def generate_batch(requests, concurrency=4, on_result=None):
+    """agenerate_batch() from synchronous code"""
+    return asyncio.run(agenerate_batch(requests, concurrency, on_result))
+
+def save_to_new_session(result):
+    """Store a result as the first message of a new chat session; returns (session_id, message_id)"""
+    request = result.request
+    session_id = create_chat_session(request.user_id, request.tab_name, first_message=request.session_title())
+    message_id = save_chat_message(request.user_id, session_id, request.tab_name, "assistant", result.message,
+                                   usage=result.usage)
+    return session_id, message_id
+
+def save_to_session(result, session_id):
+    """Append a result to an existing chat session; returns the message_id"""
+    request = result.request
+    return save_chat_message(request.user_id, session_id, request.tab_name, "assistant", result.message,
+                             usage=result.usage)
@@ -0,0 +1,214 @@
+"""
+Code action requests - the code tab's Explain / Find Errors / Optimize generations, and updates
+of an earlier answer from a diff of the code (CodeUpdateRequest)
+"""
+
+from services.base import GenerationRequest, RequestError
+from services.code_explain import explain_in_parts
+from utils.code_diff import format_ranges
+from config import CODE_MAP_REDUCE_MIN_LINES, CODE_DIFF_CONTEXT_LINES
+
+# action -> session title prefix, answer header and prompt_kind
+ACTIONS = {
+    "explain": {"session_prefix": "Explain Code", "header": "Code Explanation", "prompt_kind": "code.explain"},
+    "debug": {"session_prefix": "Debug Code", "header": "Error Analysis", "prompt_kind": "code.debug"},
+    "optimize": {"session_prefix": "Optimize Code", "header": "Optimization Suggestions", "prompt_kind": "code.optimize"},
+}
+
+# action -> reviewer role and what an update covers for the changed regions (CodeUpdateRequest)
+UPDATES = {
+    "explain": ("a careful, expert programmer and teacher",
+                "the line-by-line breakdown of the changed and added lines, and any change to the key variables, "
+                "control flow or pitfalls"),
+    "debug": ("an expert code reviewer and debugger",
+              "findings in the changed regions, each with title, severity, location, what is wrong and the exact "
+              "fix as a before → after diff; show only the changed functions patched, not the whole file"),
+    "optimize": ("a pragmatic performance engineer and software craftsman",
+                 "hotspots in the changed regions with their complexity now and after the change, and a precise "
+                 "before → after change for each"),
+}
+
+class CodeActionRequest(GenerationRequest):
+    """
+    One code action (a key of ACTIONS) on a pasted snippet. findings is the local analysis
+    block (utils/code_analysis.format_findings) put into the debug and optimize prompts, profile
+    the measured profile (utils/code_profile.format_profile) put into the optimize prompt.
+    """
+
+    tab_name = "Code Explainer"
+
+    def __init__(self, action, code, model, temperature, user_id, findings="", profile=""):
+        super().__init__(model, temperature, user_id)
+        self.action = action
+        self.code = code
+        self.findings = findings
+        self.profile = profile
+
+    def validate(self):
+        if self.action not in ACTIONS:
+            raise RequestError(f"Unknown code action: {self.action}")
+        if not self.code:
+            raise RequestError("Paste code first!")
+
+    def prompt(self):
+        code = self.code
+        # Local static analysis (utils/code_analysis.py) for the model to confirm, not rediscover,
+        # and for Optimize the measured profile (utils/code_profile.py)
+        local = [self.findings] + ([self.profile] if self.action == "optimize" else [])
+        local = "\n\n".join(block for block in local if block) if self.action != "explain" else ""
+        findings_block = f"{local}\n\n        " if local else ""
+        if self.action == "explain":
+            return f"""INSTRUCTION: You are a careful, expert programmer and teacher. Detect the language automatically (or say which language you assumed). Read the CODE below and produce a thorough, line-by-line explanation that is precise, factual, and avoids speculation.
+
+    CODE:
+    ```
+    {code}
+    ```    
+        REQUIREMENTS & OUTPUT FORMAT:
+        1. Start with a one-paragraph summary (2–3 sentences) that states the language, overall purpose of the snippet, and high-level behaviour.
+        2. Then provide a numbered, line-by-line breakdown. For each line (or small group of closely related lines) include:
+        - the exact line number(s) and the original code (preserve indentation),
+        - a concise plain-English explanation of *what* it does,
+        - why it is written that way (design intent / common idioms),
+        - important side effects (state changes, I/O, exceptions it may raise),
+        - any implicit assumptions (e.g., types, variable shapes, global state).
+        3. After the line-by-line section, include:
+        - a "Key variables & data structures" section that lists each important variable, its type/shape, and meaning,
+        - a "Control flow summary" that explains loops, branches, and sequence of execution,
+        - a "Potential pitfalls & gotchas" list (runtime errors, threading issues, security concerns, edge cases) with concrete examples.
+        4. Finish with a "Suggested next steps" section: 3–6 short, pragmatic actions (tests to add, assertions, logging, input validation) to increase safety and correctness.
+
+        CONSTRAINTS:
+        - Do not invent behavior not present in the code. If a value/type is ambiguous, state the ambiguity explicitly and the reasonable assumptions you made.
+        - Use clear, technical language and code vocabulary (e.g., "mutable", "side effect", "O(n)" if relevant).
+        - Keep each line explanation to 1–4 sentences.
+
+        Return only the structured text described above (no extra preamble).
+        """
+        if self.action == "debug":
+            return f"""INSTRUCTION: You are an expert code reviewer and debugger. Read the CODE below and find *all* issues: bugs, logic errors, style problems, security issues, resource leaks, concurrency problems, and potential performance pitfalls. For each issue, provide a clear explanation and a minimal, correct fix. If you change behavior, explain tradeoffs.
+
+    CODE:
+    ```
+    {code}
+    ```  
+        {findings_block}REQUIREMENTS & OUTPUT FORMAT:
+        1. Top summary: one short paragraph that states language, whether the code runs as-is, and an overall severity rating (e.g., "Safe to run", "Needs fixes before running", "Unsafe — keeps secrets/executes external code").
+        2. Then a numbered list of findings. For each finding include:
+        - Title (short label) and severity (Critical / High / Medium / Low),
+        - Location (line numbers or function/class name),
+        - What is wrong (concise), why it is wrong (concrete reasoning and example of failure), and how to reproduce the problem with a minimal input if applicable,
+        - The exact fix: either a one-line patch, a small code snippet, or a diff (unified or inline) showing before → after,
+        - Explanation of the fix and any consequences (e.g., backwards compatibility, edge cases introduced).
+        3. After listing findings, provide:
+        - "Patched code" section containing the full corrected code block (only the corrected file or snippet). Keep formatting and indentation exact.
+        - A small "Regression tests / sanity checks" section: 3–6 concrete unit tests or assertions (with inputs & expected outputs) that verify the fixes.
+        4. If any fix requires design choices or additional info (e.g., intended behavior unknown), make a best reasonable assumption and document it; if assumption is risky, mark it and show an alternative.
+
+        CONSTRAINTS:
+        - Do not hallucinate external dependencies or project context. If you reference libraries, ensure the references are implicitly present in the code or clearly propose them as optional enhancements.
+        - Keep fixes minimal and safe; prefer explicit validation, clear error messages, and not-silent failures.
+
+        Return only the structured content above in plain text and the corrected code block (no additional commentary).
+        """
+        return f"""INSTRUCTION: You are a pragmatic performance engineer and software craftsman. Analyze the CODE below for improvements in time complexity, space complexity, correctness, readability, and maintainability. Identify hotspots and give safe, implementable optimizations.
+
+    CODE:
+    ```
+    {code}
+    ```        
+        {findings_block}REQUIREMENTS & OUTPUT FORMAT:
+        1. Short summary (1–2 lines): language and the primary optimization opportunities you found.
+        2. Profile-style "Hotspots" table (or short list) with entries:
+        - Location (line numbers or function),
+        - Why this is a hotspot (complexity or pattern, e.g., nested loops, repeated I/O, expensive API calls),
+        - Estimated time/space complexity now and after recommended change (big-O notation; where exact constants matter, mention them).
+        3. For each hotspot provide:
+        - A precise, minimal code change or alternative approach (show code snippet / before→after diff),
+        - Rationale (why it improves complexity or practical performance),
+        - Any tradeoffs (readability vs performance, memory vs speed).
+        4. Cross-cutting recommendations:
+        - 5 checklist items for maintainability (naming, modularization, tests, docstrings, type hints),
+        - 3 suggestions for runtime safety (input validation, resource limits, timeouts).
+        5. Optional: If parallelism or algorithmic redesign is appropriate, provide a short, safe example (e.g., using a thread/process pool, batching, streaming) and explain concurrency considerations.
+        6. End with a small "Benchmark plan" you could run locally: what to measure, test inputs, and expected measurable improvements.
+
+        CONSTRAINTS:
+        - Be conservative with changes that alter external behavior; prefer producing optional improved implementations alongside original code.
+        - If a change depends on libraries (e.g., numpy, collections, asyncio), state that explicitly and keep the pure-stdlib alternative.
+
+        Return only the structured text and code examples specified above.
+        """
+
+    def in_parts(self):
+        """Whether this is explained map-reduce style (services/code_explain.py)"""
+        return self.action == "explain" and self.code.count("\n") + 1 >= CODE_MAP_REDUCE_MIN_LINES
+
+    def run(self):
+        if self.in_parts():
+            return explain_in_parts(self)
+        return super().run()
+
+    def prompt_kind(self):
+        return ACTIONS[self.action]["prompt_kind"]
+
+    def session_title(self):
+        code_snippet = self.code[:30].replace("\n", " ")
+        return f"{ACTIONS[self.action]['session_prefix']}: {code_snippet}"
+
+    def header(self):
+        return ACTIONS[self.action]["header"]
+
+class CodeUpdateRequest(CodeActionRequest):
+    """
+    Update of an earlier answer to the same action after the code was edited: the prompt carries
+    that answer and the unified diff (utils/code_diff.diff_code) instead of the whole code, and
+    asks only for what the changes add, alter or invalidate. The result is appended to the chat
+    session that holds the earlier answer.
+    """
+
+    def __init__(self, action, code, delta, previous_analysis, model, temperature, user_id, findings="", profile=""):
+        super().__init__(action, code, model, temperature, user_id, findings=findings, profile=profile)
+        self.delta = delta
+        self.previous_analysis = previous_analysis
+
+    def validate(self):
+        super().validate()
+        if not self.delta["hunks"]:
+            raise RequestError("The code has not changed since the last analysis.")
+
+    def prompt(self):
+        role, scope = UPDATES[self.action]
+        header = ACTIONS[self.action]["header"].upper()
+        local = [self.findings] + ([self.profile] if self.action == "optimize" else [])
+        local = "\n\n".join(block for block in local if block) if self.action != "explain" else ""
+        local_block = f"\n{local}\n" if local else ""
+        return f"""INSTRUCTION: You are {role}. You wrote the {header} below for an earlier version of some code. The code has since been edited; the unified diff below shows only the changed regions with {CODE_DIFF_CONTEXT_LINES} lines of context ("-" lines were removed, "+" lines were added, and each "@@ -a,b +c,d @@" header gives the previous and current line numbers). Update your analysis for these changes.
+
+PREVIOUS {header}:
+{self.previous_analysis}
+
+CHANGES (previous → current):
+```diff
+{self.delta['diff']}
+```
+{local_block}
+OUTPUT FORMAT:
+1. "What changed": 1–3 sentences on the edit and its intent as far as the code shows it.
+2. "Updated analysis": {scope}. Use the same structure and level of detail as the previous analysis, with line numbers of the current version.
+3. "Previous points affected": the points of the previous analysis that the changes resolve, alter or invalidate (name them by title or line numbers), followed by one sentence confirming that the rest still applies.
+
+CONSTRAINTS:
+- Code outside the diff is unchanged: rely on the previous analysis for it, and do not repeat points that still hold.
+- Do not invent behavior not present in the diff or the previous analysis; state ambiguities explicitly.
+- Return only these sections (no preamble).
+"""
+
+    def in_parts(self):
+        return False
+
+    def prompt_kind(self):
+        return f"{ACTIONS[self.action]['prompt_kind']}.update"
+
+    def header(self):
+        return f"Updated {ACTIONS[self.action]['header']} ({format_ranges(self.delta['ranges'])} changed)"
@@ -0,0 +1,178 @@
+"""
+Map-reduce explanations of large code inputs (CodeActionRequest "explain" at
+CODE_MAP_REDUCE_MIN_LINES lines or more)
+
+- map: every chunk from utils/code_chunks.py is explained line by line on its own, up to
+  CODE_MAP_CONCURRENCY at a time, with the file's outline for context. Lines are numbered
+  L1.. within the chunk and renumbered locally, so an explanation does not depend on where
+  its chunk sits in the file
+- reduce: one call turns the chunks' short notes into the summary, variables, control flow,
+  pitfalls and next steps sections of the single-prompt explanation
+- chunk explanations are cached by hash of (chunk text, model, temperature) and the reduce by
+  hash of all notes, so re-explaining after editing one function only calls the model for
+  that function's chunk and the reduce
+"""
+
+import hashlib
+import re
+import time
+from services.base import GenerationRequest, GenerationResult, generate_batch
+from utils.cache import LRUCache
+from utils.code_chunks import split_code
+from config import CODE_MAP_CONCURRENCY, CODE_CHUNK_CACHE_SIZE
+
+# Bump when the chunk or reduce prompts change
+EXPLAIN_VERSION = 1
+
+NOTES_MARKER = "PART NOTES:"
+_LINE_REF = re.compile(r"\bL(\d+)\b")
+_FILE_SECTIONS = re.compile(r"^\W*key variables", re.IGNORECASE | re.MULTILINE)
+
+_cache = LRUCache(CODE_CHUNK_CACHE_SIZE)
+
+def _key(*parts):
+    return hashlib.sha256("\x00".join(str(p) for p in (EXPLAIN_VERSION,) + parts).encode()).hexdigest()
+
+class ChunkExplainRequest(GenerationRequest):
+    """Line-by-line explanation of one chunk (the map step)"""
+
+    tab_name = "Code Explainer"
+
+    def __init__(self, chunk, outline, language, model, temperature, user_id):
+        super().__init__(model, temperature, user_id)
+        self.chunk = chunk
+        self.outline = outline
+        self.language = language
+
+    def prompt(self):
+        numbered = "\n".join(f"L{n:<4}| {line}" for n, line in enumerate(self.chunk["text"].split("\n"), 1))
+        return f"""INSTRUCTION: You are a careful, expert programmer and teacher. Below is one part ({self.chunk['name']}) of a larger {self.language} file. Explain this part line by line, precisely and without speculation.
+
+FILE OUTLINE (context only, do not explain it):
+{self.outline}
+
+PART (each line is prefixed with its number L1, L2, ... and "| "):
+```
+{numbered}
+```
+
+OUTPUT FORMAT:
+1. A numbered line-by-line breakdown. For each line (or small group of closely related lines) give the line reference written exactly as L<n> or L<n>–L<m>, the original code (preserve indentation, without the L<n> prefix), what it does, why it is written that way, important side effects and implicit assumptions. Keep each explanation to 1–4 sentences.
+2. Then a line with exactly "{NOTES_MARKER}" followed by at most 6 short bullets: purpose of this part, key variables and data structures (name, type, meaning), control flow, and potential pitfalls.
+
+CONSTRAINTS:
+- Do not invent behavior not present in the code. Names defined elsewhere in the file are listed in the outline; say when you rely on it.
+- Return only the two sections above (no preamble).
+"""
+
+    def prompt_kind(self):
+        return "code.explain.chunk"
+
+class ReduceExplainRequest(GenerationRequest):
+    """File-level sections of the explanation from the chunks' notes (the reduce step)"""
+
+    tab_name = "Code Explainer"
+
+    def __init__(self, notes, line_count, language, model, temperature, user_id):
+        super().__init__(model, temperature, user_id)
+        self.notes = notes
+        self.line_count = line_count
+        self.language = language
+
+    def prompt(self):
+        return f"""INSTRUCTION: You are a careful, expert programmer and teacher. A {self.language} file of {self.line_count} lines was explained part by part. Below are the notes on each part. Write the file-level sections of the explanation from them.
+
+PART NOTES:
+{self.notes}
+
+OUTPUT FORMAT:
+1. A one-paragraph summary (2–3 sentences) that states the language, overall purpose of the file, and high-level behaviour.
+2. A "Key variables & data structures" section that lists each important variable, its type/shape, and meaning.
+3. A "Control flow summary" that explains how the parts call each other, loops, branches, and the sequence of execution.
+4. A "Potential pitfalls & gotchas" list (runtime errors, threading issues, security concerns, edge cases) with concrete examples.
+5. A "Suggested next steps" section: 3–6 short, pragmatic actions (tests to add, assertions, logging, input validation).
+
+CONSTRAINTS:
+- Only use what the notes say; if they disagree or leave something open, state the ambiguity.
+- Return only these sections (no line-by-line breakdown, no preamble).
+"""
+
+    def prompt_kind(self):
+        return "code.explain.reduce"
+
+def _split_answer(content):
+    """(breakdown, notes) of a chunk explanation; notes fall back to the breakdown's opening"""
+    breakdown, marker, notes = content.partition(NOTES_MARKER)
+    if not marker:
+        notes = content[:600]
+    return breakdown.strip(), notes.strip()
+
+def _renumber(text, chunk):
+    """L<n> within the chunk -> L<line in the file>"""
+    length = chunk["end"] - chunk["start"] + 1
+    return _LINE_REF.sub(lambda m: f"L{chunk['start'] + int(m.group(1)) - 1}" if 1 <= int(m.group(1)) <= length
+                         else m.group(0), text)
+
+def _combine_usage(usages, request, latency_ms):
+    """One llm_usage record for the whole explanation (calls served from cache count nothing)"""
+    usages = [u for u in usages if u]
+    return {
+        "model": request.model,
+        "prompt_kind": request.prompt_kind(),
+        "prompt_tokens": sum(u["prompt_tokens"] or 0 for u in usages),
+        "completion_tokens": sum(u["completion_tokens"] or 0 for u in usages),
+        "ttft_ms": min((u["ttft_ms"] for u in usages if u["ttft_ms"] is not None), default=None),
+        "latency_ms": latency_ms,
+        "cache_hit": not usages,
+        "created_ts": time.time(),
+    }
+
+def explain_in_parts(request):
+    """Map-reduce explanation of request.code; returns a GenerationResult for `request`"""
+    started = time.perf_counter()
+    chunks, python = split_code(request.code)
+    language = "Python" if python else "source (detect the language)"
+    outline = "\n".join(f"- {chunk['name']}" for chunk in chunks)
+    model_key = (request.model, request.temperature)
+
+    answers = [_cache.get(_key(chunk["text"], *model_key)) for chunk in chunks]
+    missing = [i for i, answer in enumerate(answers) if answer is None]
+    usages = []
+    outcomes = generate_batch([ChunkExplainRequest(chunks[i], outline, language, request.model, request.temperature,
+                                                   request.user_id) for i in missing], concurrency=CODE_MAP_CONCURRENCY)
+    failures = [o for o in outcomes if isinstance(o, Exception)]
+    if missing and len(failures) == len(missing) == len(chunks):
+        raise failures[0]
+    for i, outcome in zip(missing, outcomes):
+        if isinstance(outcome, Exception):
+            answers[i] = (f"_Explanation of this part failed: {outcome}_", "(not explained)")
+            continue
+        answers[i] = _split_answer(outcome.content)
+        usages.append(outcome.usage)
+        _cache.put(_key(chunks[i]["text"], *model_key), answers[i])
+
+    notes = "\n\n".join(f"### {chunk['name']} (lines {chunk['start']}–{chunk['end']})\n{_renumber(answer[1], chunk)}"
+                        for chunk, answer in zip(chunks, answers))
+    reduce_key = _key(notes, *model_key)
+    file_sections = _cache.get(reduce_key)
+    if file_sections is None:
+        reduced = ReduceExplainRequest(notes, request.code.count("\n") + 1, language, request.model,
+                                       request.temperature, request.user_id).run()
+        file_sections = reduced.content
+        usages.append(reduced.usage)
+        if not failures:
+            _cache.put(reduce_key, file_sections)
+
+    breakdown = "\n\n".join(f"#### {chunk['name']} — lines {chunk['start']}–{chunk['end']}\n\n{_renumber(answer[0], chunk)}"
+                            for chunk, answer in zip(chunks, answers))
+    match = _FILE_SECTIONS.search(file_sections)
+    summary, rest = (file_sections[:match.start()], file_sections[match.start():]) if match else (file_sections, "")
+    content = f"{summary.strip()}\n\n### Line-by-line breakdown\n\n{breakdown}\n\n{rest.strip()}".strip()
+    latency_ms = round((time.perf_counter() - started) * 1000)
+    parts = {"chunks": len(chunks), "explained": len(missing) - len(failures), "cached": len(chunks) - len(missing),
+             "failed": len(failures)}
+    return GenerationResult(request, content, _combine_usage(usages, request, latency_ms), latency_ms, details=parts)
+
+def stats():
+    """Hit/miss counters of the chunk/reduce explanation cache, for the admin panel"""
+    return _cache.stats()
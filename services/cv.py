@@ -0,0 +1,130 @@
+"""
+CV analysis requests - the CV tab's "Interview Questions" and "Skill Highlights" generations,
+also run headless by batch_cv.py
+"""
+
+from services.base import GenerationRequest, RequestError
+
+# kind -> how a generation is titled, headed and accounted (prompt_kind in llm_usage)
+GENERATIONS = {
+    "interview_questions": {
+        "session_title": "Interview Questions",
+        "header": "Generated Interview Questions:",
+        "prompt_kind": "cv.interview_questions",
+    },
+    "skill_highlights": {
+        "session_title": "Skill Analysis",
+        "header": "Skill Highlights Analysis:",
+        "prompt_kind": "cv.skill_highlights",
+    },
+}
+
+class CVAnalysisRequest(GenerationRequest):
+    """
+    One CV generation. resume is the canonical (condensed) resume; job_description and
+    match_block (the local match analysis) are optional and only used for interview questions.
+    subject names the resume in the session title ("Interview Questions for CV").
+    """
+
+    tab_name = "CV Interview"
+
+    def __init__(self, kind, resume, model, temperature, user_id, job_description="", match_block="", subject="CV"):
+        super().__init__(model, temperature, user_id)
+        self.kind = kind
+        self.resume = resume
+        self.job_description = job_description
+        self.match_block = match_block
+        self.subject = subject
+
+    def validate(self):
+        if self.kind not in GENERATIONS:
+            raise RequestError(f"Unknown CV generation: {self.kind}")
+        if not self.resume:
+            raise RequestError("Upload resume first!")
+
+    def prompt(self):
+        if self.kind == "interview_questions":
+            return self._interview_questions_prompt()
+        return self._skill_highlights_prompt()
+
+    def prompt_kind(self):
+        return GENERATIONS[self.kind]["prompt_kind"]
+
+    def session_title(self):
+        return f"{GENERATIONS[self.kind]['session_title']} for {self.subject}"
+
+    def header(self):
+        return GENERATIONS[self.kind]["header"]
+
+    def _interview_questions_prompt(self):
+        job_description_block = f"JOB DESCRIPTION:\n{self.job_description}" if self.job_description else ""
+        return f"""
+ROLE: You are an expert technical recruiter and hiring manager. Your task is to generate highly targeted interview questions based strictly on the resume (and job description if available). Do NOT assume or invent experience not stated in the resume. If a question is based on inferred skills, label it as: (Assumed – verify with candidate).
+
+INPUT:
+RESUME:
+{self.resume}
+
+{job_description_block}
+
+{self.match_block}
+
+OUTPUT REQUIREMENTS:
+- Generate exactly 40 interview questions.
+- Categorize them into:
+    1. Behavioral (4-5 questions)
+    2. Technical / Domain-Specific (25-30 questions) again sub-categorize into:
+        - Different skill sets or domains as mentioned in the resume (e.g. Python, Six Sigma, Excel, SQL, etc.)
+    3. Role Alignment & Career Fit (4-5 questions)
+- Each question must be:
+    - Clear, concise, and directly tied to the resume and job scope.
+    - Written using strong employment and HR vocabulary (competencies, outcomes, ownership, metrics, scope, stakeholder alignment, delivery impact).
+- For each question, include a short note in brackets indicating what the interviewer is assessing (e.g., "assessing analytical capability", "evaluating hands-on expertise", "testing ownership and accountability").
+
+CONSTRAINTS:
+- Do NOT invent skills or experience that do not appear in the resume.
+- Avoid generic or filler questions — they must feel personalized and intentional.
+- No hypothetical irrelevant scenarios unless directly tied to the role.
+
+Return only the interview questions in the requested structured format.
+"""
+
+    def _skill_highlights_prompt(self):
+        return f"""
+ROLE: You are a professional career strategist, HR consultant, and hiring manager specializing in competency-based evaluation. Analyze the resume strictly based on the provided content. Do NOT infer or fabricate experiences not explicitly present.
+
+INPUT:
+RESUME:
+{self.resume}
+
+OUTPUT FORMAT (follow strictly):
+
+1. **Top 5 Most Evident and Marketable Skills**
+   - For each skill:
+        - Name of the skill
+        - Evidence from resume (quote line or summarize)
+        - Type of skill (Technical / Soft / Hybrid)
+        - Real-world hiring value (1–2 sentences)
+
+2. **How to Present Each Skill Effectively**
+   - Provide clear, recruiter-level phrasing using achievement-driven and metrics-focused language (STAR or CAR style).
+   - Include one example rewritten bullet point improvement for each skill.
+
+3. **Questions to Prepare For**
+   - 6–10 targeted questions hiring managers could ask to validate the listed skills.
+   - Label questions by category: Technical Validation / Experience Depth / Behavioral Competency / Role Positioning.
+
+4. **Skill Gaps to Address**
+   - Identify possible missing or weak areas relevant to the resume content and (if strong signals exist) the likely role.
+   - Provide:
+        - Gap name
+        - Why it matters in hiring evaluations
+        - Suggested Learning or Upskilling Direction (tools, frameworks, certifications, expected capabilities)
+
+CONSTRAINTS:
+- Do not hallucinate certifications, job titles, or achievements.
+- If information is missing or unclear, state: "Information insufficient — recommend adding clarity."
+- Use recruitment-grade, direct, and actionable wording.
+
+Return information in structured bullet points — no filler commentary.
+"""
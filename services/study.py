@@ -0,0 +1,94 @@
+"""
+Study plan requests - the study tab's "Generate Study Plan"
+"""
+
+from services.base import GenerationRequest, RequestError
+from config import STUDY_MIN_WEEKS, STUDY_MAX_WEEKS
+
+KNOWLEDGE_LEVELS = ["Beginner", "Intermediate", "Advanced"]
+LEARNING_METHODS = ["Videos", "Books", "Practice"]
+
+class StudyPlanRequest(GenerationRequest):
+    """A week-by-week study plan for subject"""
+
+    tab_name = "Study Plan"
+
+    def __init__(self, subject, model, temperature, user_id, learning_goal="", knowledge_level="Beginner",
+                 learning_style=("Videos",), duration_weeks=4, daily_hours=2.0):
+        super().__init__(model, temperature, user_id)
+        self.subject = subject
+        self.learning_goal = learning_goal
+        self.knowledge_level = knowledge_level
+        self.learning_style = list(learning_style)
+        self.duration_weeks = duration_weeks
+        self.daily_hours = daily_hours
+
+    def validate(self):
+        if not self.subject:
+            raise RequestError("Enter a subject!")
+        if not STUDY_MIN_WEEKS <= self.duration_weeks <= STUDY_MAX_WEEKS:
+            raise RequestError(f"Duration must be between {STUDY_MIN_WEEKS} and {STUDY_MAX_WEEKS} weeks")
+        if self.knowledge_level not in KNOWLEDGE_LEVELS:
+            raise RequestError(f"Unknown knowledge level: {self.knowledge_level}")
+
+    def prompt(self):
+        return f"""
+ROLE: You are an expert curriculum designer and learning strategist. Your task is to create a precise, research-backed study plan based strictly on the given inputs. Do NOT add topics, skills, or timelines not supported by the inputs. If a detail is unclear or unspecified, state it neutrally rather than guessing.
+
+INPUTS:
+- Subject: {self.subject}
+- Duration: {self.duration_weeks} weeks
+- Current Knowledge Level: {self.knowledge_level}
+- Learning Goal: {self.learning_goal}
+- Daily Study Time: {self.daily_hours} hours/day
+- Preferred Learning Methods: {', '.join(self.learning_style)}
+
+OUTPUT STRUCTURE (follow exactly):
+
+1. **Program Overview**
+   - 4–7 sentence summary describing: scope of learning, alignment with input goal, expected difficulty, and learning strategy approach.
+
+2. **Learning Objectives**
+   - 6–10 clear, measurable, outcome-focused objectives using high-clarity verbs (e.g., analyze, apply, evaluate, implement, demonstrate).
+
+3. **Week-by-Week Roadmap**
+   - For each week:
+       - Week number
+       - Primary theme or milestone
+       - Specific subtopics or modules
+       - Expected outcome/end-of-week competency
+       - Daily structure example based on provided daily hours and learning methods
+
+   Requirements:
+   - Timeline MUST stay aligned with the exact number of weeks and must not shift or condense content.
+   - Maintain realistic pacing based on the learner’s level and hours/day.
+
+4. **Recommended Resources**
+   - Organize by type: Books/Textbooks, Videos/Courses, Tools/Software, Practice Platforms.
+   - Only recommend widely available, reputable sources (avoid obscure or unverifiable ones).
+   - If a resource may require payment, label it as: (Paid).
+
+5. **Progress and Performance Metrics**
+   - Define measurable checkpoints, reflection prompts, assignments, or benchmarks for each phase of the plan.
+   - Include frequency of assessment (ex: weekly quiz, monthly project, spaced recall checkpoints).
+
+6. **Success and Retention Strategies**
+   - Provide actionable study techniques aligned to the learner’s stated methods.
+   - Include motivation, time management, revision cycles, spaced repetition, and consistency guidelines.
+
+CONSTRAINTS:
+- Do NOT hallucinate niche tools, fake books, or fictional methodologies.
+- Keep tone structured, professional, timeline-focused and easy for a learner to follow.
+- Ensure clarity of format, proper headings, clean spacing, and logically sequenced instructional design.
+
+Return ONLY the formatted study plan with no extra commentary.
+"""
+
+    def prompt_kind(self):
+        return "study.generate"
+
+    def session_title(self):
+        return f"Plan: {self.subject}"
+
+    def header(self):
+        return f"Study Plan for {self.subject}"
@@ -3,15 +3,17 @@ Article Generator Tab - Updated for Session Isolation
 """
 
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from utils.memory import save_chat_message
+from services.article import ArticleRequest
+from utils.tracing import traced
 # Import create_chat_session to allow making new sessions on demand
-from utils.chat_sessions import create_chat_session, get_user_sessions, get_session_messages, update_session_title_if_new
+from utils.chat_sessions import create_chat_session, get_user_sessions, get_session_messages
 from components.chat_library import show_chat_library
-from config import ARTICLE_GENERATOR_MODELS, SYSTEM_PROMPTS, WRITING_STYLES, ARTICLE_MAX_WORDS, ARTICLE_MIN_WORDS, ARTICLE_DEFAULT_WORDS
-import os
+from components.chat_pane import show_chat_pane
+from components.generation import run_generation
+from components.article_view import show_article, start_article, editor_context, apply_editor_reply, is_article_message
+from config import ARTICLE_GENERATOR_MODELS, WRITING_STYLES, ARTICLE_MAX_WORDS, ARTICLE_MIN_WORDS, ARTICLE_DEFAULT_WORDS
 
+@traced("tab.article_generator")
 def article_generator_tab():
     """Article Generator Tab"""
 
@@ -29,7 +31,7 @@ def article_generator_tab():
             latest_session = sessions[0]
             st.session_state[session_id_key] = latest_session[0]
             db_msgs = get_session_messages(latest_session[0])
-            st.session_state[messages_key] = [{"role": r, "content": c} for r, c, _ in db_msgs]
+            st.session_state[messages_key] = [{"role": r, "content": c, "id": i} for r, c, _, i in db_msgs]
         else:
             new_id = create_chat_session(user_id, tab_name)
             st.session_state[session_id_key] = new_id
@@ -66,124 +68,27 @@ def article_generator_tab():
                 temperature = st.slider("Creativity Level",min_value=0.0,max_value=1.0,
                     value=0.3,step=0.1,key="article_temperature")
 
-        # --- GENERATION LOGIC (CRITICAL FIX) ---
         if st.button("Generate Article", key="article_generate"):
-            if not article_topic:
-                st.error("Enter article topic!")
-            else:
-                with st.spinner("Generating article..."):
-                    try:
-                        
-                        new_sess_id = create_chat_session(user_id, tab_name, first_message=f"Article: {article_topic}")
-                        st.session_state[session_id_key] = new_sess_id
-                        st.session_state[messages_key] = []
-                        
-                        # Generate content
-                        prompt_text = f"""You are an expert researcher and professional writer.
-
-Your task is to generate a high-quality, publication-ready article with the following specifications:
-
-Topic: **{article_topic}**  
-Target Word Count: **{word_count} words**  
-Writing Style: **{writing_style}**  
-Creativity Level: **{temperature}** (0 = factual/technical, 1 = highly creative)  
-{f'Include a properly formatted "Table of Contents" section at the beginning.' if include_toc else ''}
-{f'Include reliable external references and citations formatted consistently (APA/MLA/Harvard — choose one and follow it throughout).' if include_sources else 'Do not include external references.'}
-
----
-
-### **Content Requirements**
-
-- The article must be **deeply researched**, logically structured, and written with **high linguistic precision**.
-- Use clear **H1, H2, H3 headings**, and avoid overly long paragraphs.
-- Maintain a tone suitable for publication (academic, journalistic, editorial, or as per the style defined).
-- Include:
-  - Definitions and explanations where needed  
-  - Examples, case studies, or real-world applications (when relevant)  
-  - Statistics, evidence, or insights (only if accurate and verifiable — no fabricated facts)
-- Ensure the narrative flows smoothly using **cohesive transitions and varied sentence structure.**
-
----
-
-### **Writing & Quality Standards**
-
-- Vocabulary should be **rich, sophisticated, and contextually precise**, but avoid unnecessary jargon.
-- Maintain clarity and readability — aim for a balance of accessibility and intellectual depth.
-- Avoid repetition, filler content, generic phrasing, or vague statements.
-- Ensure each section meaningfully contributes to the topic.
-- Finish with a strong, concise conclusion that summarizes key insights and leaves the reader with takeaway value.
-
----
-
-### **Output Format**
-
-1. Begin writing immediately.
-2. Do not show instructions or meta commentary.
-3. Only output the final article, formatted cleanly.
-
-----
-
-Now, write the full article.:"""   
-
-                        llm = ChatGroq(model=selected_model, temperature=temperature, groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY"))  
-                        response = llm.invoke(prompt_text).content
-                        # st.session_state['generated_article'] = response
-                        
-                        msg = f"**Generated Article for: {article_topic}**\n\n{response}"
-                        st.session_state[messages_key].append({"role": "assistant", "content": msg})
-                        save_chat_message(user_id, new_sess_id, tab_name, "assistant", msg)
-                        
-                        if f"cached_sessions_list_{tab_key}" in st.session_state:
-                            del st.session_state[f"cached_sessions_list_{tab_key}"]
-                        
-                        st.success("Generated!")
-                        st.rerun()
-
-                    except Exception as e:
-                        st.error(f"Error: {str(e)}")
+            request = ArticleRequest(article_topic, selected_model, temperature, user_id, word_count=word_count,
+                                     writing_style=writing_style, include_toc=include_toc, include_sources=include_sources)
+            run_generation(request, tab_key, spinner_text="Generating article...", success_text="Generated!",
+                           on_success=lambda result: start_article(tab_key, result.content, article_topic))
         
-        # Display Generated Article (Current View)
-        if 'generated_article' in st.session_state:
-            st.markdown("---")
-            st.markdown("""<h4 style='text-align: left; color: #33FF33;'>✅ Generated Article</h4>""", unsafe_allow_html=True)
-            st.markdown(f"**Topic:** {article_topic}")
-            st.markdown("---")
-            st.markdown(st.session_state['generated_article'])
+        # Display Generated Article (Current View), stored by section
+        show_article(tab_key)
         
         # --- CHAT INTERFACE ---
-        st.markdown("---")
-        st.markdown("""<h4 style='text-align: left; color: #33FF33;'>✍🏻 Chat with Editor</h4>""", unsafe_allow_html=True)
-        
-        # Display History (Now isolated to the specific session)
-        for msg in st.session_state[messages_key]:
-            with st.chat_message(msg["role"]):
-                st.write(msg["content"])
-        
-        if user_input := st.chat_input("Ask about article...", key="article_chat_input"):
-
-            current_sess_id = st.session_state[session_id_key]
-            update_session_title_if_new(current_sess_id, user_input)
-            st.session_state[messages_key].append({"role": "user", "content": user_input})
-
-            with st.chat_message("user"):
-                st.write(user_input)
-            
-            save_chat_message(user_id, current_sess_id, tab_name, "user", user_input)
-            
-            with st.spinner("Editor is working..."):
-                try:
-                    llm = ChatGroq(model=selected_model, temperature=temperature, groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY"))
-                    context = f"{SYSTEM_PROMPTS['article_generator']}\nArticle being edited:\n{st.session_state.get('generated_article', 'Not yet generated')}"
-                    
-                    chat_history_llm = [(m["role"], m["content"]) for m in st.session_state[messages_key][-10:]]
-                    prompt = ChatPromptTemplate.from_messages([("system", context), *chat_history_llm])
-                    response = llm.invoke(prompt.format_prompt().to_messages()).content
-                    
-                    st.session_state[messages_key].append({"role": "assistant", "content": response})
-                    with st.chat_message("assistant"):
-                        st.write(response)
-                    
-                    save_chat_message(user_id, current_sess_id, tab_name, "assistant", response)
-
-                except Exception as e:
-                    st.error(f"Error: {str(e)}")
\ No newline at end of file
+        show_chat_pane(
+            user_id, tab_name, tab_key,
+            title_html="""<h4 style='text-align: left; color: #33FF33;'>✍🏻 Chat with Editor</h4>""",
+            placeholder="Ask about article...",
+            input_key="article_chat_input",
+            spinner_text="Editor is working...",
+            # The editor sees the current article by section and answers with section patches
+            context=lambda question: editor_context(tab_key),
+            prompt_kind="article.chat",
+            selected_model=selected_model,
+            temperature=temperature,
+            on_reply=lambda reply: apply_editor_reply(tab_key, reply),
+            skip_history=is_article_message,
+        )
@@ -3,14 +3,22 @@ Code Explainer & Problem Solver Tab
 """
 
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from utils.memory import save_chat_message
-from utils.chat_sessions import create_chat_session, get_user_sessions, get_session_messages, update_session_title_if_new
+from services.code import CodeActionRequest, CodeUpdateRequest
+from utils.code_chunks import split_code
+from utils.code_diff import diff_code, worth_updating
+from utils.code_analysis import analyze, format_findings
+from utils.code_profile import profile_code, cached_profile, format_profile
+from utils.tracing import traced
+from utils.chat_sessions import create_chat_session, get_user_sessions, get_session_messages
 from components.chat_library import show_chat_library
-from config import CODE_EXPLAINER_MODELS, SYSTEM_PROMPTS
-import os
+from components.chat_pane import show_chat_pane
+from components.generation import run_generation
+from components.code_findings import show_code_findings, show_code_profile
+from config import CODE_EXPLAINER_MODELS, SYSTEM_PROMPTS, CODE_PROFILING_ENABLED
 
+BUTTONS = {"explain": "Explain Code", "debug": "Find Errors", "optimize": "Optimize"}
+
+@traced("tab.code_explainer")
 def code_explainer_tab():
     """Code Explainer & Problem Solver Tab"""
 
@@ -28,7 +36,7 @@ def code_explainer_tab():
             latest_session = sessions[0]
             st.session_state[session_id_key] = latest_session[0]
             db_msgs = get_session_messages(latest_session[0])
-            st.session_state[messages_key] = [{"role": r, "content": c} for r, c, _ in db_msgs]
+            st.session_state[messages_key] = [{"role": r, "content": c, "id": i} for r, c, _, i in db_msgs]
         else:
             new_id = create_chat_session(user_id, tab_name)
             st.session_state[session_id_key] = new_id
@@ -59,167 +67,107 @@ def code_explainer_tab():
         with st.expander("⚠️🚫 Temperature Guidance", expanded=False):
             st.markdown("""<h5 style='color:#b8860b;'>How to use the temperature setting:</h5>...""", unsafe_allow_html=True)
 
-        # --- Helper for Action Buttons ---
-        def run_code_action(prompt_text, session_prefix, output_header):
-            if 'current_code' not in st.session_state or not st.session_state['current_code']:
-                st.error("Paste code first!")
-                return
-            
-            with st.spinner("Analyzing..."):
-                try:
-                    
-                    code_snippet = st.session_state['current_code'][:30].replace("\n", " ")
-                    new_sess_id = create_chat_session(user_id, tab_name, first_message=f"{session_prefix}: {code_snippet}")
-                    st.session_state[session_id_key] = new_sess_id
-                    st.session_state[messages_key] = []
-                    
-                    llm = ChatGroq(model=selected_model, temperature=temperature, groq_api_key=os.getenv("GROQ_API_KEY"))
-                    response = llm.invoke(prompt_text).content
-                    
-                    full_msg = f"**{output_header}**\n\n{response}"
-                    st.session_state[messages_key].append({"role": "assistant", "content": full_msg})
-                    save_chat_message(user_id, new_sess_id, tab_name, "assistant", full_msg)
-
-                    if f"cached_sessions_list_{tab_key}" in st.session_state:
-                        del st.session_state[f"cached_sessions_list_{tab_key}"]
-                    
-                    st.success("Done!")
-                    st.rerun()
-
-                except Exception as e:
-                    st.error(f"Error: {str(e)}")
+        # --- Local static analysis (no model call) ---
+        current_code = st.session_state.get('current_code', '')
+        findings, profiling = "", False
+        if current_code:
+            analysis = analyze(current_code)
+            if analysis["python"]:
+                show_code_findings(analysis)
+                if st.checkbox("Add the local checks to Find Errors / Optimize prompts", value=True, key="code_checks_in_prompt"):
+                    findings = format_findings(analysis)
+                if CODE_PROFILING_ENABLED and not analysis["syntax_error"]:
+                    profiling = st.checkbox("Profile the code for Optimize (runs it in a sandbox with CPU, memory "
+                                            "and time limits and no network)", value=False, key="code_profile_opt_in")
+                    profile = cached_profile(current_code) if profiling else None
+                    if profile:
+                        show_code_profile(profile)
+                    if 'code_profile_note' in st.session_state:
+                        st.warning(st.session_state.pop('code_profile_note'))
+
+        # --- Incremental re-analysis against the last analyzed version in this chat session ---
+        large = bool(current_code) and CodeActionRequest("explain", current_code, selected_model, temperature,
+                                                         user_id).in_parts()
+        session_id = st.session_state[session_id_key]
+        baseline = st.session_state.setdefault('code_baselines', {}).get(session_id)
+        delta = None
+        if baseline and current_code and not (baseline['action'] == "explain" and large):
+            button = BUTTONS[baseline['action']]
+            if current_code == baseline['code']:
+                st.caption(f"Unchanged since the last {button} in this chat: clicking it again reuses that answer.")
+            else:
+                delta = diff_code(baseline['code'], current_code)
+                if not worth_updating(delta, current_code, baseline['analysis']):
+                    delta = None
+                    st.caption(f"Changed too much since the last {button} in this chat for an update: "
+                               f"{button} analyzes the whole code again in a new chat.")
+                elif not st.checkbox(f"{button} sends only the changes ({delta['changed_lines']} line{'s' if delta['changed_lines'] != 1 else ''} in "
+                                     f"{delta['hunks']} region{'s' if delta['hunks'] != 1 else ''}) and updates "
+                                     "the last answer in this chat", value=True, key="code_incremental"):
+                    delta = None
 
         exp_col, debug_col, opt_col = st.columns(3)
-        
+        action = None
         with exp_col:
-            if st.button("Explain Code", key="code_explain"):
-                prompt = f"""INSTRUCTION: You are a careful, expert programmer and teacher. Detect the language automatically (or say which language you assumed). Read the CODE below and produce a thorough, line-by-line explanation that is precise, factual, and avoids speculation.
-
-    CODE:
-    ```
-    {st.session_state['current_code']}
-    ```    
-        REQUIREMENTS & OUTPUT FORMAT:
-        1. Start with a one-paragraph summary (2–3 sentences) that states the language, overall purpose of the snippet, and high-level behaviour.
-        2. Then provide a numbered, line-by-line breakdown. For each line (or small group of closely related lines) include:
-        - the exact line number(s) and the original code (preserve indentation),
-        - a concise plain-English explanation of *what* it does,
-        - why it is written that way (design intent / common idioms),
-        - important side effects (state changes, I/O, exceptions it may raise),
-        - any implicit assumptions (e.g., types, variable shapes, global state).
-        3. After the line-by-line section, include:
-        - a "Key variables & data structures" section that lists each important variable, its type/shape, and meaning,
-        - a "Control flow summary" that explains loops, branches, and sequence of execution,
-        - a "Potential pitfalls & gotchas" list (runtime errors, threading issues, security concerns, edge cases) with concrete examples.
-        4. Finish with a "Suggested next steps" section: 3–6 short, pragmatic actions (tests to add, assertions, logging, input validation) to increase safety and correctness.
-
-        CONSTRAINTS:
-        - Do not invent behavior not present in the code. If a value/type is ambiguous, state the ambiguity explicitly and the reasonable assumptions you made.
-        - Use clear, technical language and code vocabulary (e.g., "mutable", "side effect", "O(n)" if relevant).
-        - Keep each line explanation to 1–4 sentences.
-
-        Return only the structured text described above (no extra preamble).
-        """
-
-                run_code_action(prompt, "Explain Code", "Code Explanation")
-        
+            if st.button(BUTTONS["explain"], key="code_explain"):
+                action = "explain"
         with debug_col:
-            if st.button("Find Errors", key="code_debug"):
-                prompt = f"""INSTRUCTION: You are an expert code reviewer and debugger. Read the CODE below and find *all* issues: bugs, logic errors, style problems, security issues, resource leaks, concurrency problems, and potential performance pitfalls. For each issue, provide a clear explanation and a minimal, correct fix. If you change behavior, explain tradeoffs.
-
-    CODE:
-    ```
-    {st.session_state['current_code']}
-    ```  
-        REQUIREMENTS & OUTPUT FORMAT:
-        1. Top summary: one short paragraph that states language, whether the code runs as-is, and an overall severity rating (e.g., "Safe to run", "Needs fixes before running", "Unsafe — keeps secrets/executes external code").
-        2. Then a numbered list of findings. For each finding include:
-        - Title (short label) and severity (Critical / High / Medium / Low),
-        - Location (line numbers or function/class name),
-        - What is wrong (concise), why it is wrong (concrete reasoning and example of failure), and how to reproduce the problem with a minimal input if applicable,
-        - The exact fix: either a one-line patch, a small code snippet, or a diff (unified or inline) showing before → after,
-        - Explanation of the fix and any consequences (e.g., backwards compatibility, edge cases introduced).
-        3. After listing findings, provide:
-        - "Patched code" section containing the full corrected code block (only the corrected file or snippet). Keep formatting and indentation exact.
-        - A small "Regression tests / sanity checks" section: 3–6 concrete unit tests or assertions (with inputs & expected outputs) that verify the fixes.
-        4. If any fix requires design choices or additional info (e.g., intended behavior unknown), make a best reasonable assumption and document it; if assumption is risky, mark it and show an alternative.
-
-        CONSTRAINTS:
-        - Do not hallucinate external dependencies or project context. If you reference libraries, ensure the references are implicitly present in the code or clearly propose them as optional enhancements.
-        - Keep fixes minimal and safe; prefer explicit validation, clear error messages, and not-silent failures.
-
-        Return only the structured content above in plain text and the corrected code block (no additional commentary).
-        """
-
-
-                run_code_action(prompt, "Debug Code", "Error Analysis")
-        
+            if st.button(BUTTONS["debug"], key="code_debug"):
+                action = "debug"
         with opt_col:
-            if st.button("Optimize", key="code_optimize"):
-                prompt = f"""INSTRUCTION: You are a pragmatic performance engineer and software craftsman. Analyze the CODE below for improvements in time complexity, space complexity, correctness, readability, and maintainability. Identify hotspots and give safe, implementable optimizations.
-
-    CODE:
-    ```
-    {st.session_state['current_code']}
-    ```        
-        REQUIREMENTS & OUTPUT FORMAT:
-        1. Short summary (1–2 lines): language and the primary optimization opportunities you found.
-        2. Profile-style "Hotspots" table (or short list) with entries:
-        - Location (line numbers or function),
-        - Why this is a hotspot (complexity or pattern, e.g., nested loops, repeated I/O, expensive API calls),
-        - Estimated time/space complexity now and after recommended change (big-O notation; where exact constants matter, mention them).
-        3. For each hotspot provide:
-        - A precise, minimal code change or alternative approach (show code snippet / before→after diff),
-        - Rationale (why it improves complexity or practical performance),
-        - Any tradeoffs (readability vs performance, memory vs speed).
-        4. Cross-cutting recommendations:
-        - 5 checklist items for maintainability (naming, modularization, tests, docstrings, type hints),
-        - 3 suggestions for runtime safety (input validation, resource limits, timeouts).
-        5. Optional: If parallelism or algorithmic redesign is appropriate, provide a short, safe example (e.g., using a thread/process pool, batching, streaming) and explain concurrency considerations.
-        6. End with a small "Benchmark plan" you could run locally: what to measure, test inputs, and expected measurable improvements.
-
-        CONSTRAINTS:
-        - Be conservative with changes that alter external behavior; prefer producing optional improved implementations alongside original code.
-        - If a change depends on libraries (e.g., numpy, collections, asyncio), state that explicitly and keep the pure-stdlib alternative.
-
-        Return only the structured text and code examples specified above.
-        """
-
-                run_code_action(prompt, "Optimize Code", "Optimization Suggestions")
-        
-        # --- Chat Interface ---
-        st.markdown("---")
-        st.markdown("""<h4 style='text-align: left; color: #33FF33;'>🎓 Chat with Code Expert</h4>""", unsafe_allow_html=True)
-        
-        for msg in st.session_state[messages_key]:
-            with st.chat_message(msg["role"]):
-                st.write(msg["content"])
-                
-        if user_input := st.chat_input("Ask about code...", key="code_chat_input"):
-
-            current_sess_id = st.session_state[session_id_key]
-            update_session_title_if_new(current_sess_id, user_input)
-            st.session_state[messages_key].append({"role": "user", "content": user_input})
+            if st.button(BUTTONS["optimize"], key="code_optimize"):
+                action = "optimize"
+
+        if large:
+            chunks, _ = split_code(current_code)
+            st.caption(f"Large input ({current_code.count(chr(10)) + 1} lines): Explain Code goes through it in "
+                       f"{len(chunks)} parts at once, then summarizes. Parts unchanged since the last run are reused.")
+        if 'code_explain_parts' in st.session_state:
+            parts = st.session_state.pop('code_explain_parts')
+            st.caption(f"Last explanation: {parts['chunks']} parts, {parts['cached']} reused, "
+                       f"{parts['explained']} explained" + (f", {parts['failed']} failed" if parts['failed'] else ""))
+
+        same_action = bool(baseline) and action == baseline['action']
+        if same_action and current_code == baseline['code']:
+            st.info(f"The code has not changed since the last {BUTTONS[action]}; its answer is in this chat.")
+        elif action:
+            update = same_action and delta is not None
+
+            def remember(result):
+                if result.details:
+                    st.session_state['code_explain_parts'] = result.details
+                # The next run of this action in this session only sends the diff against this version
+                analysis = f"{baseline['analysis']}\n\n{result.message}" if update else result.content
+                st.session_state['code_baselines'][st.session_state[session_id_key]] = {
+                    "action": action, "code": current_code, "analysis": analysis}
+
+            profile_block = ""
+            if action == "optimize" and profiling:
+                with st.spinner("Profiling in a sandbox..."):
+                    profile = profile_code(current_code)
+                profile_block = format_profile(profile)
+                if not profile_block:
+                    st.session_state['code_profile_note'] = f"Optimized without a profile: {profile['message']}"
+
+            if update:
+                request = CodeUpdateRequest(action, current_code, delta, baseline['analysis'], selected_model,
+                                            temperature, user_id, findings=findings, profile=profile_block)
+                run_generation(request, tab_key, spinner_text="Updating the analysis...", on_success=remember,
+                               session_id=session_id)
+            else:
+                request = CodeActionRequest(action, current_code, selected_model, temperature, user_id,
+                                            findings=findings, profile=profile_block)
+                run_generation(request, tab_key, spinner_text="Analyzing...", on_success=remember)
 
-            with st.chat_message("user"):
-                st.write(user_input)
-
-            save_chat_message(user_id, current_sess_id, tab_name, "user", user_input)
-            
-            with st.spinner("Expert is analyzing..."):
-                try:
-                    llm = ChatGroq(model=selected_model, temperature=temperature, groq_api_key=os.getenv("GROQ_API_KEY"))
-                    context = f"{SYSTEM_PROMPTS['code_explainer']}\nCurrent code:\n```\n{st.session_state.get('current_code', 'Not provided')}\n```"
-                    
-                    chat_history_llm = [(m["role"], m["content"]) for m in st.session_state[messages_key][-10:]]
-                    prompt = ChatPromptTemplate.from_messages([("system", context), *chat_history_llm])
-                    response = llm.invoke(prompt.format_prompt().to_messages()).content
-                    
-                    st.session_state[messages_key].append({"role": "assistant", "content": response})
-                    with st.chat_message("assistant"):
-                        st.write(response)
-                    
-                    save_chat_message(user_id, current_sess_id, tab_name, "assistant", response)
-
-                except Exception as e:
-                    st.error(f"Error: {str(e)}")
\ No newline at end of file
+        # --- Chat Interface ---
+        show_chat_pane(
+            user_id, tab_name, tab_key,
+            title_html="""<h4 style='text-align: left; color: #33FF33;'>🎓 Chat with Code Expert</h4>""",
+            placeholder="Ask about code...",
+            input_key="code_chat_input",
+            spinner_text="Expert is analyzing...",
+            context=f"{SYSTEM_PROMPTS['code_explainer']}\nCurrent code:\n```\n{st.session_state.get('current_code', 'Not provided')}\n```",
+            prompt_kind="code.chat",
+            selected_model=selected_model,
+            temperature=temperature,
+        )
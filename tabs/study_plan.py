@@ -3,14 +3,15 @@ Study Plan Generator Tab
 """
 
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from utils.memory import save_chat_message
-from utils.chat_sessions import create_chat_session, get_user_sessions, get_session_messages, update_session_title_if_new
+from services.study import StudyPlanRequest, KNOWLEDGE_LEVELS, LEARNING_METHODS
+from utils.tracing import traced
+from utils.chat_sessions import create_chat_session, get_user_sessions, get_session_messages
 from components.chat_library import show_chat_library
+from components.chat_pane import show_chat_pane
+from components.generation import run_generation
 from config import STUDY_PLAN_MODELS, SYSTEM_PROMPTS, STUDY_MIN_WEEKS, STUDY_MAX_WEEKS
-import os
 
+@traced("tab.study_plan")
 def study_plan_tab():
     """Study Plan Generator Tab"""
     
@@ -28,7 +29,7 @@ def study_plan_tab():
             latest_session = sessions[0]
             st.session_state[session_id_key] = latest_session[0]
             db_msgs = get_session_messages(latest_session[0])
-            st.session_state[messages_key] = [{"role": r, "content": c} for r, c, _ in db_msgs]
+            st.session_state[messages_key] = [{"role": r, "content": c, "id": i} for r, c, _, i in db_msgs]
         else:
             new_id = create_chat_session(user_id, tab_name)
             st.session_state[session_id_key] = new_id
@@ -51,8 +52,8 @@ def study_plan_tab():
                 subject = st.text_input("Subject/Topic", key="study_subject")
                 learning_goal = st.text_input("Learning Goal", key="study_goal")
             with bcol:
-                knowledge_level = st.selectbox("Knowledge Level",["Beginner", "Intermediate", "Advanced"],key="study_level")
-                learning_style = st.multiselect("Methods",["Videos", "Books", "Practice"],default=["Videos"],key="study_style")
+                knowledge_level = st.selectbox("Knowledge Level",KNOWLEDGE_LEVELS,key="study_level")
+                learning_style = st.multiselect("Methods",LEARNING_METHODS,default=["Videos"],key="study_style")
                 selected_model_name = st.selectbox("Model",list(STUDY_PLAN_MODELS.keys()), index=0, key="study_model_select")
                 selected_model = STUDY_PLAN_MODELS[selected_model_name]
             with ccol:
@@ -62,118 +63,20 @@ def study_plan_tab():
 
         # --- Generate Button ---
         if st.button("Generate Study Plan", key="study_generate"):
-            if not subject:
-                st.error("Enter a subject!")
-            else:
-                with st.spinner("Creating plan..."):
-                    try:
-                        
-                        new_sess_id = create_chat_session(user_id, tab_name, first_message=f"Plan: {subject}")
-                        st.session_state[session_id_key] = new_sess_id
-                        st.session_state[messages_key] = []
-
-                        prompt = f"""
-ROLE: You are an expert curriculum designer and learning strategist. Your task is to create a precise, research-backed study plan based strictly on the given inputs. Do NOT add topics, skills, or timelines not supported by the inputs. If a detail is unclear or unspecified, state it neutrally rather than guessing.
-
-INPUTS:
-- Subject: {subject}
-- Duration: {duration_weeks} weeks
-- Current Knowledge Level: {knowledge_level}
-- Learning Goal: {learning_goal}
-- Daily Study Time: {daily_hours} hours/day
-- Preferred Learning Methods: {', '.join(learning_style)}
-
-OUTPUT STRUCTURE (follow exactly):
-
-1. **Program Overview**
-   - 4–7 sentence summary describing: scope of learning, alignment with input goal, expected difficulty, and learning strategy approach.
-
-2. **Learning Objectives**
-   - 6–10 clear, measurable, outcome-focused objectives using high-clarity verbs (e.g., analyze, apply, evaluate, implement, demonstrate).
-
-3. **Week-by-Week Roadmap**
-   - For each week:
-       - Week number
-       - Primary theme or milestone
-       - Specific subtopics or modules
-       - Expected outcome/end-of-week competency
-       - Daily structure example based on provided daily hours and learning methods
-
-   Requirements:
-   - Timeline MUST stay aligned with the exact number of weeks and must not shift or condense content.
-   - Maintain realistic pacing based on the learner’s level and hours/day.
-
-4. **Recommended Resources**
-   - Organize by type: Books/Textbooks, Videos/Courses, Tools/Software, Practice Platforms.
-   - Only recommend widely available, reputable sources (avoid obscure or unverifiable ones).
-   - If a resource may require payment, label it as: (Paid).
-
-5. **Progress and Performance Metrics**
-   - Define measurable checkpoints, reflection prompts, assignments, or benchmarks for each phase of the plan.
-   - Include frequency of assessment (ex: weekly quiz, monthly project, spaced recall checkpoints).
-
-6. **Success and Retention Strategies**
-   - Provide actionable study techniques aligned to the learner’s stated methods.
-   - Include motivation, time management, revision cycles, spaced repetition, and consistency guidelines.
-
-CONSTRAINTS:
-- Do NOT hallucinate niche tools, fake books, or fictional methodologies.
-- Keep tone structured, professional, timeline-focused and easy for a learner to follow.
-- Ensure clarity of format, proper headings, clean spacing, and logically sequenced instructional design.
-
-Return ONLY the formatted study plan with no extra commentary.
-"""
-                        
-                        llm = ChatGroq(model=selected_model, temperature=temperature, groq_api_key=os.getenv("GROQ_API_KEY"))
-                        response = llm.invoke(prompt).content
-                        # st.session_state['generated_study_plan'] = response
-                        
-                        msg = f"**Study Plan for {subject}**\n\n{response}"
-                        st.session_state[messages_key].append({"role": "assistant", "content": msg})
-                        save_chat_message(user_id, new_sess_id, tab_name, "assistant", msg)
-
-                        if f"cached_sessions_list_{tab_key}" in st.session_state:
-                            del st.session_state[f"cached_sessions_list_{tab_key}"]
-                        
-                        st.success("Created!")
-                        st.rerun()
-
-                    except Exception as e:
-                        st.error(f"Error: {str(e)}")
+            request = StudyPlanRequest(subject, selected_model, temperature, user_id, learning_goal=learning_goal,
+                                       knowledge_level=knowledge_level, learning_style=learning_style,
+                                       duration_weeks=duration_weeks, daily_hours=daily_hours)
+            run_generation(request, tab_key, spinner_text="Creating plan...", success_text="Created!")
         
         # --- Chat Interface ---
-        st.markdown("---")
-        st.markdown("""<h4 style='text-align: left; color: #33FF33;'>🤝 Chat with Study Mentor</h4>""", unsafe_allow_html=True)
-        
-        for msg in st.session_state[messages_key]:
-            with st.chat_message(msg["role"]):
-                st.write(msg["content"])
-        
-        if user_input := st.chat_input("Ask mentor...", key="study_chat_input"):
-
-            current_sess_id = st.session_state[session_id_key]
-            update_session_title_if_new(current_sess_id, user_input)
-            st.session_state[messages_key].append({"role": "user", "content": user_input})
-
-            with st.chat_message("user"):
-                st.write(user_input)
-
-            save_chat_message(user_id, current_sess_id, tab_name, "user", user_input)
-            
-            with st.spinner("Thinking..."):
-                try:
-                    llm = ChatGroq(model=selected_model, temperature=temperature, groq_api_key=os.getenv("GROQ_API_KEY"))
-                    context = f"{SYSTEM_PROMPTS['study_plan']}\nPlan Context:\n{st.session_state.get('generated_study_plan', 'None')}"
-                    
-                    hist = [(m["role"], m["content"]) for m in st.session_state[messages_key][-10:]]
-                    prompt = ChatPromptTemplate.from_messages([("system", context), *hist])
-                    response = llm.invoke(prompt.format_prompt().to_messages()).content
-                    
-                    st.session_state[messages_key].append({"role": "assistant", "content": response})
-                    with st.chat_message("assistant"):
-                        st.write(response)
-                    
-                    save_chat_message(user_id, current_sess_id, tab_name, "assistant", response)
-
-                except Exception as e:
-                    st.error(str(e))
\ No newline at end of file
+        show_chat_pane(
+            user_id, tab_name, tab_key,
+            title_html="""<h4 style='text-align: left; color: #33FF33;'>🤝 Chat with Study Mentor</h4>""",
+            placeholder="Ask mentor...",
+            input_key="study_chat_input",
+            spinner_text="Thinking...",
+            context=f"{SYSTEM_PROMPTS['study_plan']}\nPlan Context:\n{st.session_state.get('generated_study_plan', 'None')}",
+            prompt_kind="study.chat",
+            selected_model=selected_model,
+            temperature=temperature,
+        )
@@ -0,0 +1,283 @@
+"""
+Process-wide admission control for LLM calls.
+
+Every model call goes through one AdmissionController per server process. It enforces:
+- a global limit on concurrent in-flight calls
+- a tokens-per-minute budget per model
+- a token bucket per user (RATE_LIMIT_CALLS per RATE_LIMIT_WINDOW)
+- weighted fair queuing across users, so one user's burst cannot starve the others
+
+The scheduling core is clock-driven and never sleeps, so the traffic simulator in
+benchmarks/admission_sim.py can replay recorded traffic against it in virtual time.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from config import (
+    LLM_MAX_CONCURRENCY, MODEL_TPM_LIMITS, DEFAULT_MODEL_TPM, RATE_LIMIT_CALLS,
+    RATE_LIMIT_WINDOW, LLM_QUEUE_TIMEOUT, ERROR_MESSAGES
+)
+
+
+class AdmissionError(Exception):
+    """Raised when a call cannot be admitted (queue timeout or provider throttling)"""
+
+
+class TokenBucket:
+    """Classic token bucket; the level may go negative when actual usage exceeds the estimate"""
+
+    def __init__(self, capacity, refill_per_sec, now):
+        self.capacity = float(capacity)
+        self.refill_per_sec = float(refill_per_sec)
+        self.level = float(capacity)
+        self.updated = now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.refill_per_sec)
+            self.updated = now
+
+    def can_consume(self, amount, now):
+        self._refill(now)
+        return self.level >= min(amount, self.capacity)
+
+    def consume(self, amount, now):
+        self._refill(now)
+        self.level -= amount
+
+    def refund(self, amount, now):
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def drain(self, now):
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+    def time_until(self, amount, now):
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        if missing <= 0:
+            return 0.0
+        if self.refill_per_sec <= 0:
+            return float("inf")
+        return missing / self.refill_per_sec
+
+
+class Ticket:
+    """One queued or running LLM call"""
+
+    def __init__(self, seq, user_id, model, est_tokens, start_tag, finish_tag, submitted):
+        self.seq = seq
+        self.user_id = user_id
+        self.model = model
+        self.est_tokens = est_tokens
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.submitted = submitted
+        self.admitted = None
+        self.actual_tokens = None
+
+    @property
+    def waited(self):
+        return (self.admitted or self.submitted) - self.submitted
+
+
+class AdmissionController:
+    """
+    Weighted fair queuing in front of the model buckets.
+    Each user's calls get a virtual finish tag of max(virtual_time, last_tag) + cost / weight;
+    the admissible head-of-line ticket with the smallest tag runs next, and virtual time
+    advances to the start tag of the last admitted ticket.
+    """
+
+    def __init__(self, max_concurrency=LLM_MAX_CONCURRENCY, model_tpm=None, default_tpm=DEFAULT_MODEL_TPM,
+                 user_calls=RATE_LIMIT_CALLS, user_window=RATE_LIMIT_WINDOW, weights=None, clock=time.monotonic):
+        self.max_concurrency = max_concurrency
+        self.model_tpm = dict(MODEL_TPM_LIMITS if model_tpm is None else model_tpm)
+        self.default_tpm = default_tpm
+        self.user_calls = user_calls
+        self.user_window = user_window
+        self.weights = weights or {}
+        self.clock = clock
+
+        self._seq = itertools.count()
+        self._queues = {}          # user_id -> list of pending tickets, FIFO
+        self._last_tag = {}        # user_id -> finish tag of the user's latest ticket
+        self._virtual_time = 0.0
+        self._running = set()
+        self._model_buckets = {}
+        self._user_buckets = {}
+        self._cond = threading.Condition()
+
+    # --- Buckets ---
+    def _model_bucket(self, model, now):
+        if model not in self._model_buckets:
+            tpm = self.model_tpm.get(model, self.default_tpm)
+            self._model_buckets[model] = TokenBucket(tpm, tpm / 60.0, now)
+        return self._model_buckets[model]
+
+    def _user_bucket(self, user_id, now):
+        if user_id not in self._user_buckets:
+            self._user_buckets[user_id] = TokenBucket(self.user_calls, self.user_calls / float(self.user_window), now)
+        return self._user_buckets[user_id]
+
+    # --- Scheduling core (no blocking, explicit `now`) ---
+    def submit(self, user_id, model, est_tokens, now=None):
+        """Queue a call and return its ticket"""
+        now = self.clock() if now is None else now
+        weight = float(self.weights.get(user_id, 1.0)) or 1.0
+        start = max(self._virtual_time, self._last_tag.get(user_id, 0.0))
+        ticket = Ticket(next(self._seq), user_id, model, est_tokens, start, start + est_tokens / weight, now)
+        self._last_tag[user_id] = ticket.finish_tag
+        self._queues.setdefault(user_id, []).append(ticket)
+        return ticket
+
+    def _admissible(self, ticket, now):
+        return (self._user_bucket(ticket.user_id, now).can_consume(1, now)
+                and self._model_bucket(ticket.model, now).can_consume(ticket.est_tokens, now))
+
+    def poll(self, now=None):
+        """Admit as many queued tickets as the limits allow; returns the admitted tickets"""
+        now = self.clock() if now is None else now
+        admitted = []
+        while len(self._running) < self.max_concurrency:
+            heads = [q[0] for q in self._queues.values() if q]
+            candidates = sorted((t for t in heads if self._admissible(t, now)), key=lambda t: (t.finish_tag, t.seq))
+            if not candidates:
+                break
+            ticket = candidates[0]
+            self._queues[ticket.user_id].pop(0)
+            self._user_bucket(ticket.user_id, now).consume(1, now)
+            self._model_bucket(ticket.model, now).consume(ticket.est_tokens, now)
+            self._virtual_time = max(self._virtual_time, ticket.start_tag)
+            ticket.admitted = now
+            self._running.add(ticket)
+            admitted.append(ticket)
+        return admitted
+
+    def release(self, ticket, actual_tokens=None, now=None):
+        """Mark a call as finished and reconcile the model budget against actual usage"""
+        now = self.clock() if now is None else now
+        self._running.discard(ticket)
+        if actual_tokens is not None:
+            ticket.actual_tokens = actual_tokens
+            bucket = self._model_bucket(ticket.model, now)
+            delta = actual_tokens - ticket.est_tokens
+            if delta > 0:
+                bucket.consume(delta, now)
+            elif delta < 0:
+                bucket.refund(-delta, now)
+
+    def cancel(self, ticket):
+        """Drop a ticket that is still queued"""
+        queue = self._queues.get(ticket.user_id, [])
+        if ticket in queue:
+            queue.remove(ticket)
+
+    def throttle(self, model, now=None):
+        """Provider said 429: empty the model bucket so queued calls back off"""
+        with self._cond:
+            now = self.clock() if now is None else now
+            self._model_bucket(model, now).drain(now)
+
+    def position(self, ticket):
+        """1-based position of a pending ticket in fair-queue order (0 once admitted)"""
+        if ticket.admitted is not None:
+            return 0
+        pending = sorted((t for q in self._queues.values() for t in q), key=lambda t: (t.finish_tag, t.seq))
+        return pending.index(ticket) + 1 if ticket in pending else 0
+
+    def queue_length(self):
+        return sum(len(q) for q in self._queues.values())
+
+    def next_wakeup(self, now=None):
+        """Seconds until a bucket refill could admit a queued ticket (None if nothing is waiting on buckets)"""
+        now = self.clock() if now is None else now
+        waits = []
+        for queue in self._queues.values():
+            if queue:
+                head = queue[0]
+                waits.append(max(self._user_bucket(head.user_id, now).time_until(1, now),
+                                 self._model_bucket(head.model, now).time_until(head.est_tokens, now)))
+        return min(waits) if waits else None
+
+    # --- Blocking API used by the app ---
+    def _wait_for_turn(self, ticket, on_wait, timeout):
+        deadline = ticket.submitted + timeout
+        last_position = None
+        while True:
+            with self._cond:
+                self.poll()
+                if ticket.admitted is not None:
+                    return
+                now = self.clock()
+                if now >= deadline:
+                    raise AdmissionError(ERROR_MESSAGES["queue_timeout"])
+                position, queue_length = self.position(ticket), self.queue_length()
+                if position == last_position or not on_wait:
+                    wakeup = self.next_wakeup(now)
+                    self._cond.wait(min(deadline - now, wakeup or 1.0, 1.0))
+                    continue
+            # UI callbacks run outside the lock
+            on_wait(position, queue_length)
+            last_position = position
+
+    @contextmanager
+    def admit(self, user_id, model, est_tokens, on_wait=None, timeout=LLM_QUEUE_TIMEOUT):
+        """
+        Block until the call may run. `on_wait(position, queue_length)` is called while queued
+        so the UI can show the user's place in line.
+        """
+        with self._cond:
+            ticket = self.submit(user_id, model, est_tokens)
+        try:
+            self._wait_for_turn(ticket, on_wait, timeout)
+            yield ticket
+        finally:
+            # Also runs when Streamlit interrupts the script (rerun/stop) while we wait
+            with self._cond:
+                if ticket.admitted is None:
+                    self.cancel(ticket)
+                else:
+                    self.release(ticket, ticket.actual_tokens)
+                self._cond.notify_all()
+            if ticket.admitted is not None:
+                _record_traffic(ticket, self.clock())
+
+
+def _record_traffic(ticket, finished):
+    """Append the call to LLM_TRAFFIC_LOG (if set) so it can be replayed by the simulator"""
+    path = os.getenv("LLM_TRAFFIC_LOG")
+    if not path:
+        return
+    record = {
+        "ts": time.time() - (finished - ticket.submitted),
+        "user": ticket.user_id,
+        "model": ticket.model,
+        "est_tokens": ticket.est_tokens,
+        "tokens": ticket.actual_tokens,
+        "wait": round(ticket.waited, 4),
+        "latency": round(finished - (ticket.admitted or finished), 4),
+    }
+    with _traffic_lock, open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+_traffic_lock = threading.Lock()
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller():
+    """Process-wide controller shared by all Streamlit sessions"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
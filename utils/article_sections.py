@@ -0,0 +1,154 @@
+"""
+Generated articles as addressable sections, and section-level patches from the editor chat
+
+- split_sections() cuts an article's markdown at its headings (H1–H3, outside code fences);
+  an article without headings is cut into paragraph groups of about ARTICLE_SECTION_WORDS
+- every section gets a stable id ("s1", "s2", ...): ids are never renumbered, and a section
+  added by an edit takes a number above every id the article had before that edit, so it never
+  takes over the id of a section the same edit deleted
+- the editor answers with patches (EDIT_INSTRUCTIONS) that apply_patches() applies locally,
+  so an edit costs the changed text instead of a full rewrite
+"""
+
+import itertools
+import re
+from config import ARTICLE_SECTION_WORDS
+
+EDIT_INSTRUCTIONS = """The article is split into sections, each wrapped in <section id="..."> tags. When the user asks for a change to the article, do not rewrite the article. Reply with one or two sentences saying what you changed, followed only by patches for the sections that change:
+- <edit id="s3"><find>exact text from that section</find><change>replacement text</change></edit> for a change inside a sentence or paragraph (repeat <find>/<change> pairs for several changes; the find text must be copied exactly and be unique in the section)
+- <replace id="s3">the complete new markdown of the section, including its heading</replace> when most of a section changes
+- <insert after="s3">markdown of a new section, including its heading</insert> to add a section (after="start" puts it first)
+- <delete id="s3"/> to remove a section
+Never repeat sections that do not change and never put the section tags in your reply. When the user only asks a question, answer it without patches."""
+
+_HEADING = re.compile(r"^#{1,3}\s+\S")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_PATCH = re.compile(r'<(replace|insert|edit)\s+(?:id|after)\s*=\s*"([^"]+)"\s*>(.*?)</\1\s*>'
+                    r'|<delete\s+id\s*=\s*"([^"]+)"\s*/?>(?:\s*</delete>)?', re.DOTALL)
+_FIND_CHANGE = re.compile(r"<find>(.*?)</find>\s*<change>(.*?)</change>", re.DOTALL)
+
+def split_sections(text):
+    """Markdown pieces of an article, one per section"""
+    pieces, current, fenced = [], [], False
+    for line in text.strip().split("\n"):
+        if _FENCE.match(line):
+            fenced = not fenced
+        if not fenced and _HEADING.match(line) and any(l.strip() for l in current):
+            pieces.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if any(l.strip() for l in current):
+        pieces.append("\n".join(current).strip())
+    if len(pieces) == 1:
+        pieces = _paragraph_groups(pieces[0])
+    return pieces
+
+def _paragraph_groups(text):
+    groups, current, words = [], [], 0
+    for paragraph in re.split(r"\n\s*\n", text):
+        current.append(paragraph.strip())
+        words += len(paragraph.split())
+        if words >= ARTICLE_SECTION_WORDS:
+            groups.append("\n\n".join(current))
+            current, words = [], 0
+    if current:
+        groups.append("\n\n".join(current))
+    return [group for group in groups if group]
+
+def _number(section_id):
+    return int(section_id[1:]) if section_id[:1] == "s" and section_id[1:].isdigit() else 0
+
+def new_sections(text):
+    """[{"id", "content"}] of a freshly generated article"""
+    return [{"id": f"s{n}", "content": piece} for n, piece in enumerate(split_sections(text), 1)]
+
+def join_sections(sections):
+    """The article's markdown"""
+    return "\n\n".join(section["content"] for section in sections)
+
+def section_title(section):
+    """Heading of a section, or its first words"""
+    first = section["content"].split("\n", 1)[0]
+    title = first.lstrip("#").strip() if first.startswith("#") else " ".join(first.split()[:6]) + "…"
+    return title.strip("*_ ")
+
+def format_for_prompt(sections):
+    """The article with its section tags, for the editor chat's system prompt"""
+    return "\n\n".join(f'<section id="{s["id"]}">\n{s["content"]}\n</section>' for s in sections)
+
+def parse_patches(reply):
+    """(note, patches) of an editor reply; a patch is (op, id, body) with op replace, insert, edit or delete"""
+    patches = []
+    for match in _PATCH.finditer(reply):
+        if match.group(4):
+            patches.append(("delete", match.group(4).strip(), ""))
+        else:
+            patches.append((match.group(1), match.group(2).strip(), match.group(3)))
+    note = _PATCH.sub("", reply).strip()
+    return note, patches
+
+def _substitute(content, find, change):
+    if find in content:
+        return content.replace(find, change, 1)
+    # Models often reflow whitespace when they copy text
+    pattern = r"\s+".join(re.escape(word) for word in find.split())
+    if pattern:
+        match = re.search(pattern, content)
+        if match:
+            return content[:match.start()] + change + content[match.end():]
+    return None
+
+def apply_patches(sections, patches):
+    """
+    Apply parsed patches to a copy of `sections`. Returns (sections, changed_ids, errors): ids of
+    sections that are new or have new content, and one message per patch that could not be applied.
+    A replaced or inserted section whose markdown has several headings becomes several sections.
+    """
+    sections = [dict(section) for section in sections]
+    changed, errors = [], []
+    # Only goes up: a deleted section's id is not handed to a section added later in the edit
+    numbers = itertools.count(max((_number(s["id"]) for s in sections), default=0) + 1)
+
+    def index_of(section_id):
+        return next((i for i, s in enumerate(sections) if s["id"] == section_id), None)
+
+    def place(at, pieces, keep_id=None):
+        for offset, piece in enumerate(pieces):
+            section_id = keep_id if offset == 0 and keep_id else f"s{next(numbers)}"
+            sections.insert(at + offset, {"id": section_id, "content": piece})
+            changed.append(section_id)
+
+    for op, section_id, body in patches:
+        index = -1 if op == "insert" and section_id == "start" else index_of(section_id)
+        if index is None:
+            errors.append(f"{op} {section_id}: no such section")
+            continue
+        if op == "delete":
+            del sections[index]
+            changed[:] = [c for c in changed if c != section_id]
+        elif op in ("replace", "insert"):
+            pieces = split_sections(body) if body.strip() else []
+            if not pieces:
+                errors.append(f"{op} {section_id}: empty section")
+                continue
+            if op == "replace":
+                del sections[index]
+                changed[:] = [c for c in changed if c != section_id]
+                place(index, pieces, keep_id=section_id)
+            else:
+                place(index + 1, pieces)
+        else:
+            pairs = _FIND_CHANGE.findall(body)
+            content = sections[index]["content"]
+            for find, change in pairs:
+                updated = _substitute(content, find.strip(), change.strip())
+                if updated is None:
+                    errors.append(f"edit {section_id}: text not found: {find.strip()[:60]!r}")
+                else:
+                    content = updated
+            if not pairs:
+                errors.append(f"edit {section_id}: no <find>/<change> pair")
+            if content != sections[index]["content"]:
+                sections[index]["content"] = content
+                changed.append(section_id)
+    return sections, list(dict.fromkeys(changed)), errors
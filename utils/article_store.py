@@ -0,0 +1,66 @@
+"""
+Persistence of sectioned articles (utils/article_sections.py) in the article_sections table,
+one row per section of an article tab chat session
+"""
+
+from auth.database import get_connection
+from utils.tracing import traced
+
+@traced("db.save_article")
+def save_article(session_id, sections):
+    """Store a whole article for a session, replacing any stored one"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM article_sections WHERE session_id=%s", (session_id,))
+    cursor.executemany(
+        "INSERT INTO article_sections (session_id, section_id, position, content) VALUES (%s, %s, %s, %s)",
+        [(session_id, s["id"], position, s["content"]) for position, s in enumerate(sections)]
+    )
+    conn.commit()
+    conn.close()
+
+@traced("db.load_article")
+def load_article(session_id):
+    """Sections of a session's article in order ([] if it has none)"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT section_id, content FROM article_sections WHERE session_id=%s ORDER BY position",
+        (session_id,)
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return [{"id": section_id, "content": content} for section_id, content in rows]
+
+@traced("db.save_article_edit")
+def save_article_edit(session_id, before, after, changed_ids):
+    """
+    Persist one edit: write the rows of changed sections, delete removed ones and renumber
+    only the sections an insert or delete moved. Returns the number of rows written.
+    """
+    old_positions = {s["id"]: position for position, s in enumerate(before)}
+    changed = set(changed_ids)
+    removed = [(session_id, section_id) for section_id in old_positions if section_id not in {s["id"] for s in after}]
+    upserts, moves = [], []
+    for position, section in enumerate(after):
+        if section["id"] in changed:
+            upserts.append((session_id, section["id"], position, section["content"]))
+        elif old_positions.get(section["id"]) != position:
+            moves.append((position, session_id, section["id"]))
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    if removed:
+        cursor.executemany("DELETE FROM article_sections WHERE session_id=%s AND section_id=%s", removed)
+    if moves:
+        cursor.executemany("UPDATE article_sections SET position=%s WHERE session_id=%s AND section_id=%s", moves)
+    if upserts:
+        cursor.executemany(
+            """INSERT INTO article_sections (session_id, section_id, position, content) VALUES (%s, %s, %s, %s)
+               ON CONFLICT (session_id, section_id) DO UPDATE SET content=excluded.content, position=excluded.position,
+                   revision=article_sections.revision + 1, updated_at=CURRENT_TIMESTAMP""",
+            upserts
+        )
+    conn.commit()
+    conn.close()
+    return len(removed) + len(moves) + len(upserts)
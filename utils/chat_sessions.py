@@ -1,10 +1,14 @@
 """
-Chat session management - CRUD operations for persistent chat library
+Chat session management - CRUD operations for persistent chat library.
+Every write also patches the per-user session index (utils/session_index.py).
 """
 
 from auth.database import get_connection
+from utils.tracing import traced
+from utils import session_index
 from datetime import datetime
 
+@traced("db.create_chat_session")
 def create_chat_session(user_id, tab_name, first_message=""):
     """Create a new chat session and return session_id"""
     conn = get_connection()
@@ -19,16 +23,24 @@ def create_chat_session(user_id, tab_name, first_message=""):
     cursor.execute("""
         INSERT INTO chat_sessions (user_id, tab_name, session_title, first_message)
         VALUES (%s, %s, %s, %s)
-        RETURNING id
+        RETURNING id, created_at, updated_at
     """, (user_id, tab_name, title, first_message))
     
-    session_id = cursor.fetchone()[0]
+    session_id, created_at, updated_at = cursor.fetchone()
     conn.commit()
     conn.close()
+    session_index.upsert(user_id, (session_id, tab_name, title, created_at, updated_at, first_message))
     return session_id
 
 def get_user_sessions(user_id, tab_name=None, limit=10):
-    """Get recent sessions for a user/tab"""
+    """Get recent sessions for a user/tab, served from the session index when it holds enough rows"""
+    sessions = session_index.get_sessions(user_id, tab_name, limit)
+    if sessions is None:
+        sessions = _query_user_sessions(user_id, tab_name, limit)
+    return sessions
+
+@traced("db.get_user_sessions")
+def _query_user_sessions(user_id, tab_name, limit):
     conn = get_connection()
     cursor = conn.cursor()
     
@@ -53,22 +65,24 @@ def get_user_sessions(user_id, tab_name=None, limit=10):
     conn.close()
     return sessions
 
+@traced("db.get_session_messages")
 def get_session_messages(session_id):
-    """Get all messages for a specific chat session"""
+    """Get all messages for a specific chat session as (role, content, timestamp, id)"""
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT role, content, timestamp
+        SELECT role, content, timestamp, id
         FROM chat_history
         WHERE session_id=%s
-        ORDER BY timestamp ASC
+        ORDER BY timestamp ASC, id ASC
     """, (session_id,))
     messages = cursor.fetchall()
     conn.close()
     return messages
 
+@traced("db.update_session_title_if_new")
 def update_session_title_if_new(session_id, first_message):
-    """Update title if it is still 'New Chat'"""
+    """Update title if it is still 'New Chat'; returns True if the session was renamed"""
     conn = get_connection()
     cursor = conn.cursor()
     
@@ -76,17 +90,23 @@ def update_session_title_if_new(session_id, first_message):
     cursor.execute("SELECT session_title FROM chat_sessions WHERE id=%s", (session_id,))
     result = cursor.fetchone()
     
-    if result and result[0] == "New Chat":
+    renamed = bool(result and result[0] == "New Chat")
+    if renamed:
         new_title = first_message[:50] + "..." if len(first_message) > 50 else first_message
         cursor.execute("""
             UPDATE chat_sessions
             SET session_title=%s, updated_at=CURRENT_TIMESTAMP
             WHERE id=%s
+            RETURNING user_id, id, tab_name, session_title, created_at, updated_at, first_message
         """, (new_title, session_id))
+        row = cursor.fetchone()
         conn.commit()
+        session_index.upsert(row[0], row[1:])
     
     conn.close()
+    return renamed
 
+@traced("db.update_session_title")
 def update_session_title(session_id, new_title):
     """Manually update chat session title"""
     conn = get_connection()
@@ -95,15 +115,24 @@ def update_session_title(session_id, new_title):
         UPDATE chat_sessions
         SET session_title=%s, updated_at=CURRENT_TIMESTAMP
         WHERE id=%s
+        RETURNING user_id, id, tab_name, session_title, created_at, updated_at, first_message
     """, (new_title, session_id))
+    row = cursor.fetchone()
     conn.commit()
     conn.close()
+    if row:
+        session_index.upsert(row[0], row[1:])
 
+@traced("db.delete_session")
 def delete_session(session_id):
     """Delete a chat session and all its messages"""
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("DELETE FROM chat_history WHERE session_id=%s", (session_id,))
-    cursor.execute("DELETE FROM chat_sessions WHERE id=%s", (session_id,))  
+    cursor.execute("DELETE FROM article_sections WHERE session_id=%s", (session_id,))
+    cursor.execute("DELETE FROM chat_sessions WHERE id=%s RETURNING user_id", (session_id,))
+    row = cursor.fetchone()
     conn.commit()
-    conn.close()
\ No newline at end of file
+    conn.close()
+    if row:
+        session_index.remove(row[0], session_id)
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Local static pre-analysis of pasted Python for the code tab's Find Errors / Optimize actions
+
+- syntax errors (compile(), so symbol-table errors such as "return outside function" too)
+- undefined names: loads of names that are neither bound anywhere in the module (symtable)
+  nor builtins; skipped when the code uses `from x import *`
+- loop nesting depth (comprehensions count as loops) and cyclomatic complexity per function
+- I/O calls inside loops (file, network, subprocess, database, sleep)
+
+Runs in milliseconds, cached by SHA-256 of the code. format_findings() is the compact block
+added to the model prompt; non-Python code gets no analysis.
+"""
+
+import ast
+import builtins
+import re
+import symtable
+from utils.cache import LRUCache
+from utils.code_chunks import code_hash
+from config import CODE_MAX_LOOP_DEPTH, CODE_MAX_COMPLEXITY, CODE_ANALYSIS_CACHE_SIZE
+
+# Bump when the checks change
+ANALYSIS_VERSION = 2
+
+KNOWN_NAMES = frozenset(dir(builtins)) | {
+    "__name__", "__file__", "__doc__", "__builtins__", "__spec__", "__loader__", "__package__",
+    "__path__", "__annotations__", "__dict__", "__class__", "__debug__",
+}
+
+# Calls that do I/O: bare functions, dotted prefixes and method names on any object
+IO_FUNCTIONS = frozenset({"open", "input", "urlopen"})
+IO_PREFIXES = (
+    "requests.", "httpx.", "urllib.request.", "subprocess.", "socket.", "shutil.", "pickle.load", "pickle.dump",
+    "json.load", "json.dump", "pd.read_", "pandas.read_", "np.load", "np.save", "os.listdir", "os.walk",
+    "os.stat", "os.path.exists", "os.path.getsize", "os.remove", "os.makedirs", "time.sleep", "sqlite3.connect",
+)
+IO_METHODS = frozenset({
+    "execute", "executemany", "fetchall", "fetchone", "fetchmany", "commit", "read", "readline", "readlines",
+    "write", "writelines", "recv", "send", "sendall", "to_csv", "to_sql", "to_parquet", "read_text", "write_text",
+})
+
+_PYTHON_HINTS = re.compile(r"^\s*(def |class |import |from \S+ import |elif |print\(|if .*:\s*$|for .* in .*:\s*$)",
+                           re.MULTILINE)
+_LOOPS = (ast.For, ast.AsyncFor, ast.While)
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)
+
+_cache = LRUCache(CODE_ANALYSIS_CACHE_SIZE)
+
+def looks_like_python(code):
+    """Whether code that ast.parse() rejects is still worth reporting as Python with a syntax error"""
+    return len(_PYTHON_HINTS.findall(code)) >= 2 or ("def " in code and ":" in code and "{" not in code)
+
+def _dotted(node):
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+    elif isinstance(node, ast.Call):
+        parts.append(_dotted(node.func) + "()")
+    else:
+        parts.append("…")
+    return ".".join(reversed(parts))
+
+def _is_io(call):
+    if isinstance(call.func, ast.Name):
+        return call.func.id in IO_FUNCTIONS
+    if not isinstance(call.func, ast.Attribute):
+        return False
+    name = _dotted(call.func)
+    return name.startswith(IO_PREFIXES) or call.func.attr in IO_METHODS
+
+def _bound_names(table, bound):
+    """Every name bound in any scope (assigned, imported, defined, parameters, globals declared)"""
+    for symbol in table.get_symbols():
+        if symbol.is_assigned() or symbol.is_imported() or symbol.is_parameter() or symbol.is_namespace():
+            bound.add(symbol.get_name())
+    for child in table.get_children():
+        _bound_names(child, bound)
+    return bound
+
+def _undefined(tree, code):
+    if any(isinstance(node, ast.ImportFrom) and any(a.name == "*" for a in node.names) for node in ast.walk(tree)):
+        return []
+    bound = _bound_names(symtable.symtable(code, "<pasted>", "exec"), set())
+    first_use = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in bound \
+                and node.id not in KNOWN_NAMES:
+            first_use[node.id] = min(first_use.get(node.id, node.lineno), node.lineno)
+    return sorted(((name, line) for name, line in first_use.items()), key=lambda item: item[1])
+
+def _complexity(function):
+    """McCabe complexity: 1 + branches, loops, handlers, boolean operators and comprehension clauses"""
+    score = 1
+    for node in _walk_scope(function):
+        if isinstance(node, (ast.If, ast.IfExp, ast.ExceptHandler, ast.match_case) + _LOOPS):
+            score += 1
+        elif isinstance(node, ast.BoolOp):
+            score += len(node.values) - 1
+        elif isinstance(node, ast.comprehension):
+            score += 1 + len(node.ifs)
+    return score
+
+def _walk_scope(node):
+    """ast.walk that does not descend into nested functions, lambdas or classes"""
+    stack = list(ast.iter_child_nodes(node))
+    while stack:
+        child = stack.pop()
+        yield child
+        if not isinstance(child, _SCOPES):
+            stack.extend(ast.iter_child_nodes(child))
+
+def _loops(node, depth, scope, report):
+    """Deepest loop per scope and I/O calls made inside loops"""
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            _loops(child, 0, getattr(child, "name", "<lambda>"), report)
+            continue
+        child_depth = depth
+        if isinstance(child, _LOOPS + _COMPREHENSIONS):
+            child_depth = depth + (len(child.generators) if isinstance(child, _COMPREHENSIONS) else 1)
+            deepest = report["depth"].get(scope)
+            if deepest is None or child_depth > deepest[0]:
+                report["depth"][scope] = (child_depth, child.lineno)
+        if isinstance(child, ast.Call) and depth and _is_io(child):
+            report["io"].setdefault(child.lineno, f"{_dotted(child.func)}()")
+        _loops(child, child_depth, scope, report)
+
+def _analyze(code):
+    result = {
+        "python": True, "syntax_error": None, "undefined_names": [], "functions": [],
+        "deep_loops": [], "complex_functions": [], "io_in_loops": [],
+    }
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError) as e:
+        if not looks_like_python(code):
+            return {"python": False}
+        result["syntax_error"] = {"line": getattr(e, "lineno", None), "message": getattr(e, "msg", str(e))}
+        return result
+    try:
+        # Code that parses is Python; compile() adds symbol-table errors ("return outside function")
+        compile(tree, "<pasted>", "exec")
+    except (SyntaxError, ValueError) as e:
+        result["syntax_error"] = {"line": getattr(e, "lineno", None), "message": getattr(e, "msg", str(e))}
+        return result
+
+    result["undefined_names"] = _undefined(tree, code)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            result["functions"].append({"name": node.name, "line": node.lineno, "complexity": _complexity(node)})
+    result["complex_functions"] = sorted((f for f in result["functions"] if f["complexity"] > CODE_MAX_COMPLEXITY),
+                                         key=lambda f: -f["complexity"])
+
+    report = {"depth": {}, "io": {}}
+    _loops(tree, 0, "<module>", report)
+    result["deep_loops"] = sorted(({"scope": scope, "depth": depth, "line": line}
+                                   for scope, (depth, line) in report["depth"].items() if depth > CODE_MAX_LOOP_DEPTH),
+                                  key=lambda item: -item["depth"])
+    result["max_loop_depth"] = max((depth for depth, _ in report["depth"].values()), default=0)
+    result["io_in_loops"] = [{"line": line, "call": call} for line, call in sorted(report["io"].items())]
+    return result
+
+def analyze(code):
+    """Findings for `code` (see the module docstring); {"python": False} when it is not Python"""
+    return _cache.get_or_compute((ANALYSIS_VERSION, code_hash(code)), lambda: _analyze(code))
+
+def finding_count(analysis):
+    if not analysis.get("python"):
+        return 0
+    return (bool(analysis["syntax_error"]) + len(analysis["undefined_names"]) + len(analysis["deep_loops"])
+            + len(analysis["complex_functions"]) + len(analysis["io_in_loops"]))
+
+def format_findings(analysis, max_items=10):
+    """Compact findings block for the Find Errors / Optimize prompts ("" for non-Python code)"""
+    if not analysis.get("python"):
+        return ""
+    lines = ["LOCAL STATIC ANALYSIS (computed locally with Python's ast/compile/symtable; confirm or reject "
+             "each finding with a reason, and look for issues it cannot see):"]
+    error = analysis["syntax_error"]
+    lines.append(f"- Syntax: SyntaxError at line {error['line']}: {error['message']} (nothing else was checked)"
+                 if error else "- Syntax: compiles")
+    if error:
+        return "\n".join(lines)
+
+    def listing(items):
+        shown = ", ".join(items[:max_items])
+        return shown + (f" and {len(items) - max_items} more" if len(items) > max_items else "")
+
+    if analysis["undefined_names"]:
+        lines.append("- Undefined names: " + listing([f"{name} (line {line})" for name, line in analysis["undefined_names"]]))
+    if analysis["deep_loops"]:
+        lines.append(f"- Loops nested deeper than {CODE_MAX_LOOP_DEPTH}: "
+                     + listing([f"{d['depth']} levels in {d['scope']} (line {d['line']})" for d in analysis["deep_loops"]]))
+    else:
+        lines.append(f"- Deepest loop nesting: {analysis['max_loop_depth']}")
+    if analysis["complex_functions"]:
+        lines.append(f"- Cyclomatic complexity above {CODE_MAX_COMPLEXITY}: "
+                     + listing([f"{f['name']}() {f['complexity']} (line {f['line']})" for f in analysis["complex_functions"]]))
+    if analysis["io_in_loops"]:
+        lines.append("- I/O inside loops: " + listing([f"{io['call']} at line {io['line']}" for io in analysis["io_in_loops"]]))
+    return "\n".join(lines)
+
+def stats():
+    """Hit/miss counters of the analysis cache, for the admin panel"""
+    return _cache.stats()
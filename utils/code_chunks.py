@@ -0,0 +1,184 @@
+"""
+Code chunking for map-reduce explanations of large inputs (services/code.py)
+
+- Python (when it parses): top-level functions and classes are units; the module-level
+  statements between them form units of their own, and a class longer than
+  CODE_CHUNK_MAX_LINES is split into its methods
+- Anything else: top-level blocks found by tracking brace depth (strings and comments
+  stripped) and indentation, so C-like and indent-based languages both split at block ends
+- Units longer than CODE_CHUNK_MAX_LINES are cut into windows, preferably at shallow lines
+- Consecutive units are grouped into chunks of up to CODE_CHUNK_MAX_LINES; a group of a
+  quarter of that or more also ends after a unit whose *name* hashes to a boundary, so
+  editing one function's body mostly leaves the other chunks (and their cached
+  explanations) unchanged
+
+Chunks are dicts: name, start and end (1-based lines), text. Splits are cached per code hash.
+"""
+
+import ast
+import hashlib
+import re
+from utils.cache import LRUCache
+from config import CODE_CHUNK_MAX_LINES, CODE_CHUNK_GROUP_EVERY, CODE_CHUNK_CACHE_SIZE
+
+_STRING = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`(?:\\.|[^`\\])*`')
+_LINE_COMMENT = re.compile(r"//.*|#(?!include|define|if|endif|pragma|import).*")
+_BLOCK_CLOSERS = ("}", ")", "]", "end", "fi", "done", "esac", "else", "elif", "except", "finally", "catch")
+
+_cache = LRUCache(CODE_CHUNK_CACHE_SIZE)
+
+def code_hash(text):
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+def is_python(code):
+    try:
+        ast.parse(code)
+    except (SyntaxError, ValueError):
+        return False
+    return True
+
+def _first_line(node):
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [d.lineno for d in decorators])
+
+def _python_units(code, lines):
+    """(name, start, end) of the module's top-level definitions and the statements between them"""
+    units = []
+    pending = None  # (start, end) of module-level statements not yet emitted
+    for node in ast.parse(code).body:
+        start, end = _first_line(node), node.end_lineno
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if pending:
+                units.append(("module code", *pending))
+                pending = None
+            if isinstance(node, ast.ClassDef) and end - start + 1 > CODE_CHUNK_MAX_LINES:
+                units.extend(_class_units(node))
+            else:
+                units.append((("class " if isinstance(node, ast.ClassDef) else "def ") + node.name, start, end))
+        else:
+            pending = (pending[0], end) if pending else (start, end)
+    if pending:
+        units.append(("module code", *pending))
+    return _cover(units, len(lines))
+
+def _class_units(node):
+    """A long class as its header and attributes, then one unit per method"""
+    units, header_end = [], None
+    for child in node.body:
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            units.append((f"{node.name}.{child.name}", _first_line(child), child.end_lineno))
+        elif not units:
+            header_end = child.end_lineno
+    first = _first_line(node)
+    header = header_end or (units[0][1] - 1 if units else node.end_lineno)
+    return [(f"class {node.name}", first, max(first, header))] + units
+
+def _cover(units, line_count):
+    """Stretch units so they tile lines 1..line_count (comments and blank lines go with the next unit)"""
+    covered, next_start = [], 1
+    for name, start, end in units:
+        if end < next_start:
+            continue
+        covered.append([name, next_start, end])
+        next_start = end + 1
+    if not covered:
+        return [("code", 1, max(1, line_count))]
+    if next_start <= line_count:
+        covered[-1][2] = line_count
+    return [tuple(unit) for unit in covered]
+
+def _depth_changes(lines):
+    """Brace depth after each line, ignoring strings and comments"""
+    depths, depth, in_block_comment = [], 0, False
+    for line in lines:
+        text = _STRING.sub('""', line)
+        if in_block_comment:
+            if "*/" not in text:
+                depths.append(depth)
+                continue
+            text, in_block_comment = text.split("*/", 1)[1], False
+        while "/*" in text:
+            before, _, after = text.partition("/*")
+            if "*/" in after:
+                text = before + after.split("*/", 1)[1]
+            else:
+                text, in_block_comment = before, True
+        text = _LINE_COMMENT.sub("", text)
+        depth = max(0, depth + text.count("{") + text.count("(") + text.count("[")
+                    - text.count("}") - text.count(")") - text.count("]"))
+        depths.append(depth)
+    return depths
+
+def _indent(line):
+    return len(line) - len(line.lstrip())
+
+def _text_units(lines):
+    """Top-level blocks: a new unit starts at an unindented line outside any brackets"""
+    depths = _depth_changes(lines)
+    starts = []
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped or _indent(line) or (i and depths[i - 1]):
+            continue
+        if stripped.startswith(_BLOCK_CLOSERS) or stripped.startswith(("@", "#", "//", "/*", "*")):
+            continue
+        starts.append(i)
+    # Comments, decorators and blank lines just above a block belong to it
+    units = []
+    for n, start in enumerate(starts):
+        while start > 0 and (not lines[start - 1].strip() or lines[start - 1].lstrip().startswith(("@", "#", "//", "/*", "*"))) \
+                and _indent(lines[start - 1]) == 0 and (n == 0 or start - 1 > starts[n - 1]):
+            start -= 1
+        name = lines[starts[n]].strip().rstrip("{:").strip()[:60]
+        units.append((name, start + 1, None))
+    units = [(name, start, (units[k + 1][1] - 1) if k + 1 < len(units) else len(lines))
+             for k, (name, start, _) in enumerate(units)]
+    return _cover(units, len(lines))
+
+def _windows(name, start, end, lines):
+    """Cut an oversized unit, each cut at the shallowest line of the window's last quarter"""
+    windows, part = [], 1
+    while end - start + 1 > CODE_CHUNK_MAX_LINES:
+        limit = start + CODE_CHUNK_MAX_LINES - 1
+        candidates = range(start + CODE_CHUNK_MAX_LINES * 3 // 4, limit + 1)
+        cut = min(candidates, key=lambda n: (_indent(lines[n - 1]) if lines[n - 1].strip() else -1, -n))
+        windows.append((f"{name} (part {part})", start, cut))
+        start, part = cut + 1, part + 1
+    windows.append((f"{name} (part {part})" if part > 1 else name, start, end))
+    return windows
+
+def _boundary(name):
+    return int(hashlib.sha1(name.encode()).hexdigest(), 16) % CODE_CHUNK_GROUP_EVERY == 0
+
+def _group(units, lines):
+    chunks, group = [], []
+
+    def flush():
+        if group:
+            name = group[0][0] if len(group) == 1 else f"{group[0][0]} … {group[-1][0]}"
+            start, end = group[0][1], group[-1][2]
+            chunks.append({"name": name, "start": start, "end": end, "text": "\n".join(lines[start - 1:end])})
+            group.clear()
+
+    for name, start, end in units:
+        if group and end - group[0][1] + 1 > CODE_CHUNK_MAX_LINES:
+            flush()
+        group.append((name, start, end))
+        if _boundary(name) and end - group[0][1] + 1 >= CODE_CHUNK_MAX_LINES // 4:
+            flush()
+    flush()
+    return chunks
+
+def split_code(code):
+    """Chunks of `code` (see the module docstring) and whether it was split as Python"""
+    def compute():
+        lines = code.split("\n")
+        python = is_python(code)
+        units = _python_units(code, lines) if python else _text_units(lines)
+        sized = [window for unit in units for window in _windows(*unit, lines)]
+        return _group(sized, lines), python
+    return _cache.get_or_compute(code_hash(code), compute)
+
+def stats():
+    """Hit/miss counters of the split cache, for the admin panel"""
+    return _cache.stats()
@@ -0,0 +1,39 @@
+"""
+Line diff between the last analyzed version of pasted code and the current one, for the code
+tab's incremental re-analysis
+
+- diff_code() gives the unified diff with CODE_DIFF_CONTEXT_LINES of context, the number of
+  changed lines and hunks, and the changed line ranges of the current version
+- worth_updating() decides whether the diff is small enough to send in place of the whole code
+"""
+
+import difflib
+from config import CODE_DIFF_CONTEXT_LINES, CODE_DIFF_MAX_CHANGED_SHARE, CODE_DIFF_MAX_PRIOR_CHARS
+
+def diff_code(previous, current, context=CODE_DIFF_CONTEXT_LINES):
+    """{"diff", "hunks", "changed_lines", "share", "ranges"} of previous -> current"""
+    old_lines, new_lines = previous.split("\n"), current.split("\n")
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    hunks = list(matcher.get_grouped_opcodes(context))
+    changed, ranges = 0, []
+    for hunk in hunks:
+        for tag, i1, i2, j1, j2 in hunk:
+            if tag == "equal":
+                continue
+            changed += max(i2 - i1, j2 - j1)
+            # A pure deletion has no lines in the current version; point at where they were
+            ranges.append((j1 + 1, max(j2, j1 + 1)))
+    diff = "\n".join(difflib.unified_diff(old_lines, new_lines, "previous", "current", n=context, lineterm=""))
+    return {"diff": diff, "hunks": len(hunks), "changed_lines": changed,
+            "share": changed / max(len(old_lines), len(new_lines)), "ranges": ranges}
+
+def format_ranges(ranges, limit=6):
+    """ "lines 4–9, 30" style summary of changed line ranges"""
+    shown = [f"{start}" if start == end else f"{start}–{end}" for start, end in ranges[:limit]]
+    more = f" and {len(ranges) - limit} more" if len(ranges) > limit else ""
+    return f"line{'s' if len(ranges) > 1 or ranges[0][0] != ranges[0][1] else ''} {', '.join(shown)}{more}"
+
+def worth_updating(delta, current, previous_analysis):
+    """Whether sending `delta` and the previous analysis is cheaper than analyzing `current` again"""
+    return (0 < delta["hunks"] and delta["share"] <= CODE_DIFF_MAX_CHANGED_SHARE
+            and len(delta["diff"]) < len(current) and len(previous_analysis) <= CODE_DIFF_MAX_PRIOR_CHARS)
@@ -0,0 +1,175 @@
+"""
+Opt-in sandboxed profiling of pasted Python for the code tab's Optimize action
+
+- Off unless CODE_PROFILING_ENABLED: it runs user code on the server
+- The snippet runs in a fresh `python -I -B` subprocess (utils/sandbox_runner.py) inside a
+  bubblewrap sandbox: unprivileged uid CODE_PROFILE_UID, new user, mount, PID, IPC and network
+  namespaces, a read-only view of the Python installation and only its own temporary working
+  directory writable; it dies with the server. Without bubblewrap nothing runs, unless
+  CODE_PROFILE_ALLOW_UNISOLATED accepts the runner's seccomp filter and audit hook alone
+  (then still as CODE_PROFILE_UID where the server runs as root)
+- CPU, memory and wall-clock limits; the snippet's output is never shown
+- cProfile's top functions by cumulative time and tracemalloc's top allocation lines come back
+  as a dict; format_profile() is the block added to the Optimize prompt
+- At most CODE_PROFILE_MAX_CONCURRENT runs per server process; finished runs are cached by
+  SHA-256 of the code, so reruns and repeated Optimize clicks do not execute it again
+"""
+
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+from utils.cache import LRUCache
+from utils.code_chunks import code_hash, is_python
+from utils.tracing import span
+from config import (
+    CODE_PROFILING_ENABLED, CODE_PROFILE_BWRAP, CODE_PROFILE_ALLOW_UNISOLATED, CODE_PROFILE_UID,
+    CODE_PROFILE_CPU_SECONDS, CODE_PROFILE_WALL_SECONDS, CODE_PROFILE_MEMORY_MB, CODE_PROFILE_TOP_N,
+    CODE_PROFILE_MAX_CONCURRENT, CODE_PROFILE_CACHE_SIZE
+)
+
+RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_runner.py")
+
+# Bump when the runner's output changes
+PROFILE_VERSION = 2
+
+_slots = threading.BoundedSemaphore(CODE_PROFILE_MAX_CONCURRENT)
+_cache = LRUCache(CODE_PROFILE_CACHE_SIZE)
+
+def _failed(status, message):
+    return {"status": status, "message": message, "functions": [], "allocations": [], "output_chars": 0}
+
+def _environment(home):
+    return {"PATH": "/usr/bin:/bin", "HOME": home, "TMPDIR": home, "LANG": "C.UTF-8",
+            "OPENBLAS_NUM_THREADS": "1", "OMP_NUM_THREADS": "1", "MKL_NUM_THREADS": "1"}
+
+def _runner_args(runner, workdir):
+    return [sys.executable, "-I", "-B", runner, workdir, str(CODE_PROFILE_CPU_SECONDS),
+            str(CODE_PROFILE_WALL_SECONDS), str(CODE_PROFILE_MEMORY_MB), str(CODE_PROFILE_TOP_N)]
+
+def _bwrap_command(bwrap, workdir):
+    """The runner inside bubblewrap: the workdir is /work, the Python installation read-only"""
+    python_dirs = {os.path.realpath(p) for p in (sys.prefix, sys.base_prefix, sys.exec_prefix,
+                                                 os.path.dirname(os.path.realpath(sys.executable)))}
+    command = [bwrap, "--unshare-all", "--die-with-parent", "--new-session", "--clearenv",
+               "--uid", str(CODE_PROFILE_UID), "--gid", str(CODE_PROFILE_UID)]
+    for path in ("/usr", "/lib", "/lib64", "/bin"):
+        command += ["--ro-bind-try", path, path]
+    for path in sorted(python_dirs):
+        command += ["--ro-bind", path, path]
+    command += ["--ro-bind", RUNNER, "/sandbox/runner.py", "--bind", workdir, "/work", "--chdir", "/work",
+                "--proc", "/proc", "--dev", "/dev", "--tmpfs", "/tmp"]
+    for name, value in _environment("/work").items():
+        command += ["--setenv", name, value]
+    return command + _runner_args("/sandbox/runner.py", "/work")
+
+def _world_accessible(path):
+    """Whether another uid can reach and read `path` (every parent directory searchable)"""
+    path = os.path.realpath(path)
+    while True:
+        mode = os.stat(path).st_mode
+        if not mode & (stat.S_IXOTH if stat.S_ISDIR(mode) else stat.S_IROTH):
+            return False
+        parent = os.path.dirname(path)
+        if parent == path:
+            return True
+        path = parent
+
+def isolation():
+    """How runs are isolated: "bubblewrap", "unisolated" (opted in) or None (profiling unavailable)"""
+    if shutil.which(CODE_PROFILE_BWRAP):
+        return "bubblewrap"
+    return "unisolated" if CODE_PROFILE_ALLOW_UNISOLATED else None
+
+def _run(code, mode):
+    workdir = tempfile.mkdtemp(prefix="articulaite-profile-")
+    try:
+        with open(os.path.join(workdir, "snippet.py"), "w", encoding="utf-8") as f:
+            f.write(code)
+        options = {}
+        if mode == "bubblewrap":
+            command, env = _bwrap_command(shutil.which(CODE_PROFILE_BWRAP), workdir), {}
+            label = f"bubblewrap, uid {CODE_PROFILE_UID}"
+        else:
+            command, env = _runner_args(RUNNER, workdir), _environment(workdir)
+            label = "not isolated: the server's uid, seccomp and audit hook only"
+            if os.geteuid() == 0 and _world_accessible(sys.executable) and _world_accessible(RUNNER):
+                for path in (workdir, os.path.join(workdir, "snippet.py")):
+                    os.chown(path, CODE_PROFILE_UID, CODE_PROFILE_UID)
+                options = {"user": CODE_PROFILE_UID, "group": CODE_PROFILE_UID, "extra_groups": []}
+                label = f"not isolated: uid {CODE_PROFILE_UID}, seccomp and audit hook only"
+        process = subprocess.Popen(command, cwd=workdir, env=env, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, start_new_session=True,
+                                   **options)
+        try:
+            _, stderr = process.communicate(timeout=CODE_PROFILE_WALL_SECONDS + 5)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, 9)
+            process.communicate()
+            return _failed("timeout", f"Killed after {CODE_PROFILE_WALL_SECONDS + 5} s")
+        try:
+            with open(os.path.join(workdir, "result.json"), encoding="utf-8") as f:
+                result = json.load(f)
+            result["isolation"] = label
+            return result
+        except (OSError, ValueError):
+            detail = stderr.decode("utf-8", "replace").strip().splitlines()[-1:] or [f"exit code {process.returncode}"]
+            return _failed("killed", f"The sandbox stopped without a result ({detail[0][:200]})")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def profile_code(code):
+    """Profile of `code` (see the module docstring); status is ok, error, timeout, memory, killed,
+    busy, not_python or disabled"""
+    if not CODE_PROFILING_ENABLED:
+        return _failed("disabled", "Local profiling is disabled on this server")
+    mode = isolation()
+    if mode is None:
+        return _failed("disabled", "Profiling needs bubblewrap on the server to isolate the run")
+    if not is_python(code):
+        return _failed("not_python", "Only Python that parses can be profiled")
+    key = (PROFILE_VERSION, code_hash(code))
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    if not _slots.acquire(timeout=CODE_PROFILE_WALL_SECONDS):
+        return _failed("busy", "Other profiles are running right now, try again in a moment")
+    try:
+        with span("code.profile", chars=len(code)) as s:
+            result = _run(code, mode)
+            s.set(status=result["status"], wall_s=result.get("wall_s"))
+    finally:
+        _slots.release()
+    if result["status"] in ("ok", "error", "timeout", "memory"):
+        _cache.put(key, result)
+    return result
+
+def cached_profile(code):
+    """The cached profile of `code`, or None if it has not been profiled"""
+    return _cache.get((PROFILE_VERSION, code_hash(code)))
+
+def format_profile(profile, max_items=10):
+    """Measured-profile block for the Optimize prompt ("" when nothing was measured)"""
+    if not profile["functions"] and not profile["allocations"]:
+        return ""
+    lines = [f"MEASURED PROFILE (the code was run locally under cProfile and tracemalloc: {profile['wall_s']} s wall, "
+             f"{profile['cpu_s']} s CPU, peak traced memory {profile['peak_kb']:,.0f} KB; timings include profiler "
+             f"overhead. Base the hotspots and the benchmark plan on these measurements):"]
+    if profile["status"] != "ok":
+        lines.append(f"Run ended early: {profile['message']}")
+    lines.append("Top functions by cumulative time:")
+    lines += [f"  {n}. {row['function']}: {row['cumulative_s']} s cumulative, {row['own_s']} s own, {row['calls']} calls"
+              for n, row in enumerate(profile["functions"][:max_items], 1)]
+    if profile["allocations"]:
+        lines.append("Top allocation lines (memory still held at the end):")
+        lines += [f"  line {row['line']}: {row['kb']:,.1f} KB in {row['blocks']} blocks"
+                  for row in profile["allocations"][:max_items]]
+    return "\n".join(lines)
+
+def stats():
+    """Hit/miss counters of the profile cache, for the admin panel"""
+    return _cache.stats()
@@ -0,0 +1,73 @@
+"""
+Streaming DOCX text extraction.
+
+Reads word/document.xml straight from the zip with an incremental XML parser, without
+building python-docx's object model. Paragraphs and table rows come out in document order;
+a row is its cells joined with " | " (nested tables end up inside their cell). Elements are
+discarded as soon as their text is taken, so memory stays flat however long the document is.
+"""
+
+import zipfile
+import xml.etree.ElementTree as ET
+from config import DOCX_MAX_CHARS
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_BODY, _P, _TR, _TC = _W + "body", _W + "p", _W + "tr", _W + "tc"
+_TEXT, _TAB, _BREAKS = _W + "t", _W + "tab", (_W + "br", _W + "cr")
+
+def _paragraph_text(paragraph):
+    parts = []
+    for node in paragraph.iter():
+        if node.tag == _TEXT:
+            parts.append(node.text or "")
+        elif node.tag == _TAB:
+            parts.append("\t")
+        elif node.tag in _BREAKS:
+            parts.append("\n")
+    return "".join(parts)
+
+def iter_blocks(file):
+    """Text of each paragraph and table row in document order (file: path or seekable binary file)"""
+    with zipfile.ZipFile(file) as archive, archive.open("word/document.xml") as xml:
+        body = None
+        open_cells = []  # innermost last: ("tr", cell texts) or ("tc", paragraph texts)
+        for event, elem in ET.iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == _BODY:
+                    body = elem
+                elif tag in (_TR, _TC):
+                    open_cells.append((tag, []))
+                continue
+
+            if tag == _P:
+                text = _paragraph_text(elem)
+                elem.clear()
+                if open_cells:
+                    open_cells[-1][1].append(text)
+                else:
+                    yield text
+            elif tag == _TC:
+                _, paragraphs = open_cells.pop()
+                open_cells[-1][1].append(" ".join(p.strip() for p in paragraphs if p.strip()))
+            elif tag == _TR:
+                _, cells = open_cells.pop()
+                if any(cells):
+                    row = " | ".join(cells)
+                    if open_cells:
+                        open_cells[-1][1].append(row)
+                    else:
+                        yield row
+            if body is not None and len(body) and body[-1] is elem:
+                # A top-level block is done: drop it from the tree
+                body.clear()
+
+def extract_text(file, max_chars=DOCX_MAX_CHARS):
+    """Text of a DOCX, one block per line, cut at max_chars"""
+    parts, size = [], 0
+    for block in iter_blocks(file):
+        parts.append(block)
+        size += len(block) + 1
+        if size >= max_chars:
+            break
+    return "\n".join(parts)[:max_chars]
@@ -0,0 +1,48 @@
+"""
+Invalidation events between the st.fragment panes of a tool (chat pane, chat library).
+
+An interaction inside a fragment reruns only that fragment. When it changes state that
+another pane renders, its widget callback emits an event and calls dispatch(), which reruns
+the source fragment plus every fragment listening for that event, instead of the whole app.
+Events are scoped by tab_key so one tool's panes never rerun another tool's. State changed
+by a fragment's body (not a callback) can only reach other panes through rerun_if_pending().
+"""
+
+import streamlit as st
+
+SESSION_LIST_CHANGED = "session_list_changed"      # a chat session was created, renamed or deleted
+ACTIVE_SESSION_CHANGED = "active_session_changed"  # another session was loaded into the chat pane
+ARTICLE_CHANGED = "article_changed"                # the editor chat patched the active article
+
+_LISTENERS_KEY = "_event_listeners"  # fragment key -> {(event, scope)}
+_PENDING_KEY = "_event_pending"      # {(event, scope)} emitted since the last dispatch
+
+def fragment_key(pane, tab_key):
+    """Key of a tool's pane fragment, e.g. fragment_key("chat", "cv_interview")"""
+    return f"{pane}_{tab_key}"
+
+def listen(listener, scope, *events):
+    """Register a fragment for events of one scope; called from the fragment on every render"""
+    st.session_state.setdefault(_LISTENERS_KEY, {})[listener] = {(event, scope) for event in events}
+
+def emit(event, scope):
+    """Record an event for the next dispatch()"""
+    st.session_state.setdefault(_PENDING_KEY, set()).add((event, scope))
+
+def dispatch(source):
+    """
+    From a widget callback inside fragment `source`: rerun it together with the fragments
+    listening for the events emitted since the last dispatch (nothing else reruns).
+    """
+    pending = st.session_state.pop(_PENDING_KEY, set())
+    listeners = st.session_state.get(_LISTENERS_KEY, {})
+    targets = [source] + [name for name, subscribed in listeners.items() if name != source and subscribed & pending]
+    st.rerun(targets)
+
+def rerun_if_pending():
+    """
+    From a fragment body, where keyed reruns are not allowed: rerun the app when events were
+    emitted during this run, so the panes rendering that state update
+    """
+    if st.session_state.pop(_PENDING_KEY, None):
+        st.rerun()
@@ -0,0 +1,94 @@
+"""
+Extracted document text keyed by SHA-256 of the file bytes, so a resume that stays in the
+uploader (or is uploaded again, by anyone) is parsed once.
+
+Two tiers: a bounded process-wide LRU (EXTRACTION_CACHE_SIZE documents) and, when
+EXTRACTION_CACHE_DIR is set, one UTF-8 text file per document that survives restarts and is
+shared by server processes on the same host. Failed extractions are not cached.
+"""
+
+import os
+import tempfile
+import threading
+from utils.cache import LRUCache
+from config import EXTRACTION_CACHE_SIZE, EXTRACTION_CACHE_DIR
+
+_memory = LRUCache(EXTRACTION_CACHE_SIZE)
+_lock = threading.Lock()
+_disk = {"hits": 0, "misses": 0, "writes": 0}
+
+def cache_key(digest, kind):
+    """SHA-256 hex digest of the bytes plus the extractor kind, e.g. "pdf.v1" (a new version invalidates old entries)"""
+    return f"{digest}.{kind}"
+
+def _disk_path(key):
+    return os.path.join(EXTRACTION_CACHE_DIR, key[:2], key + ".txt")
+
+def _read_disk(key):
+    if not EXTRACTION_CACHE_DIR:
+        return None
+    try:
+        with open(_disk_path(key), encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        with _lock:
+            _disk["misses"] += 1
+        return None
+    with _lock:
+        _disk["hits"] += 1
+    return text
+
+def _write_disk(key, text):
+    if not EXTRACTION_CACHE_DIR:
+        return
+    path = _disk_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        return
+    with _lock:
+        _disk["writes"] += 1
+
+def get_or_extract(digest, kind, extract):
+    """
+    Text of the document with this SHA-256 digest from the cache, or extract() on a miss.
+    Returns (text, tier) with tier "memory", "disk" or None when the extractor ran.
+    """
+    key = cache_key(digest, kind)
+    text = _memory.get(key)
+    if text is not None:
+        return text, "memory"
+    text = _read_disk(key)
+    if text is not None:
+        _memory.put(key, text)
+        return text, "disk"
+    text = extract()
+    if text:
+        _memory.put(key, text)
+        _write_disk(key, text)
+    return text, None
+
+def stats():
+    """Hit/miss counters of both tiers"""
+    memory = _memory.stats()
+    with _lock:
+        disk = dict(_disk)
+    lookups = memory["hits"] + memory["misses"]
+    hits = memory["hits"] + disk["hits"]
+    return {
+        "memory": memory,
+        "disk": dict(disk, enabled=bool(EXTRACTION_CACHE_DIR)),
+        "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+    }
+
+def clear():
+    """Empty the memory tier and reset counters (the disk tier is left alone)"""
+    _memory.clear()
+    with _lock:
+        for counter in _disk:
+            _disk[counter] = 0
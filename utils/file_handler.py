@@ -2,10 +2,14 @@
 File handling utilities for articulAIte
 """
 
+import io
 import streamlit as st
-import PyPDF2
-from docx import Document
 from config import ALLOWED_FILE_TYPES, MAX_FILE_SIZE, ERROR_MESSAGES
+from utils.tracing import span
+from utils import extraction_cache, pdf_extract, docx_extract, intake
+
+# Bump when an extractor's output changes, so cached text from the old version is not served
+EXTRACTOR_VERSION = 4
 
 def validate_file(uploaded_file):
     """Validate uploaded file"""
@@ -20,42 +24,54 @@ def validate_file(uploaded_file):
     file_ext = uploaded_file.name.split('.')[-1].lower()
     if file_ext not in ALLOWED_FILE_TYPES:
         return False, ERROR_MESSAGES["invalid_file_type"]
+
+    # Check contents: magic bytes, text encoding, zip bomb limits
+    try:
+        intake.check_upload(uploaded_file, file_ext)
+    except intake.IntakeError as e:
+        return False, str(e)
     
     return True, "File valid"
 
-def extract_text_from_pdf(file):
-    """Extract text from PDF file"""
+def extract_text_from_pdf(source):
+    """Extract text from PDF bytes or file path (page budget, time limit and process pool: see utils/pdf_extract.py)"""
     try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
+        return pdf_extract.extract_text(source)
+    except pdf_extract.ExtractionTimeout:
+        st.error(ERROR_MESSAGES["extraction_timeout"])
+        return None
     except Exception as e:
         st.error(f"Error reading PDF: {str(e)}")
         return None
 
 def extract_text_from_docx(file):
-    """Extract text from DOCX file"""
+    """Extract text from DOCX file or path: paragraphs and table rows in document order (see utils/docx_extract.py)"""
     try:
-        doc = Document(file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        return docx_extract.extract_text(file)
     except Exception as e:
         st.error(f"Error reading DOCX: {str(e)}")
         return None
 
+def _extract(upload, file_ext):
+    if file_ext == "pdf":
+        return extract_text_from_pdf(upload.source)
+    if file_ext == "docx":
+        return extract_text_from_docx(upload.path or io.BytesIO(upload.data))
+    if file_ext == "txt":
+        return upload.text()
+    return None
+
 def extract_text_from_file(uploaded_file):
-    """Extract text from uploaded file based on type"""
+    """
+    Extract text from an uploaded file that passed validate_file, based on type.
+    Cached by SHA-256 of the bytes, so reruns and re-uploads of the same file skip the parse.
+    """
     file_ext = uploaded_file.name.split('.')[-1].lower()
     
-    if file_ext == "pdf":
-        return extract_text_from_pdf(uploaded_file)
-    elif file_ext == "docx":
-        return extract_text_from_docx(uploaded_file)
-    elif file_ext == "txt":
-        return uploaded_file.getvalue().decode("utf-8")
-    
-    return None
+    with span("file.extract", file_type=file_ext, payload_bytes=uploaded_file.size) as s, \
+            intake.spool(uploaded_file) as upload:
+        text, tier = extraction_cache.get_or_extract(
+            upload.digest, f"{file_ext}.v{EXTRACTOR_VERSION}", lambda: _extract(upload, file_ext)
+        )
+        s.set(chars=len(text) if text else 0, cache=tier or "miss", cache_hits=int(tier is not None))
+    return text
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""
+Upload intake - checks an upload before any parser sees it, and hands the parsers its bytes
+without further full copies.
+
+- sniff(): the file type from the first bytes (PDF header, DOCX zip signature, text encoding),
+  never from the extension alone
+- check_upload(): the sniffed type must match the extension; DOCX archives are rejected on
+  entry count, declared uncompressed size and compression ratio (zip bombs) before parsing
+- spool(): hashes the upload in chunks; above INTAKE_SPOOL_BYTES the parsers read it from a
+  temp file by path (memory-mapped for PDFs, opened by path in the PDF workers)
+"""
+
+import codecs
+import hashlib
+import os
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from config import (
+    INTAKE_SNIFF_BYTES, INTAKE_SPOOL_BYTES, INTAKE_CHUNK_BYTES,
+    DOCX_MAX_ENTRIES, DOCX_MAX_UNZIPPED_BYTES, DOCX_MAX_RATIO, ERROR_MESSAGES
+)
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+class IntakeError(Exception):
+    """An upload was rejected; the message is meant for the user"""
+
+def _text_encoding(head):
+    """Encoding of a text file from its first bytes, or None if it looks binary"""
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    if b"\x00" in head:
+        return None
+    try:
+        # Not final: the sniffed window may end inside a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1252"
+
+def sniff(head):
+    """(file type, text encoding) from the first INTAKE_SNIFF_BYTES of a file"""
+    if b"%PDF-" in head[:1024]:
+        return "pdf", None
+    if head.startswith(b"PK\x03\x04"):
+        return "docx", None
+    encoding = _text_encoding(head)
+    if encoding:
+        return "txt", encoding
+    return None, None
+
+def _read_head(uploaded_file):
+    uploaded_file.seek(0)
+    head = uploaded_file.read(INTAKE_SNIFF_BYTES)
+    uploaded_file.seek(0)
+    return head
+
+def _check_docx(uploaded_file):
+    try:
+        with zipfile.ZipFile(uploaded_file) as archive:
+            entries = archive.infolist()
+    except zipfile.BadZipFile:
+        raise IntakeError(ERROR_MESSAGES["file_malformed"])
+    finally:
+        uploaded_file.seek(0)
+    if "word/document.xml" not in {entry.filename for entry in entries}:
+        raise IntakeError(ERROR_MESSAGES["file_malformed"])
+    # Declared sizes are binding: zipfile stops reading a member at its declared size
+    unzipped = sum(entry.file_size for entry in entries)
+    packed = sum(entry.compress_size for entry in entries)
+    if (len(entries) > DOCX_MAX_ENTRIES or unzipped > DOCX_MAX_UNZIPPED_BYTES
+            or unzipped > DOCX_MAX_RATIO * max(packed, 1)):
+        raise IntakeError(ERROR_MESSAGES["file_too_complex"])
+
+def check_upload(uploaded_file, file_ext):
+    """Raise IntakeError unless the upload's contents are a sound file of its extension's type"""
+    file_type, _ = sniff(_read_head(uploaded_file))
+    if file_type is None:
+        raise IntakeError(ERROR_MESSAGES["file_malformed"])
+    if file_type != file_ext:
+        raise IntakeError(ERROR_MESSAGES["file_type_mismatch"])
+    if file_type == "docx":
+        _check_docx(uploaded_file)
+
+class SpooledUpload:
+    """
+    A checked upload with its SHA-256 digest. Small uploads are parsed from memory (data);
+    larger ones from a temp file (path), written on first use so cache hits only cost the hash.
+    """
+
+    def __init__(self, uploaded_file, digest, size, encoding):
+        self._file = uploaded_file
+        self.digest = digest
+        self.size = size
+        self.encoding = encoding or "utf-8"
+        self.data = uploaded_file.getvalue() if size <= INTAKE_SPOOL_BYTES else None
+        self._path = None
+
+    @property
+    def path(self):
+        """Temp file holding the upload (None for small uploads)"""
+        if self.data is None and self._path is None:
+            fd, path = tempfile.mkstemp(prefix="upload-")
+            self._path = path
+            with os.fdopen(fd, "wb") as f:
+                for chunk in _chunks(self._file):
+                    f.write(chunk)
+        return self._path
+
+    @property
+    def source(self):
+        """What the PDF/DOCX extractors take: the bytes or the temp file's path"""
+        return self.path or self.data
+
+    def text(self):
+        """Contents decoded with the sniffed encoding"""
+        if self.data is not None:
+            return self.data.decode(self.encoding, errors="replace")
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        parts = [decoder.decode(chunk) for chunk in _chunks(self._file)]
+        parts.append(decoder.decode(b"", final=True))
+        return "".join(parts)
+
+    def close(self):
+        if self._path:
+            os.remove(self._path)
+            self._path = None
+
+def _chunks(uploaded_file):
+    uploaded_file.seek(0)
+    for chunk in iter(lambda: uploaded_file.read(INTAKE_CHUNK_BYTES), b""):
+        yield chunk
+    uploaded_file.seek(0)
+
+@contextmanager
+def spool(uploaded_file):
+    """SpooledUpload of a checked upload; its temp file, if any, is removed when the block exits"""
+    _, encoding = sniff(_read_head(uploaded_file))
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in _chunks(uploaded_file):
+        digest.update(chunk)
+        size += len(chunk)
+    upload = SpooledUpload(uploaded_file, digest.hexdigest(), size, encoding)
+    try:
+        yield upload
+    finally:
+        upload.close()
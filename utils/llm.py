@@ -0,0 +1,121 @@
+"""
+LLM client helpers - every model call in the app goes through invoke_llm
+so it is admitted by the process-wide AdmissionController first
+"""
+
+import functools
+import os
+import time
+import streamlit as st
+from utils.admission import get_admission_controller, AdmissionError
+from utils.tracing import span
+from utils.usage import get_user_tokens_today
+from config import LLM_EST_COMPLETION_TOKENS, USER_DAILY_TOKEN_QUOTA, ERROR_MESSAGES
+
+def get_api_key():
+    """Groq API key from environment, falling back to Streamlit secrets"""
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        try:
+            api_key = st.secrets.get("GROQ_API_KEY")
+        except Exception:
+            api_key = None
+    return api_key
+
+def get_llm(model, temperature):
+    """Chat model client, shared per (model, temperature) so its HTTP connections are reused"""
+    return _client(model, temperature, get_api_key())
+
+@functools.lru_cache(maxsize=64)
+def _client(model, temperature, api_key):
+    from langchain_groq import ChatGroq  # heavy: imported on first use or by the warmup
+    return ChatGroq(model=model, temperature=temperature, groq_api_key=api_key)
+
+def estimate_tokens(prompt):
+    """Rough token estimate (~4 chars/token) for a prompt string or message list, plus the completion budget"""
+    if isinstance(prompt, str):
+        chars = len(prompt)
+    else:
+        chars = sum(len(str(getattr(m, "content", m))) for m in prompt)
+    return chars // 4 + LLM_EST_COMPLETION_TOKENS
+
+def _is_rate_limited(error):
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+def _queue_notifier():
+    """on_wait callback that shows the user's place in the queue instead of a provider error"""
+    state = {"placeholder": None}
+
+    def notify(position, queue_length):
+        if state["placeholder"] is None:
+            state["placeholder"] = st.empty()
+        state["placeholder"].info(f"⏳ High demand right now - you are #{position} of {queue_length} in the queue...")
+
+    def clear():
+        if state["placeholder"] is not None:
+            state["placeholder"].empty()
+
+    return notify, clear
+
+def _stream(llm, prompt):
+    """Stream the completion, returning (merged message, ms to first token); raises if no chunk arrives"""
+    started = time.perf_counter()
+    response, ttft_ms = None, None
+    for chunk in llm.stream(prompt):
+        if ttft_ms is None and chunk.content:
+            ttft_ms = round((time.perf_counter() - started) * 1000)
+        response = chunk if response is None else response + chunk
+    if response is None:
+        raise RuntimeError(ERROR_MESSAGES["empty_completion"])
+    return response, ttft_ms
+
+def usage_record(response):
+    """Usage accounting dict attached by invoke_llm, for save_chat_message(usage=...)"""
+    return getattr(response, "response_metadata", {}).get("usage_record")
+
+def check_quota(user_id):
+    """Refuse a call up front once the user's trailing 24h token spend reaches the quota"""
+    if USER_DAILY_TOKEN_QUOTA and get_user_tokens_today(user_id) >= USER_DAILY_TOKEN_QUOTA:
+        raise AdmissionError(ERROR_MESSAGES["quota_exceeded"])
+
+def invoke_llm(llm, prompt, user_id, prompt_kind="chat"):
+    """
+    Invoke the model once the admission controller lets this user's call through.
+    The completion is streamed so time-to-first-token can be measured; token counts, TTFT,
+    latency and cache hits are attached as response.response_metadata["usage_record"].
+    """
+    check_quota(user_id)
+    controller = get_admission_controller()
+    notify, clear = _queue_notifier()
+    est_tokens = estimate_tokens(prompt)
+    with span("llm.invoke", model=llm.model_name, est_tokens=est_tokens, prompt_kind=prompt_kind) as s:
+        try:
+            with controller.admit(user_id, llm.model_name, est_tokens, on_wait=notify) as ticket:
+                clear()
+                s.set(queue_wait_ms=round(ticket.waited * 1000, 1))
+                started = time.perf_counter()
+                try:
+                    response, ttft_ms = _stream(llm, prompt)
+                except Exception as e:
+                    if _is_rate_limited(e):
+                        controller.throttle(llm.model_name)
+                        raise AdmissionError(ERROR_MESSAGES["provider_busy"]) from e
+                    raise
+                latency_ms = round((time.perf_counter() - started) * 1000)
+                usage = getattr(response, "usage_metadata", None) or {}
+                ticket.actual_tokens = usage.get("total_tokens")
+                response.response_metadata["usage_record"] = {
+                    "model": llm.model_name,
+                    "prompt_kind": prompt_kind,
+                    "prompt_tokens": usage.get("input_tokens"),
+                    "completion_tokens": usage.get("output_tokens"),
+                    "ttft_ms": ttft_ms,
+                    "latency_ms": latency_ms,
+                    "cache_hit": bool((usage.get("input_token_details") or {}).get("cache_read")),
+                    "created_ts": time.time(),
+                }
+                s.set(prompt_tokens=usage.get("input_tokens"), completion_tokens=usage.get("output_tokens"),
+                      ttft_ms=ttft_ms, payload_bytes=len(str(response.content).encode()))
+        finally:
+            clear()
+    return response
@@ -0,0 +1,307 @@
+"""
+Resume–job description match scoring - a local, instant estimate of how well a CV covers a
+job description, shown before any model call and optionally handed to the model.
+
+- Skills come from a curated vocabulary (SKILL_VOCABULARY, aliases matched as 1-3 word
+  n-grams); skills a job description only lists as preferred / nice to have weigh
+  MATCH_PREFERRED_WEIGHT
+- Keywords are the job description's most frequent other terms and two-word phrases
+- Weights grow with mentions (1 + log count); coverage is the weighted share present in the
+  resume, and the score blends skill and keyword coverage (MATCH_SKILL_SHARE)
+
+Profiles are cached per text (SHA-256). score_many() scores one resume against any number of
+job descriptions with NumPy: every description's skills and keywords are concatenated and
+the covered and total weights are summed per description with np.bincount.
+"""
+
+import hashlib
+import math
+import re
+import numpy as np
+from utils.cache import LRUCache
+from utils.retrieval import STOPWORDS
+from config import MATCH_SKILL_SHARE, MATCH_PREFERRED_WEIGHT, MATCH_MAX_KEYWORDS, MATCH_CACHE_SIZE
+
+# Bump when extraction changes
+MATCH_VERSION = 1
+
+# category -> {skill: aliases}; the skill name itself matches too (except AMBIGUOUS_NAMES)
+SKILL_VOCABULARY = {
+    "Programming": {
+        "Python": (), "Java": (), "JavaScript": ("js", "ecmascript"), "TypeScript": (),
+        "C++": ("cpp",), "C#": ("csharp",), "Go": ("golang", "go language"), "Rust": (), "Scala": (), "Kotlin": (),
+        "Swift": (), "Ruby": (), "PHP": (), "R": ("r programming", "rstudio", "r language", "tidyverse", "ggplot2"),
+        "MATLAB": (), "Bash": ("shell scripting", "zsh"), "SQL": ("t-sql", "pl/sql", "tsql", "plsql"),
+        ".NET": ("dotnet", "asp.net"), "VBA": (),
+    },
+    "Data & Analytics": {
+        "Pandas": (), "NumPy": (), "Spark": ("pyspark", "apache spark"), "Hadoop": ("hdfs", "hive"),
+        "Kafka": ("apache kafka",), "Airflow": ("apache airflow",), "dbt": (), "ETL": ("elt", "data pipelines", "data pipeline"),
+        "Data Warehousing": ("data warehouse", "data warehouses"), "Snowflake": (), "BigQuery": ("big query",),
+        "Redshift": (), "Databricks": (), "Data Modeling": ("data modelling",), "Statistics": ("statistical analysis", "statistical"),
+        "A/B Testing": ("ab testing", "a/b tests", "experimentation"), "Data Visualization": ("data visualisation", "dashboards", "dashboarding"),
+        "Tableau": (), "Power BI": ("powerbi",), "Looker": (), "Excel": ("ms excel", "microsoft excel", "spreadsheets"),
+    },
+    "Databases": {
+        "PostgreSQL": ("postgres",), "MySQL": (), "SQL Server": ("mssql", "ms sql"), "Oracle": (),
+        "MongoDB": ("mongo",), "Redis": (), "Elasticsearch": ("elastic search", "opensearch"), "Cassandra": (),
+        "DynamoDB": (), "SQLite": (),
+    },
+    "Cloud & DevOps": {
+        "AWS": ("amazon web services", "ec2", "s3", "lambda"), "Azure": ("microsoft azure",), "GCP": ("google cloud", "google cloud platform"),
+        "Docker": ("containers", "containerization"), "Kubernetes": ("k8s", "eks", "aks", "gke"), "Terraform": (),
+        "Ansible": (), "CI/CD": ("continuous integration", "continuous delivery", "continuous deployment"),
+        "Jenkins": (), "GitHub Actions": (), "GitLab CI": (), "Linux": ("unix",), "Git": ("version control", "github", "gitlab"),
+        "Microservices": ("microservice", "service oriented architecture"), "Monitoring": ("observability", "prometheus", "grafana", "datadog"),
+        "Infrastructure as Code": ("iac",),
+    },
+    "Machine Learning & AI": {
+        "Machine Learning": ("ml",), "Deep Learning": ("neural networks", "neural network"), "NLP": ("natural language processing",),
+        "Computer Vision": (), "LLMs": ("llm", "large language models", "generative ai", "genai"), "PyTorch": ("torch",),
+        "TensorFlow": ("keras",), "scikit-learn": ("sklearn", "scikit learn"), "MLOps": ("model deployment",),
+        "Forecasting": ("time series",), "Recommendation Systems": ("recommender systems", "recommendation engine"),
+    },
+    "Web & Mobile": {
+        "React": ("react.js", "reactjs"), "Angular": (), "Vue": ("vue.js", "vuejs"), "Node.js": ("nodejs", "node js"),
+        "Django": (), "Flask": (), "FastAPI": (), "Spring": ("spring boot",), "REST APIs": ("restful", "rest api", "rest apis", "api design"),
+        "GraphQL": (), "HTML": ("html5",), "CSS": ("css3", "sass", "tailwind"), "Android": (), "iOS": (),
+    },
+    "Methods & Tools": {
+        "Agile": ("agile methodologies",), "Scrum": ("scrum master",), "Kanban": (), "Jira": ("confluence",),
+        "Six Sigma": ("lean six sigma", "dmaic"), "Lean": ("lean manufacturing", "lean principles", "lean methodology", "kaizen"), "Project Management": ("pmp", "prince2"),
+        "Product Management": ("product roadmap", "roadmapping"), "Testing": ("unit testing", "test automation", "qa", "pytest", "selenium"),
+        "System Design": ("distributed systems", "architecture design", "scalability"), "Security": ("cybersecurity", "information security"),
+        "SAP": (), "Salesforce": (),
+    },
+    "Business & Soft Skills": {
+        "Leadership": ("team leadership", "led teams", "people management"), "Communication": ("communication skills",),
+        "Stakeholder Management": ("stakeholders", "stakeholder"), "Mentoring": ("mentored", "coaching", "mentor"),
+        "Problem Solving": ("problem-solving", "troubleshooting"), "Collaboration": ("teamwork", "cross-functional", "cross functional"),
+        "Negotiation": (), "Budgeting": ("budget management", "p&l"), "Presentation": ("presentations", "public speaking"),
+        "Customer Service": ("customer support", "client relations"),
+    },
+}
+
+# Names too common as plain words to count on their own; only their aliases match
+AMBIGUOUS_NAMES = frozenset({"R", "Go", "Lean"})
+
+PREFERRED_MARKERS = ("nice to have", "preferred", "bonus", "a plus", "desirable", "good to have", "optional")
+# Headings of job-posting parts that say nothing about the candidate
+SKIPPED_MARKERS = ("benefits", "perks", "what we offer", "compensation", "about us", "equal opportunity", "how to apply")
+
+# Job-posting filler that is never a meaningful keyword
+_JD_FILLER = frozenset("""
+experience year work team role candidate ability strong knowledge including required requirement responsibilitie
+responsibility skill using use working job company position looking join across within well new based etc
+must plus preferred opportunity environment understanding excellent good great high level ideal key day help
+build building support develop developing ensure make part include also may like least one two three five
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9+#&/]+(?:[.\-][a-z0-9+#]+)*")
+_BULLET = re.compile(r"^[-*•‣▪●◦–]")
+_MAX_NGRAM = 3
+
+def _skill_tokens(text):
+    text = re.sub(r"(?<![\w.])\.net\b", " dotnet ", text.lower())
+    tokens = []
+    for token in _TOKEN.findall(text):
+        # "ci/cd" and "a/b" stay whole; other slashes separate words
+        tokens += [token] if token.count("/") == 1 and len(token) <= 5 else [t for t in token.split("/") if t]
+    return tokens
+
+SKILLS = [skill for skills in SKILL_VOCABULARY.values() for skill in skills]
+SKILL_CATEGORY = {skill: category for category, skills in SKILL_VOCABULARY.items() for skill in skills}
+_SKILL_ID = {skill: i for i, skill in enumerate(SKILLS)}
+_ALIASES = {}
+for _skill in SKILLS:
+    _names = () if _skill in AMBIGUOUS_NAMES else (_skill,)
+    for _alias in _names + SKILL_VOCABULARY[SKILL_CATEGORY[_skill]][_skill]:
+        _ALIASES.setdefault(" ".join(_skill_tokens(_alias)), _skill)
+del _skill, _names, _alias
+
+_cache = LRUCache(MATCH_CACHE_SIZE)
+
+def _find_skills(tokens):
+    """
+    {skill: mentions} from 1-3 word alias n-grams, longest match first, and the tokens with
+    the matched ones replaced by None (so skills are not counted again as keywords)
+    """
+    found, rest = {}, list(tokens)
+    i = 0
+    while i < len(tokens):
+        for n in range(min(_MAX_NGRAM, len(tokens) - i), 0, -1):
+            skill = _ALIASES.get(" ".join(tokens[i:i + n]))
+            if skill:
+                found[skill] = found.get(skill, 0) + 1
+                rest[i:i + n] = [None] * n
+                i += n
+                break
+        else:
+            i += 1
+    return found, rest
+
+def _terms(tokens):
+    """Content words and two-word phrases (stopwords and job-posting filler dropped)"""
+    words = []
+    for token in tokens:
+        token = (token or "").strip(".-")
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        words.append(token if len(token) > 2 and not token.isdigit()
+                     and token not in STOPWORDS and token not in _JD_FILLER else None)
+    terms = [w for w in words if w]
+    terms += [f"{a} {b}" for a, b in zip(words, words[1:]) if a and b]
+    return terms
+
+def _is_heading(line, skills):
+    """Short unbulleted lines like "Nice to have:" or "Requirements" (a bare list of skills is not one)"""
+    if _BULLET.match(line):
+        return False
+    return line.endswith(":") or (len(line.split()) <= 6 and not re.search(r"[.,;]", line) and not skills)
+
+def profile(text):
+    """
+    Skills and keywords of a text, cached per text:
+    {"skills": {skill: mentions}, "preferred": {skills only in preferred lines}, "terms": {term: count},
+     "skill_weights": {skill: weight}, "keywords": {term: weight}}
+    """
+    key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), MATCH_VERSION)
+    return _cache.get_or_compute(key, lambda: _profile(text))
+
+def _profile(text):
+    skills, required, terms = {}, set(), {}
+    preferred_block = skipped_block = False
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        lower = line.lower()
+        marked = any(marker in lower for marker in PREFERRED_MARKERS)
+        found, rest = _find_skills(_skill_tokens(line))
+        if _is_heading(line, found):
+            preferred_block = marked
+            skipped_block = any(marker in lower for marker in SKIPPED_MARKERS)
+            if line.endswith(":") or marked:
+                continue
+        if skipped_block:
+            continue
+        for skill, count in found.items():
+            skills[skill] = skills.get(skill, 0) + count
+            if not (marked or preferred_block):
+                required.add(skill)
+        for term in _terms(rest):
+            terms[term] = terms.get(term, 0) + 1
+    result = {"skills": skills, "preferred": set(skills) - required, "terms": terms}
+    # As a job description: what score_many() weighs
+    result["skill_weights"], result["keywords"] = _skill_weights(result), _keywords(result)
+    return result
+
+def _weight(count):
+    return 1 + math.log(count)
+
+def _keywords(jd):
+    """The job description's top non-skill terms as {term: weight}"""
+    # Phrases count only when repeated; single mentions of a phrase are mostly noise
+    candidates = [(count, term) for term, count in jd["terms"].items() if " " not in term or count > 1]
+    candidates.sort(key=lambda item: (-item[0], item[1]))
+    return {term: _weight(count) for count, term in candidates[:MATCH_MAX_KEYWORDS]}
+
+def _skill_weights(jd):
+    return {skill: _weight(count) * (MATCH_PREFERRED_WEIGHT if skill in jd["preferred"] else 1.0)
+            for skill, count in jd["skills"].items()}
+
+def score_many(resume_text, jd_texts):
+    """
+    Match of one resume against each job description, vectorized over the descriptions.
+    Returns {"score", "skill_coverage", "keyword_coverage"}: NumPy arrays in jd_texts order
+    (score 0-100; coverages 0-1, NaN when a description has no skills or keywords).
+    """
+    resume = profile(resume_text)
+    jds = [profile(text) for text in jd_texts]
+    n = len(jds)
+
+    skill_rows, skill_ids, skill_w = [], [], []
+    term_rows, term_names, term_w = [], [], []
+    for row, jd in enumerate(jds):
+        for skill, weight in jd["skill_weights"].items():
+            skill_rows.append(row)
+            skill_ids.append(_SKILL_ID[skill])
+            skill_w.append(weight)
+        for term, weight in jd["keywords"].items():
+            term_rows.append(row)
+            term_names.append(term)
+            term_w.append(weight)
+
+    has_skill = np.zeros(len(SKILLS), dtype=bool)
+    has_skill[[_SKILL_ID[skill] for skill in resume["skills"]]] = True
+    skill_rows, term_rows = np.array(skill_rows, dtype=np.int64), np.array(term_rows, dtype=np.int64)
+    skill_w = np.array(skill_w, dtype=np.float64)
+    skill_total = np.bincount(skill_rows, weights=skill_w, minlength=n)
+    skill_covered = np.bincount(skill_rows, weights=skill_w * has_skill[np.array(skill_ids, dtype=np.int64)], minlength=n)
+
+    term_w = np.array(term_w, dtype=np.float64)
+    if term_names:
+        vocab, term_ids = np.unique(np.array(term_names), return_inverse=True)
+        has_term = np.isin(vocab, np.array(list(resume["terms"]) or [""]))[term_ids]
+    else:
+        has_term = np.zeros(0, dtype=bool)
+    term_total = np.bincount(term_rows, weights=term_w, minlength=n)
+    term_covered = np.bincount(term_rows, weights=term_w * has_term, minlength=n)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        skill_coverage = np.where(skill_total > 0, skill_covered / skill_total, np.nan)
+        keyword_coverage = np.where(term_total > 0, term_covered / term_total, np.nan)
+    blended = MATCH_SKILL_SHARE * skill_coverage + (1 - MATCH_SKILL_SHARE) * keyword_coverage
+    score = np.where(np.isnan(skill_coverage), keyword_coverage, np.where(np.isnan(keyword_coverage), skill_coverage, blended))
+    return {
+        "score": np.round(np.nan_to_num(score) * 100, 1),
+        "skill_coverage": skill_coverage,
+        "keyword_coverage": keyword_coverage,
+    }
+
+def match_report(resume_text, jd_text):
+    """
+    Coverage/gap report of one resume against one job description:
+    {"score", "skill_coverage", "keyword_coverage", "matched_skills", "missing_required",
+     "missing_preferred", "extra_skills", "matched_keywords", "missing_keywords"}
+    Skill and keyword lists are ordered by weight, heaviest first.
+    """
+    resume, jd = profile(resume_text), profile(jd_text)
+    scores = score_many(resume_text, [jd_text])
+    skill_weights, keywords = jd["skill_weights"], jd["keywords"]
+
+    def by_weight(weights):
+        return sorted(weights, key=lambda item: (-weights[item], item))
+
+    def coverage(value):
+        return None if np.isnan(value) else round(float(value), 3)
+
+    return {
+        "score": float(scores["score"][0]),
+        "skill_coverage": coverage(scores["skill_coverage"][0]),
+        "keyword_coverage": coverage(scores["keyword_coverage"][0]),
+        "matched_skills": [s for s in by_weight(skill_weights) if s in resume["skills"]],
+        "missing_required": [s for s in by_weight(skill_weights) if s not in resume["skills"] and s not in jd["preferred"]],
+        "missing_preferred": [s for s in by_weight(skill_weights) if s not in resume["skills"] and s in jd["preferred"]],
+        "extra_skills": sorted(set(resume["skills"]) - set(skill_weights), key=lambda s: (-resume["skills"][s], s)),
+        "matched_keywords": [t for t in by_weight(keywords) if t in resume["terms"]],
+        "missing_keywords": [t for t in by_weight(keywords) if t not in resume["terms"]],
+    }
+
+def format_report(report, max_items=15):
+    """Plain-text report for prompts"""
+    def listed(items):
+        return ", ".join(items[:max_items]) + (f" (+{len(items) - max_items} more)" if len(items) > max_items else "") or "none"
+
+    def percent(value):
+        return "n/a" if value is None else f"{value:.0%}"
+
+    return "\n".join([
+        "LOCAL MATCH ANALYSIS (keyword-based estimate, verify against the documents):",
+        f"- Match score: {report['score']:.0f}/100 (skills covered {percent(report['skill_coverage'])}, "
+        f"keywords covered {percent(report['keyword_coverage'])})",
+        f"- Skills in both: {listed(report['matched_skills'])}",
+        f"- Required skills missing from the resume: {listed(report['missing_required'])}",
+        f"- Preferred skills missing from the resume: {listed(report['missing_preferred'])}",
+        f"- Job description keywords missing from the resume: {listed(report['missing_keywords'])}",
+    ])
@@ -3,22 +3,44 @@ Chat history storage and retrieval for authenticated users
 """
 
 from auth.database import get_connection
-# from utils.chat_sessions import update_session_timestamp
+from utils.tracing import traced
+from utils import session_index
 
-def save_chat_message(user_id, session_id, tab_name, role, content):
-    """Save a single chat message to database with session_id"""
+@traced("db.save_chat_message")
+def save_chat_message(user_id, session_id, tab_name, role, content, usage=None):
+    """
+    Save a single chat message to database with session_id and return its id.
+    `usage` (from utils.llm.usage_record) is stored in the llm_usage side table.
+    """
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute(
-        "INSERT INTO chat_history (user_id, session_id, tab_name, role, content) VALUES (%s, %s, %s, %s, %s)",      
+        "INSERT INTO chat_history (user_id, session_id, tab_name, role, content) VALUES (%s, %s, %s, %s, %s) RETURNING id",
         (user_id, session_id, tab_name, role, content)
     )
+    message_id = cursor.fetchone()[0]
+    # Appending makes this the most recently active session
+    cursor.execute(
+        "UPDATE chat_sessions SET updated_at=CURRENT_TIMESTAMP WHERE id=%s RETURNING id, tab_name, session_title, created_at, updated_at, first_message",
+        (session_id,)
+    )
+    session_row = cursor.fetchone()
+    if usage:
+        cursor.execute(
+            """INSERT INTO llm_usage (message_id, user_id, tab_name, prompt_kind, model, prompt_tokens,
+                   completion_tokens, ttft_ms, latency_ms, cache_hit, created_ts)
+               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+            (message_id, user_id, tab_name, usage["prompt_kind"], usage["model"], usage["prompt_tokens"],
+             usage["completion_tokens"], usage["ttft_ms"], usage["latency_ms"], int(usage["cache_hit"]),
+             usage["created_ts"])
+        )
     conn.commit()
     conn.close()
-    
-    # Update session timestamp
-    # update_session_timestamp(session_id)
+    if session_row:
+        session_index.upsert(user_id, session_row)
+    return message_id
 
+@traced("db.get_chat_history")
 def get_chat_history(user_id, tab_name=None, limit=50):
     """Retrieve chat history for a user (legacy - for backward compatibility)"""
     conn = get_connection()
@@ -39,6 +61,7 @@ def get_chat_history(user_id, tab_name=None, limit=50):
     conn.close()
     return results[::-1] # Reverse to get chronological order
 
+@traced("db.get_all_sessions")
 def get_all_sessions(user_id):
     """Get all chat sessions for a user (grouped by tab and date)"""
     conn = get_connection()
@@ -55,6 +78,7 @@ def get_all_sessions(user_id):
     conn.close()
     return results
 
+@traced("db.delete_chat_history")
 def delete_chat_history(user_id, tab_name=None):
     """Delete chat history for a user"""
     conn = get_connection()
@@ -0,0 +1,127 @@
+"""
+Page-streaming PDF text extraction.
+
+Uploaded PDFs are untrusted, so they are only ever parsed in a pool of worker processes with
+an address-space limit (one worker when PDF_WORKERS is 0): the page count first, then the
+pages, as one task for short documents or split into page ranges parsed in parallel for
+documents with at least PDF_PARALLEL_MIN_PAGES pages. Pages are still yielded in order and
+reading stops at the page and character budgets. The time limit is hard: the workers of a
+timed-out document are killed. parallel=False parses in the calling thread instead, with the
+time limit only checked between pages and no memory limit (trusted files, e.g. benchmarks).
+"""
+
+import io
+import mmap
+import multiprocessing
+import threading
+import time
+from config import (
+    PDF_MAX_PAGES, PDF_MAX_CHARS, PDF_PARALLEL_MIN_PAGES, PDF_PAGES_PER_TASK, PDF_WORKERS,
+    PDF_WORKER_MAX_MEMORY, FILE_UPLOAD_TIMEOUT
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+class ExtractionTimeout(Exception):
+    """A document took longer than its time limit"""
+
+def _reader(source):
+    """source: the PDF's bytes, or the path of a file that is memory-mapped instead of read"""
+    import PyPDF2  # heavy, loaded on first upload
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return PyPDF2.PdfReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return PyPDF2.PdfReader(io.BytesIO(source))
+
+def _page_count(source, max_pages):
+    """Pool task: number of pages read, at most max_pages"""
+    return min(len(_reader(source).pages), max_pages)
+
+def _extract_range(source, start, stop):
+    """Pool task: text of pages [start, stop)"""
+    reader = _reader(source)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def _limit_memory():
+    """Pool initializer: a PDF whose streams inflate without bound fails with MemoryError in the worker"""
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (PDF_WORKER_MAX_MEMORY, PDF_WORKER_MAX_MEMORY))
+    except (ImportError, ValueError, OSError):
+        pass  # no resource module (Windows) or the limit cannot be lowered
+
+def get_pool():
+    """The process-wide worker pool, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process runs many threads
+            _pool = multiprocessing.get_context("spawn").Pool(max(1, PDF_WORKERS), initializer=_limit_memory)
+        return _pool
+
+def _kill_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.terminate()
+
+def _iter_local_pages(reader, page_count, deadline):
+    for index in range(page_count):
+        if time.monotonic() > deadline:
+            raise ExtractionTimeout(f"PDF extraction stopped after {index} pages")
+        yield reader.pages[index].extract_text() or ""
+
+def _pool_results(tasks, deadline, pages_done):
+    """Results of pool tasks [(function, args)] in order; past the deadline the pool is killed and
+    ExtractionTimeout names pages_done(index of the unfinished task)"""
+    pool = get_pool()
+    pending = [pool.apply_async(function, args) for function, args in tasks]
+    for index in range(len(tasks)):
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _kill_pool(pool)
+                raise ExtractionTimeout(f"PDF extraction stopped after {pages_done(index)} pages")
+            try:
+                result = pending[index].get(timeout=min(remaining, 0.5))
+                break
+            except multiprocessing.TimeoutError:
+                if pool is not _pool:
+                    # Another document's time limit killed the pool: resubmit what is left
+                    pool = get_pool()
+                    pending[index:] = [pool.apply_async(function, args) for function, args in tasks[index:]]
+        yield result
+
+def _iter_pool_pages(source, max_pages, deadline):
+    page_count = next(_pool_results([(_page_count, (source, max_pages))], deadline, lambda index: 0))
+    per_task = PDF_PAGES_PER_TASK if page_count >= PDF_PARALLEL_MIN_PAGES else max(page_count, 1)
+    ranges = [(start, min(start + per_task, page_count)) for start in range(0, page_count, per_task)]
+    tasks = [(_extract_range, (source, start, stop)) for start, stop in ranges]
+    for pages in _pool_results(tasks, deadline, lambda index: ranges[index][0]):
+        yield from pages
+
+def iter_pages(source, max_pages=PDF_MAX_PAGES, time_limit=FILE_UPLOAD_TIMEOUT, parallel=None):
+    """
+    Text of each page in order, up to max_pages; raises ExtractionTimeout past time_limit seconds.
+    source is the PDF's bytes or a file path (pool workers then open the file instead of
+    receiving the bytes). Parsing happens in the worker pool; parallel=False parses in the
+    calling thread, for trusted files only (see the module docstring).
+    """
+    deadline = time.monotonic() + time_limit
+    if parallel is False:
+        reader = _reader(source)
+        return _iter_local_pages(reader, min(len(reader.pages), max_pages), deadline)
+    return _iter_pool_pages(source, max_pages, deadline)
+
+def extract_text(source, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS, time_limit=FILE_UPLOAD_TIMEOUT,
+                 parallel=None):
+    """Text of a PDF with pages separated by form feeds (\\f), cut at max_chars"""
+    parts, size = [], 0
+    for page_text in iter_pages(source, max_pages, time_limit, parallel):
+        parts.append(page_text)
+        size += len(page_text) + 1
+        if size >= max_chars:
+            break
+    return "\f".join(parts)[:max_chars]
@@ -0,0 +1,135 @@
+"""
+Resume condensation - a deterministic, local pass that turns extracted resume text into the
+compact canonical form every CV prompt uses.
+
+1. Normalize: Unicode NFKC, bullets to "- ", hyphenated line breaks rejoined, whitespace runs
+   collapsed, blank-line runs removed.
+2. Strip page furniture: page-number lines, and lines at the top or bottom of PDF pages
+   (pages are separated by form feeds) that repeat on at least half of the pages, keeping
+   the first occurrence (a header usually carries the candidate's name).
+3. Drop exact duplicates of sentence-length lines.
+4. Segment into sections (Contact, Summary, Experience, Skills, Education, ...) by heading
+   lines, rendered as "## Section" blocks in document order.
+
+Results are cached per document (SHA-256 of the text).
+"""
+
+import hashlib
+import re
+import unicodedata
+from utils.cache import LRUCache
+from config import EXTRACTION_CACHE_SIZE
+
+# Bump when the output changes
+CONDENSE_VERSION = 1
+
+SECTION_HEADINGS = {
+    "Summary": ("summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about"),
+    "Experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "relevant experience"),
+    "Skills": ("skills", "technical skills", "key skills", "core skills", "core competencies",
+               "competencies", "technologies", "tools", "tech stack", "skills and tools"),
+    "Education": ("education", "academic background", "academics", "education and training",
+                  "qualifications", "academic qualifications"),
+    "Projects": ("projects", "key projects", "personal projects", "academic projects"),
+    "Certifications": ("certifications", "certificates", "licenses and certifications", "courses",
+                       "training", "certifications and training"),
+    "Achievements": ("achievements", "awards", "honors", "awards and achievements", "accomplishments"),
+    "Publications": ("publications", "research", "papers"),
+    "Languages": ("languages",),
+    "Volunteering": ("volunteering", "volunteer experience", "community"),
+    "Interests": ("interests", "hobbies", "hobbies and interests"),
+}
+_HEADING_LOOKUP = {synonym: section for section, synonyms in SECTION_HEADINGS.items() for synonym in synonyms}
+
+_BULLETS = re.compile(r"^[•‣▪▫●○◦⁃∙*–—-]+\s*")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$|^-\s*\d{1,3}\s*-$", re.IGNORECASE)
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b\u202f\u205f\u3000]+")
+_HYPHEN_BREAK = re.compile(r"(\w)-\n(\w)")
+_EDGE_LINES = 2        # lines at the top and bottom of a page checked for headers/footers
+_DEDUPE_MIN_CHARS = 30 # shorter repeated lines ("Responsibilities:") are structure, not noise
+
+_cache = LRUCache(EXTRACTION_CACHE_SIZE)
+
+def _normalize_lines(page):
+    page = unicodedata.normalize("NFKC", page)
+    page = _HYPHEN_BREAK.sub(r"\1\2", page)
+    lines = []
+    for line in page.splitlines():
+        line = _SPACES.sub(" ", line).strip()
+        if not line:
+            continue
+        if _BULLETS.match(line) and not line.startswith("--"):
+            line = "- " + _BULLETS.sub("", line)
+        lines.append(line)
+    return lines
+
+def _furniture(pages):
+    """Lines at page edges that repeat on at least half of the pages (min. 2)"""
+    if len(pages) < 2:
+        return set()
+    counts = {}
+    for lines in pages:
+        for line in set(lines[:_EDGE_LINES] + lines[-_EDGE_LINES:]):
+            counts[line] = counts.get(line, 0) + 1
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {line for line, count in counts.items() if count >= threshold}
+
+def _heading(line):
+    """Canonical section name if the line is a section heading"""
+    if len(line) > 40 or line.startswith("- "):
+        return None
+    key = re.sub(r"[^a-z ]", "", line.lower().replace("&", " and "))
+    key = re.sub(r"\s+", " ", key).strip()
+    return _HEADING_LOOKUP.get(key)
+
+def condense(text):
+    """
+    Canonical form of a resume and what was removed:
+    {"text", "sections", "removed": {"page_numbers", "furniture", "duplicates"}, "chars_before", "chars_after"}
+    """
+    key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), CONDENSE_VERSION)
+    return _cache.get_or_compute(key, lambda: _condense(text))
+
+def canonical_resume(text):
+    """The condensed resume text used in CV prompts"""
+    return condense(text)["text"]
+
+def _condense(text):
+    pages = [_normalize_lines(page) for page in text.split("\f")]
+    furniture = _furniture(pages)
+    removed = {"page_numbers": 0, "furniture": 0, "duplicates": 0}
+
+    sections = [["Contact", []]]
+    seen = set()
+    for lines in pages:
+        for line in lines:
+            if _PAGE_NUMBER.match(line):
+                removed["page_numbers"] += 1
+                continue
+            if line in seen and line in furniture:
+                removed["furniture"] += 1
+                continue
+            if line in seen and len(line) >= _DEDUPE_MIN_CHARS:
+                removed["duplicates"] += 1
+                continue
+            seen.add(line)
+            section = _heading(line)
+            if section:
+                if sections[-1][1] or sections[-1][0] == "Contact":
+                    sections.append([section, []])
+                else:
+                    sections[-1][0] = section  # consecutive headings: keep the last
+                continue
+            sections[-1][1].append(line)
+
+    blocks = [f"## {name}\n" + "\n".join(lines) for name, lines in sections if lines]
+    condensed = "\n\n".join(blocks)
+    return {
+        "text": condensed,
+        "sections": [name for name, lines in sections if lines],
+        "removed": removed,
+        "chars_before": len(text),
+        "chars_after": len(condensed),
+    }
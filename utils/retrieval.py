@@ -0,0 +1,186 @@
+"""
+Chat context retrieval - a small in-process BM25 index over section-level chunks of the
+resume and job description, so a chat turn about one project carries that project instead
+of both documents in full.
+
+- chunk_resume() / chunk_text(): "## Section" blocks of the canonical resume (and blank-line
+  paragraphs of other text), split into line windows of at most RETRIEVAL_CHUNK_CHARS
+- Index: BM25 weights in compressed sparse column form (term -> chunk postings) built with
+  NumPy; scoring a question is a gather and one np.add.at over its terms' postings
+- select(): the top RETRIEVAL_TOP_K chunks across documents, or the full documents when they
+  are short, the question is broad or nothing matches
+
+Indexes are cached per document (SHA-256 of the text).
+"""
+
+import hashlib
+import re
+import numpy as np
+from utils.cache import LRUCache
+from utils.tracing import span
+from config import (
+    RETRIEVAL_ENABLED, RETRIEVAL_TOP_K, RETRIEVAL_CHUNK_CHARS, RETRIEVAL_MIN_CHARS,
+    RETRIEVAL_CACHE_SIZE, BM25_K1, BM25_B
+)
+
+# Bump when chunking or weighting changes
+INDEX_VERSION = 1
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her
+here hers him his how i if in into is it its just me more most my no nor not now of off on once only or
+other our out over own same she should so some such than that the their them then there these they this
+those through to too under until up very was we were what when where which while who whom why will with
+would you your yours tell give show explain please question questions answer
+""".split())
+
+# Questions about the documents as a whole get them in full
+BROAD_TERMS = frozenset("""
+overall entire whole everything summarize summarise summary review feedback improve rewrite strengths
+weaknesses fit match gap gaps compare comparison suitable ready
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+_BROAD_SHARE = 0.5  # a question matching more than this share of the chunks is broad
+
+_cache = LRUCache(RETRIEVAL_CACHE_SIZE)
+
+def tokenize(text):
+    """Lowercased terms without stopwords; a trailing plural "s" is dropped from longer words"""
+    terms = []
+    for term in _TOKEN.findall(text.lower()):
+        if term in STOPWORDS:
+            continue
+        if len(term) > 4 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+def _windows(title, lines):
+    """Lines of one section in windows of at most RETRIEVAL_CHUNK_CHARS, each headed by the title"""
+    chunks, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) > RETRIEVAL_CHUNK_CHARS:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append(current)
+    return [(f"## {title}\n" if title else "") + "\n".join(chunk) for chunk in chunks]
+
+def chunk_resume(canonical):
+    """Chunks of a canonical resume (utils/resume_condense.py), one or more per section"""
+    chunks = []
+    for block in re.split(r"\n\n(?=## )", canonical.strip()):
+        lines = block.splitlines()
+        if lines and lines[0].startswith("## "):
+            chunks += _windows(lines[0][3:], lines[1:])
+        elif lines:
+            chunks += _windows("", lines)
+    return chunks
+
+def chunk_text(text, title=""):
+    """Chunks of free text (e.g. a pasted job description): paragraphs merged up to the window size"""
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    lines = [line.strip() for p in paragraphs for line in p.splitlines() if line.strip()]
+    return _windows(title, lines)
+
+class Index:
+    """BM25 index over a document's chunks"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        tokens = [tokenize(chunk) for chunk in chunks]
+        lengths = np.array([len(t) for t in tokens], dtype=np.float64)
+        flat = [term for t in tokens for term in t]
+        if not flat:
+            self.vocab = np.array([], dtype=str)
+            self.indptr = np.zeros(1, dtype=np.int64)
+            self.rows = np.array([], dtype=np.int64)
+            self.weights = np.array([], dtype=np.float64)
+            return
+
+        n = len(chunks)
+        self.vocab, term_ids = np.unique(np.array(flat), return_inverse=True)
+        chunk_ids = np.repeat(np.arange(n), lengths.astype(np.int64))
+        # One entry per (term, chunk) pair, sorted by term: the postings in CSC order
+        pairs, tf = np.unique(term_ids.astype(np.int64) * n + chunk_ids, return_counts=True)
+        terms, self.rows = pairs // n, pairs % n
+        df = np.bincount(terms, minlength=len(self.vocab))
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+        self.weights = idf[terms] * tf * (BM25_K1 + 1) / (tf + norm[self.rows])
+        self.indptr = np.searchsorted(terms, np.arange(len(self.vocab) + 1))
+
+    def scores(self, terms):
+        """BM25 score of every chunk for a tokenized query"""
+        scores = np.zeros(len(self.chunks))
+        if not terms or not len(self.vocab):
+            return scores
+        query = np.array(terms)
+        positions = np.clip(np.searchsorted(self.vocab, query), 0, len(self.vocab) - 1)
+        ids = positions[self.vocab[positions] == query]
+        if not len(ids):
+            return scores
+        starts, counts = self.indptr[ids], self.indptr[ids + 1] - self.indptr[ids]
+        # Concatenated ranges starts[i]:starts[i] + counts[i] without a Python loop
+        postings = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        np.add.at(scores, self.rows[postings], self.weights[postings])
+        return scores
+
+def get_index(text, kind):
+    """Cached Index of a document; kind is "resume" (canonical resume) or "text" """
+    key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), kind, INDEX_VERSION)
+    chunker = chunk_resume if kind == "resume" else chunk_text
+    return _cache.get_or_compute(key, lambda: Index(chunker(text)))
+
+def select(question, documents, top_k=RETRIEVAL_TOP_K):
+    """
+    Context for one chat turn. documents: [(label, text, kind)].
+    Returns ({label: text or excerpts}, info) where info["mode"] is "retrieval" or "full".
+    """
+    full = {label: text for label, text, _ in documents}
+    total = sum(len(text) for text in full.values())
+    with span("retrieval.select", documents=len(documents), chars=total) as s:
+        terms = tokenize(question or "")
+        reason = None
+        if not RETRIEVAL_ENABLED:
+            reason = "disabled"
+        elif total <= RETRIEVAL_MIN_CHARS:
+            reason = "short"
+        elif not terms or BROAD_TERMS.intersection(terms):
+            reason = "broad"
+
+        hits = []
+        if reason is None:
+            matched = chunks = 0
+            for doc, (label, text, kind) in enumerate(documents):
+                index = get_index(text, kind)
+                scores = index.scores(terms)
+                matched += int(np.count_nonzero(scores))
+                chunks += len(scores)
+                hits += [(score, doc, i) for i, score in enumerate(scores) if score > 0]
+            if not hits:
+                reason = "no_match"
+            elif matched > _BROAD_SHARE * chunks:
+                reason = "broad"
+
+        if reason:
+            s.set(mode="full", reason=reason, context_chars=total)
+            return full, {"mode": "full", "reason": reason, "chunks": 0}
+
+        top = sorted(hits, reverse=True)[:top_k]
+        context = {label: "" for label in full}
+        for doc, (label, text, kind) in enumerate(documents):
+            index = get_index(text, kind)
+            picked = sorted(i for _, d, i in top if d == doc)  # document order
+            context[label] = "\n...\n".join(index.chunks[i] for i in picked)
+        chars = sum(len(text) for text in context.values())
+        s.set(mode="retrieval", chunks=len(top), context_chars=chars)
+        return context, {"mode": "retrieval", "reason": None, "chunks": len(top)}
+
+def stats():
+    """Index cache counters"""
+    return _cache.stats()
@@ -0,0 +1,264 @@
+"""
+Sandbox side of utils/code_profile.py - run as a script in a fresh `python -I -B` subprocess,
+never imported by the app (stdlib only).
+
+    python -I -B sandbox_runner.py <workdir> <cpu seconds> <wall seconds> <memory MB> <top n>
+
+Runs <workdir>/snippet.py under cProfile and tracemalloc and writes <workdir>/result.json.
+Before the snippet starts: death with the parent process, resource limits (CPU, address space,
+file size, open files, no core dumps), a private network namespace when the kernel allows one,
+a seccomp filter (no sockets, exec, fork, signals to other processes, ptrace, namespaces or
+mounts) and an audit hook that also refuses native library loading through ctypes, reads
+outside <workdir> and the Python installation, and writes outside <workdir>. The snippet's
+output is counted, never returned. CPU and wall-clock limits raise inside the snippet, so a run
+that is cut short still reports its profile.
+
+These layers only harden the run; the isolation boundary is the bubblewrap sandbox (separate
+uid, mount, PID and network namespaces) that utils/code_profile.py starts this script in.
+"""
+
+import cProfile
+import ctypes
+import io
+import json
+import os
+import platform
+import pstats
+import resource
+import signal
+import sys
+import time
+import traceback
+import tracemalloc
+
+BLOCKED_EVENTS = (
+    "socket.", "subprocess.", "os.system", "os.exec", "os.posix_spawn", "os.spawn", "os.fork", "os.forkpty",
+    "os.kill", "os.killpg", "signal.pthread_kill", "pty.spawn", "ctypes.dlsym", "ctypes.call_function",
+    "winreg.", "webbrowser.", "urllib.Request", "ftplib.", "smtplib.",
+)
+READ_EVENTS = ("os.listdir", "os.scandir", "glob.glob", "os.chdir")
+READABLE_DEVICES = ("/dev/null", "/dev/zero", "/dev/urandom", "/dev/random")
+PATH_EVENTS = ("os.remove", "os.rename", "os.rmdir", "os.mkdir", "os.chmod", "os.chown", "os.symlink", "os.link",
+               "os.truncate", "os.utime", "shutil.rmtree", "shutil.move", "shutil.copyfile", "shutil.copytree")
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_APPEND
+
+PR_SET_PDEATHSIG = 1
+PR_SET_NO_NEW_PRIVS = 38
+PR_SET_SECCOMP = 22
+SECCOMP_MODE_FILTER = 2
+CLONE_THREAD = 0x00010000
+# audit arch -> syscall numbers: (clone, clone3, denied...)
+SECCOMP_ARCHES = {
+    "x86_64": (0xC000003E, 56, 435, (
+        41, 42, 43, 49, 50, 53, 288,   # socket, connect, accept, bind, listen, socketpair, accept4
+        57, 58, 59, 322,               # fork, vfork, execve, execveat
+        62, 200, 234, 297, 424,        # kill, tkill, tgkill, rt_tgsigqueueinfo, pidfd_send_signal
+        101, 310, 311,                 # ptrace, process_vm_readv, process_vm_writev
+        155, 161, 165, 166, 272, 308,  # pivot_root, chroot, mount, umount2, unshare, setns
+        175, 313, 248, 249, 250, 298, 321, 304,  # modules, keys, perf, bpf, open_by_handle_at
+    )),
+    "aarch64": (0xC00000B7, 220, 435, (
+        198, 203, 202, 200, 201, 199, 242,
+        221, 281,
+        129, 130, 131, 240, 424,
+        117, 270, 271,
+        41, 51, 40, 39, 97, 268,
+        105, 273, 217, 218, 219, 241, 280, 265,
+    )),
+}
+
+class LimitExceeded(BaseException):
+    """Raised into the snippet when a CPU or wall-clock limit is reached (BaseException so
+    a bare `except Exception` in the snippet does not swallow it)"""
+
+def limit_resources(cpu_seconds, memory_mb):
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 2))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 1024 * 1024,) * 2)
+    resource.setrlimit(resource.RLIMIT_FSIZE, (16 * 1024 * 1024,) * 2)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (64, 64))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+def die_with_parent():
+    """SIGKILL this process when the server that started it goes away"""
+    parent = os.getppid()
+    ctypes.CDLL(None, use_errno=True).prctl(PR_SET_PDEATHSIG, signal.SIGKILL, 0, 0, 0)
+    if os.getppid() != parent:
+        os._exit(1)
+
+def _seccomp_program(arch, clone, clone3, denied):
+    """BPF over seccomp_data: other arches are killed, denied syscalls fail with EPERM, clone
+    only creates threads and clone3 reports ENOSYS (so libc falls back to clone)"""
+    ld, jeq, jge, jset, ret = 0x20, 0x15, 0x35, 0x45, 0x06
+    allow, errno_eperm, errno_enosys, kill = 0x7FFF0000, 0x00050000 | 1, 0x00050000 | 38, 0x80000000
+    body = [(ld, None, None, 4), (jeq, None, "kill", arch), (ld, None, None, 0)]
+    if arch == SECCOMP_ARCHES["x86_64"][0]:
+        body.append((jge, "deny", None, 0x40000000))  # x32 ABI numbers
+    body += [(jeq, "clone", None, clone), (jeq, "nosys", None, clone3)]
+    body += [(jeq, "deny", None, nr) for nr in denied]
+    # Jumps only go forward and the program must end on a return: the clone flags check sits
+    # between the returns, with its own allow
+    labels = {"clone": len(body) + 1, "deny": len(body) + 3, "nosys": len(body) + 4, "kill": len(body) + 5,
+              "thread": len(body) + 6}
+    body += [(ret, None, None, allow), (ld, None, None, 16), (jset, "thread", "deny", CLONE_THREAD),
+             (ret, None, None, errno_eperm), (ret, None, None, errno_enosys), (ret, None, None, kill),
+             (ret, None, None, allow)]
+    program = []
+    for index, (code, true, false, k) in enumerate(body):
+        jt = labels[true] - index - 1 if true else 0
+        jf = labels[false] - index - 1 if false else 0
+        program.append((code, jt, jf, k))
+    return program
+
+def install_seccomp():
+    """The syscall filter of the module docstring; False on architectures without a table"""
+    table = SECCOMP_ARCHES.get(platform.machine())
+    if table is None:
+        return False
+
+    class SockFilter(ctypes.Structure):
+        _fields_ = [("code", ctypes.c_ushort), ("jt", ctypes.c_ubyte), ("jf", ctypes.c_ubyte), ("k", ctypes.c_uint)]
+
+    class SockFprog(ctypes.Structure):
+        _fields_ = [("len", ctypes.c_ushort), ("filter", ctypes.POINTER(SockFilter))]
+
+    program = _seccomp_program(*table)
+    filters = (SockFilter * len(program))(*[SockFilter(*instruction) for instruction in program])
+    prog = SockFprog(len(program), filters)
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0:
+        return False
+    return libc.prctl(PR_SET_SECCOMP, SECCOMP_MODE_FILTER, ctypes.byref(prog), 0, 0) == 0
+
+def isolate_network():
+    """A new, empty network namespace (only loopback, down); False where the kernel refuses"""
+    if not hasattr(os, "unshare"):
+        return False
+    for flags in (os.CLONE_NEWNET, os.CLONE_NEWUSER | os.CLONE_NEWNET):
+        try:
+            os.unshare(flags)
+            return True
+        except OSError:
+            continue
+    return False
+
+def install_audit_hook(workdir):
+    workdir = os.path.realpath(workdir) + os.sep
+    # The snippet may read its working directory and import from the Python installation only
+    readable = tuple({os.path.realpath(p) + os.sep for p in sys.path if os.path.isdir(p)} | {workdir})
+
+    def resolve(path):
+        if isinstance(path, bytes):
+            path = os.fsdecode(path)
+        return os.path.realpath(path) + os.sep
+
+    def inside(path):
+        return isinstance(path, int) or resolve(path).startswith(workdir)
+
+    def may_read(path):
+        if path is None or isinstance(path, int):
+            return True
+        resolved = resolve(path)
+        return resolved.startswith(readable) or resolved[:-1] in READABLE_DEVICES
+
+    def hook(event, args):
+        if event.startswith(BLOCKED_EVENTS):
+            raise PermissionError(f"{event} is not allowed in the profiling sandbox")
+        if event == "ctypes.dlopen" and args[0] is not None:
+            # ctypes' own import opens the running process (None); NumPy needs that, nothing more
+            raise PermissionError(f"loading {args[0]} is not allowed in the profiling sandbox")
+        if event == "open":
+            path, mode, flags = args
+            writing = (mode and any(c in mode for c in "wax+")) or (flags or 0) & WRITE_FLAGS
+            if writing and not inside(path):
+                raise PermissionError(f"writing {path} is not allowed in the profiling sandbox")
+            if not may_read(path):
+                raise PermissionError(f"reading {path} is not allowed in the profiling sandbox")
+        elif event in READ_EVENTS and args and isinstance(args[0], (str, bytes, os.PathLike)) and not may_read(args[0]):
+            raise PermissionError(f"{event} outside the working directory is not allowed in the profiling sandbox")
+        elif event in PATH_EVENTS and args and not all(inside(a) for a in args[:2] if isinstance(a, (str, bytes, os.PathLike))):
+            raise PermissionError(f"{event} outside the working directory is not allowed in the profiling sandbox")
+
+    sys.addaudithook(hook)
+
+def _raise_limit(kind):
+    def handler(signum, frame):
+        raise LimitExceeded(kind)
+    return handler
+
+def _location(func, snippet_path):
+    filename, line, name = func
+    if filename == snippet_path:
+        return f"{name} (line {line})"
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{line} {name}"
+
+def main():
+    workdir, cpu_seconds, wall_seconds, memory_mb, top_n = sys.argv[1], *map(int, sys.argv[2:6])
+    snippet_path = os.path.join(workdir, "snippet.py")
+    os.chdir(workdir)
+    with open(snippet_path, encoding="utf-8") as f:
+        source = f.read()
+
+    die_with_parent()
+    limit_resources(cpu_seconds, memory_mb)
+    network_isolated = isolate_network()
+    syscalls_filtered = install_seccomp()
+    signal.signal(signal.SIGXCPU, _raise_limit("CPU time limit"))
+    signal.signal(signal.SIGALRM, _raise_limit("wall-clock limit"))
+    install_audit_hook(workdir)
+
+    result = {"status": "ok", "message": "", "network": "namespace + audit hook" if network_isolated else "audit hook",
+              "seccomp": syscalls_filtered}
+    output = io.StringIO()
+    sys.stdout = sys.stderr = output
+    sys.argv = [snippet_path]
+    namespace = {"__name__": "__main__", "__file__": snippet_path, "__builtins__": __builtins__}
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    signal.alarm(wall_seconds)
+    try:
+        code = compile(source, snippet_path, "exec")
+        profiler.enable()
+        exec(code, namespace)
+    except LimitExceeded as e:
+        result.update(status="timeout", message=f"Stopped at the {e.args[0]}")
+    except MemoryError:
+        result.update(status="memory", message="MemoryError: the memory limit was reached")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            result.update(status="error", message=f"SystemExit({e.code!r})")
+    except BaseException as e:
+        frames = [frame for frame in traceback.extract_tb(e.__traceback__) if frame.filename == snippet_path]
+        where = f" (line {frames[-1].lineno})" if frames else ""
+        result.update(status="error", message=f"{type(e).__name__}: {str(e)[:200]}{where}")
+    finally:
+        profiler.disable()
+        signal.alarm(0)
+    result["wall_s"] = round(time.perf_counter() - wall_started, 4)
+    result["cpu_s"] = round(time.process_time() - cpu_started, 4)
+    signal.signal(signal.SIGXCPU, signal.SIG_IGN)
+
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, snippet_path)])
+    result["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    tracemalloc.stop()
+    result["allocations"] = [{"line": stat.traceback[0].lineno, "kb": round(stat.size / 1024, 1), "blocks": stat.count}
+                             for stat in snapshot.statistics("lineno") if stat.traceback[0].lineno][:top_n]
+
+    stats = pstats.Stats(profiler).stats
+    rows = [(func, calls, own, cumulative) for func, (_, calls, own, cumulative, _) in stats.items()
+            if not (func[0] == __file__ or func[2] in ("<built-in method builtins.exec>",
+                                                      "<method 'disable' of '_lsprof.Profiler' objects>"))]
+    rows.sort(key=lambda row: -row[3])
+    result["functions"] = [{"function": _location(func, snippet_path), "calls": calls, "own_s": round(own, 4),
+                            "cumulative_s": round(cumulative, 4)} for func, calls, own, cumulative in rows[:top_n]]
+    # Only the size: whatever the snippet printed stays in the sandbox
+    result["output_chars"] = len(output.getvalue())
+
+    sys.stdout = sys.__stdout__
+    with open(os.path.join(workdir, "result.json"), "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Per-user index of chat sessions across all tools, kept in process memory.
+
+Loaded with one query per user (the newest SESSION_INDEX_PER_TAB sessions of every tab) and
+then patched in place by the data layer: utils/chat_sessions.py and utils/memory.py report
+create, append, rename and delete here, so views never invalidate anything themselves.
+Rows have the chat_sessions shape (id, tab_name, session_title, created_at, updated_at,
+first_message), newest first. SESSION_INDEX_TTL bounds staleness from other server processes.
+"""
+
+import threading
+import time
+from auth.database import get_connection
+from utils.cache import LRUCache
+from utils.tracing import traced
+from config import SESSION_INDEX_PER_TAB, SESSION_INDEX_TTL, SESSION_INDEX_MAX_USERS
+
+_lock = threading.Lock()
+_index = LRUCache(SESSION_INDEX_MAX_USERS)  # user_id -> _UserIndex
+
+class _UserIndex:
+    def __init__(self, rows):
+        self.rows = rows
+        self.loaded = time.monotonic()
+        # A tab with fewer rows than the per-tab cap holds all of that tab's sessions
+        counts = {}
+        for row in rows:
+            counts[row[1]] = counts.get(row[1], 0) + 1
+        self.truncated_tabs = {tab for tab, n in counts.items() if n >= SESSION_INDEX_PER_TAB}
+
+@traced("db.load_session_index")
+def _load(user_id):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, tab_name, session_title, created_at, updated_at, first_message
+        FROM (
+            SELECT id, tab_name, session_title, created_at, updated_at, first_message,
+                   ROW_NUMBER() OVER (PARTITION BY tab_name ORDER BY updated_at DESC, id DESC) AS tab_rank
+            FROM chat_sessions
+            WHERE user_id=%s
+        ) ranked
+        WHERE tab_rank <= %s
+        ORDER BY updated_at DESC, id DESC
+    """, (user_id, SESSION_INDEX_PER_TAB))
+    rows = [tuple(row) for row in cursor.fetchall()]
+    conn.close()
+    return _UserIndex(rows)
+
+def get_sessions(user_id, tab_name=None, limit=10):
+    """
+    Newest sessions of a user (optionally of one tab) from the index, loading it on first use.
+    Returns None when the request reaches past what the index holds.
+    """
+    entry = _index.get(user_id)
+    if entry is None or time.monotonic() - entry.loaded > SESSION_INDEX_TTL:
+        entry = _load(user_id)
+        with _lock:
+            _index.put(user_id, entry)
+    rows = [row for row in entry.rows if tab_name is None or row[1] == tab_name]
+    if len(rows) < limit and (entry.truncated_tabs if tab_name is None else tab_name in entry.truncated_tabs):
+        return None
+    return rows[:limit]
+
+def upsert(user_id, row):
+    """A session was created or changed (appended to, renamed): move it to the top"""
+    with _lock:
+        entry = _index.get(user_id)
+        if entry is not None:
+            entry.rows = [tuple(row)] + [r for r in entry.rows if r[0] != row[0]]
+
+def remove(user_id, session_id):
+    """A session was deleted"""
+    with _lock:
+        entry = _index.get(user_id)
+        if entry is None:
+            return
+        tab_names = {r[1] for r in entry.rows if r[0] == session_id}
+        entry.rows = [r for r in entry.rows if r[0] != session_id]
+        if tab_names & entry.truncated_tabs:
+            # An older session of that tab, not held in memory, may now belong in the list
+            _index.pop(user_id)
+
+def invalidate(user_id):
+    _index.pop(user_id)
@@ -0,0 +1,225 @@
+"""
+Lightweight per-rerun tracing and metrics.
+
+Spans nest through a context variable, so a tab function, the DB calls it makes and the LLM
+call inside them end up in one tree per rerun. Finished spans go to:
+- an in-memory window (last hour) for the admin panel's p50/p95 table
+- a rotating JSONL trace log (TRACE_LOG_PATH)
+- cumulative counters served in Prometheus text format on METRICS_HOST:METRICS_PORT (opt-in)
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+
+from config import (
+    TRACING_ENABLED, TRACE_LOG_PATH, TRACE_LOG_MAX_BYTES, TRACE_LOG_BACKUPS,
+    TRACE_WINDOW_SECONDS, METRICS_PORT, METRICS_HOST
+)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_lock = threading.Lock()
+_recent = deque(maxlen=200000)   # (end_time, name, duration_s)
+_totals = {}                     # name -> {"count", "sum", "errors", attr counters...}
+_COUNTED_ATTRS = ("prompt_tokens", "completion_tokens", "payload_bytes", "cache_hits")
+
+_trace_logger = None
+_metrics_server = None
+
+
+class Span:
+    """One timed operation; attach attributes with set()"""
+
+    def __init__(self, name, parent, attrs):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.attrs = dict(attrs)
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration = None
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "attrs": self.attrs,
+            "error": self.error,
+        }
+
+
+def _get_trace_logger():
+    global _trace_logger
+    if _trace_logger is None:
+        logger = logging.getLogger("articulaite.trace")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        if TRACE_LOG_PATH:
+            os.makedirs(os.path.dirname(TRACE_LOG_PATH) or ".", exist_ok=True)
+            handler = RotatingFileHandler(TRACE_LOG_PATH, maxBytes=TRACE_LOG_MAX_BYTES, backupCount=TRACE_LOG_BACKUPS)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        _trace_logger = logger
+    return _trace_logger
+
+
+def _finish(span):
+    now = time.time()
+    with _lock:
+        _recent.append((now, span.name, span.duration))
+        totals = _totals.setdefault(span.name, {"count": 0, "sum": 0.0, "errors": 0})
+        totals["count"] += 1
+        totals["sum"] += span.duration
+        totals["errors"] += int(span.error is not None)
+        for attr in _COUNTED_ATTRS:
+            value = span.attrs.get(attr)
+            if isinstance(value, (int, float)):
+                totals[attr] = totals.get(attr, 0) + value
+    logger = _get_trace_logger()
+    if logger.handlers:
+        logger.info(json.dumps(span.to_dict(), default=str))
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a block as a child of the current span"""
+    if not TRACING_ENABLED:
+        yield Span(name, None, attrs)
+        return
+    current = Span(name, _current_span.get(), attrs)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        # Streamlit reruns/stops are control flow, not failures
+        if isinstance(e, Exception) and type(e).__name__ not in ("RerunException", "StopException"):
+            current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = time.perf_counter() - current._started
+        _current_span.reset(token)
+        _finish(current)
+
+
+def traced(name):
+    """Decorator form of span(); records the row count of list results (DB queries)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name) as s:
+                result = func(*args, **kwargs)
+                if isinstance(result, list):
+                    s.set(rows=len(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def _window_durations(window):
+    cutoff = time.time() - window
+    by_name = {}
+    with _lock:
+        while _recent and _recent[0][0] < cutoff:
+            _recent.popleft()
+        for _, name, duration in _recent:
+            by_name.setdefault(name, []).append(duration)
+    return by_name
+
+
+def window_stats(window=TRACE_WINDOW_SECONDS):
+    """[{operation, count, p50_ms, p95_ms, max_ms}] for spans finished in the last `window` seconds"""
+    rows = []
+    for name, durations in sorted(_window_durations(window).items()):
+        rows.append({
+            "operation": name,
+            "count": len(durations),
+            "p50_ms": round(_percentile(durations, 50) * 1000, 2),
+            "p95_ms": round(_percentile(durations, 95) * 1000, 2),
+            "max_ms": round(max(durations) * 1000, 2),
+        })
+    return rows
+
+
+def render_prometheus():
+    """Prometheus text exposition of span durations and token/payload counters"""
+    lines = [
+        "# HELP articulaite_span_duration_seconds Duration of traced operations (quantiles over the last hour)",
+        "# TYPE articulaite_span_duration_seconds summary",
+    ]
+    recent = _window_durations(TRACE_WINDOW_SECONDS)
+    with _lock:
+        totals = {name: dict(values) for name, values in _totals.items()}
+    for name, values in sorted(totals.items()):
+        label = f'operation="{name}"'
+        if name in recent:
+            for q in (50, 95):
+                lines.append(f'articulaite_span_duration_seconds{{{label},quantile="{q / 100}"}} {_percentile(recent[name], q)}')
+        lines.append(f"articulaite_span_duration_seconds_sum{{{label}}} {values['sum']}")
+        lines.append(f"articulaite_span_duration_seconds_count{{{label}}} {values['count']}")
+    lines += ["# HELP articulaite_span_errors_total Traced operations that raised",
+              "# TYPE articulaite_span_errors_total counter"]
+    for name, values in sorted(totals.items()):
+        lines.append(f'articulaite_span_errors_total{{operation="{name}"}} {values["errors"]}')
+    lines += ["# HELP articulaite_span_attr_total Token, payload and cache hit counters per operation",
+              "# TYPE articulaite_span_attr_total counter"]
+    for name, values in sorted(totals.items()):
+        for attr in _COUNTED_ATTRS:
+            if attr in values:
+                lines.append(f'articulaite_span_attr_total{{operation="{name}",attr="{attr}"}} {values[attr]}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """Serve /metrics on a background thread once per process (no-op if disabled or already running)"""
+    global _metrics_server
+    with _lock:
+        if _metrics_server is not None or not port:
+            return
+        try:
+            _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError:
+            # Port taken, e.g. by another server process on the same host
+            _metrics_server = False
+            return
+        _metrics_server.daemon_threads = True
+    threading.Thread(target=_metrics_server.serve_forever, daemon=True).start()
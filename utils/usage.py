@@ -0,0 +1,78 @@
+"""
+Token usage accounting - rollups over the llm_usage side table written by save_chat_message
+"""
+
+import time
+from auth.database import get_connection
+from utils.tracing import traced
+
+ROLLUP_COLUMNS = ("user_id", "tab_name", "model", "prompt_kind")
+DAY_SECONDS = 24 * 3600
+
+@traced("db.get_user_tokens_since")
+def get_user_tokens_since(user_id, since_ts):
+    """Prompt + completion tokens a user spent since the given epoch timestamp"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """SELECT COALESCE(SUM(COALESCE(prompt_tokens, 0) + COALESCE(completion_tokens, 0)), 0)
+           FROM llm_usage WHERE user_id = %s AND created_ts >= %s""",
+        (user_id, since_ts)
+    )
+    total = cursor.fetchone()[0]
+    conn.close()
+    return int(total)
+
+def get_user_tokens_today(user_id):
+    """Tokens spent by a user over the trailing 24 hours (the quota window)"""
+    return get_user_tokens_since(user_id, time.time() - DAY_SECONDS)
+
+@traced("db.get_usage_rollup")
+def get_usage_rollup(group_by=("user_id", "tab_name", "model"), since=None, user_id=None, limit=50):
+    """
+    Token spend and latency grouped by any of ROLLUP_COLUMNS, most expensive first.
+    `since` is an epoch timestamp; `user_id` restricts to one user.
+    """
+    columns = [c for c in group_by if c in ROLLUP_COLUMNS]
+    if not columns:
+        raise ValueError(f"group_by must use {ROLLUP_COLUMNS}")
+    conditions, params = [], []
+    if since is not None:
+        conditions.append("created_ts >= %s")
+        params.append(since)
+    if user_id is not None:
+        conditions.append("user_id = %s")
+        params.append(user_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    select = ", ".join(columns)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""SELECT {select}, COUNT(*),
+                   COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(completion_tokens), 0),
+                   AVG(ttft_ms), AVG(latency_ms), SUM(cache_hit)
+            FROM llm_usage {where}
+            GROUP BY {select}
+            ORDER BY COALESCE(SUM(prompt_tokens), 0) + COALESCE(SUM(completion_tokens), 0) DESC
+            LIMIT %s""",
+        (*params, limit)
+    )
+    rows = cursor.fetchall()
+    conn.close()
+
+    rollup = []
+    for row in rows:
+        keys, (calls, prompt_tokens, completion_tokens, avg_ttft, avg_latency, cache_hits) = row[:len(columns)], row[len(columns):]
+        entry = dict(zip(columns, keys))
+        entry.update({
+            "calls": calls,
+            "prompt_tokens": int(prompt_tokens),
+            "completion_tokens": int(completion_tokens),
+            "total_tokens": int(prompt_tokens) + int(completion_tokens),
+            "avg_ttft_ms": round(float(avg_ttft), 1) if avg_ttft is not None else None,
+            "avg_latency_ms": round(float(avg_latency), 1) if avg_latency is not None else None,
+            "cache_hits": int(cache_hits or 0),
+        })
+        rollup.append(entry)
+    return rollup
@@ -0,0 +1,117 @@
+"""
+Process warmup - prepares the expensive, shareable parts of the app once per server process:
+database tables, the connection pool, the heavy tool imports (LangChain, Groq, the PDF
+parser), the PDF worker processes and the LLM clients of each tool's default model.
+
+Streamlit has no server-start hook, so app.py calls start_warmup() on every run and the first
+call starts a background thread; the login page renders meanwhile. Run it synchronously
+before `streamlit run` (e.g. in a container entrypoint) with:
+
+    python -m utils.warmup
+"""
+
+import importlib
+import logging
+import multiprocessing
+import threading
+import time
+from utils.tracing import span
+from config import (
+    WARMUP_ENABLED, CV_INTERVIEW_MODELS, CODE_EXPLAINER_MODELS,
+    ARTICLE_GENERATOR_MODELS, STUDY_PLAN_MODELS
+)
+
+logger = logging.getLogger(__name__)
+
+# Imported lazily by the app; loading them here moves the cost off the first tool run
+HEAVY_MODULES = (
+    "langchain_core.prompts",
+    "langchain_groq",
+    "PyPDF2",
+    "tabs.cv_interview",
+    "tabs.code_explainer",
+    "tabs.article_generator",
+    "tabs.study_plan",
+)
+
+# (model list, default temperature of the tool's slider)
+DEFAULT_CLIENTS = (
+    (CV_INTERVIEW_MODELS, 0.3),
+    (CODE_EXPLAINER_MODELS, 0.2),
+    (ARTICLE_GENERATOR_MODELS, 0.3),
+    (STUDY_PLAN_MODELS, 0.2),
+)
+
+_lock = threading.Lock()
+_thread = None
+_done = threading.Event()
+timings = {}  # step -> seconds, or the error message of a failed step
+
+def _migrate():
+    from auth.database import ensure_database
+    ensure_database()
+
+def _warm_pool():
+    from auth.database import get_connection
+    conn = get_connection()
+    conn.cursor().execute("SELECT 1")
+    conn.close()
+
+def _import_modules():
+    for name in HEAVY_MODULES:
+        importlib.import_module(name)
+
+def _create_clients():
+    from utils.llm import get_llm
+    for models, temperature in DEFAULT_CLIENTS:
+        get_llm(next(iter(models.values())), temperature)
+
+def _start_pdf_pool():
+    from utils.pdf_extract import get_pool
+    get_pool()
+
+STEPS = (
+    ("migrations", _migrate),
+    ("db_pool", _warm_pool),
+    ("imports", _import_modules),
+    ("pdf_pool", _start_pdf_pool),
+    ("llm_clients", _create_clients),
+)
+
+def run_warmup():
+    """Run every step in order; a failing step is logged and does not stop the others"""
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            with span(f"warmup.{name}"):
+                step()
+            timings[name] = round(time.perf_counter() - started, 3)
+        except Exception as e:
+            logger.warning("Warmup step %s failed: %s", name, e)
+            timings[name] = f"failed: {e}"
+    _done.set()
+
+def start_warmup():
+    """
+    Start run_warmup on a daemon thread once per process (no-op if disabled, already started or
+    called in a child process such as a PDF pool worker, which must not start pools of its own)
+    """
+    global _thread
+    if multiprocessing.parent_process() is not None:
+        return
+    with _lock:
+        if _thread is not None or not WARMUP_ENABLED:
+            return
+        _thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+    _thread.start()
+
+def wait(timeout=None):
+    """Block until the warmup finished; True if it did within timeout"""
+    return _done.wait(timeout)
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    run_warmup()
+    for name, result in timings.items():
+        print(f"{name:12s} {result}")